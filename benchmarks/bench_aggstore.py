@@ -0,0 +1,62 @@
+"""
+Incremental aggregate store: full recompute versus applying a delta batch.
+
+The file is cleaned, all but the last ``--delta`` rows seed a fresh store, the
+remaining rows are applied as a nightly batch, and the store is verified
+against a full recompute.
+
+Usage:
+    python benchmarks/bench_aggstore.py path/to/car_prices.csv [--delta 5000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carprices.aggstore import AggregateStore, compute_partials
+from carprices.cleaning import clean
+from carprices.io import load_csv
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='car_prices CSV file')
+    parser.add_argument('--delta', type=int, default=5000, help='rows in the simulated nightly batch')
+    args = parser.parse_args()
+
+    df, _ = clean(load_csv(args.path))
+    history, delta = df.iloc[:-args.delta], df.iloc[-args.delta:]
+    store_dir = tempfile.mkdtemp(prefix='carprices-aggstore-')
+    try:
+        AggregateStore(store_dir).apply(history, batch_id='history')
+
+        _, full_seconds = timed(compute_partials, df)
+        store, load_seconds = timed(AggregateStore, store_dir)
+        _, apply_seconds = timed(store.apply, delta)
+        _, results_seconds = timed(store.results)
+        report = store.verify(df)
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    print(f"Full recompute ({len(df):,} rows):     {full_seconds * 1000:9.1f} ms")
+    print(f"Load store:                         {load_seconds * 1000:9.1f} ms")
+    print(f"Apply delta ({len(delta):,} rows):         {apply_seconds * 1000:9.1f} ms")
+    print(f"Derive report tables:               {results_seconds * 1000:9.1f} ms")
+    print()
+    print(report)
+    print(f"\nVerification {'passed' if report['ok'].all() else 'FAILED'}")
+
+
+if __name__ == '__main__':
+    main()
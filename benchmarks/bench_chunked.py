@@ -0,0 +1,107 @@
+"""
+Chunked versus in-memory Task 2 on a file with shifted rows: same results, time.
+
+The public export has a few rows with shifted columns (a text value such as
+'Navitgation' in the condition field), which the strict numeric dtypes
+reject. This copies the file with ``--shifted-rows`` such rows spread over
+it, after the first batch, so the chunked reader hits one mid-stream. Task 2
+is then computed with ``task2_in_memory(load_csv(...))`` and with
+``task2_chunked`` in ``--chunksize`` batches, and every statistic and table
+is compared. Exits with status 1 if any of them differ or a read fails.
+
+Usage:
+    python benchmarks/bench_chunked.py path/to/car_prices.csv [--chunksize 10000] [--shifted-rows 3]
+"""
+
+import argparse
+import csv
+import io
+import numbers
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from carprices.chunked import TASK2_COLUMNS, task2_chunked, task2_in_memory
+from carprices.io import ReadStats, load_csv, open_source
+
+SHIFTED_VALUE = 'Navitgation'
+
+
+def write_shifted(path, dest, shifted_rows, after):
+    """Copy ``path`` to a plain CSV with ``shifted_rows`` rows shifted right from condition on."""
+    with open_source(path) as source, open(dest, 'w', newline='') as handle:
+        rows = list(csv.reader(io.TextIOWrapper(source, encoding='utf-8', newline='')))
+        header, body = rows[0], rows[1:]
+        condition = header.index('condition')
+        positions = np.linspace(min(after, len(body) - 1), len(body) - 1, shifted_rows).astype(int)
+        for position in positions:
+            row = body[position]
+            body[position] = row[:condition] + [SHIFTED_VALUE] + row[condition:-1]
+        csv.writer(handle).writerows([header] + body)
+    return len(body)
+
+
+def _key(label):
+    return float(label) if isinstance(label, numbers.Number) else str(label)
+
+
+def differences(expected, actual, prefix=''):
+    """Names of the results that differ (tables compared by label, floats to 1e-9)."""
+    found = []
+    for name, value in expected.items():
+        other = actual[name]
+        if isinstance(value, dict):
+            found += differences(value, other, f"{prefix}{name}.")
+        elif isinstance(value, pd.Series):
+            left = {_key(label): item for label, item in value.items()}
+            right = {_key(label): item for label, item in other.items()}
+            if left.keys() != right.keys() or not np.allclose([left[key] for key in left],
+                                                              [right[key] for key in left], rtol=1e-9):
+                found.append(prefix + name)
+        elif not np.isclose(value, other, rtol=1e-9, equal_nan=True):
+            found.append(prefix + name)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='car_prices CSV file')
+    parser.add_argument('--chunksize', type=int, default=10_000, help='rows per batch')
+    parser.add_argument('--shifted-rows', type=int, default=3, help='malformed rows to insert')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='carprices-chunked-')
+    try:
+        path = os.path.join(tmp_dir, 'shifted.csv')
+        rows = write_shifted(args.path, path, args.shifted_rows, after=args.chunksize)
+        print(f"{rows:,} rows, {args.shifted_rows} shifted ('{SHIFTED_VALUE}' in condition)")
+
+        start = time.perf_counter()
+        expected = task2_in_memory(load_csv(path, columns=TASK2_COLUMNS))
+        memory_seconds = time.perf_counter() - start
+        stats = ReadStats()
+        start = time.perf_counter()
+        actual = task2_chunked(path, chunksize=args.chunksize, stats=stats)
+        chunked_seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"{'in memory':<12}{memory_seconds:>8.2f} s")
+    print(f"{'chunked':<12}{chunked_seconds:>8.2f} s   {stats.summary()}")
+    found = differences(expected, actual)
+    if found:
+        print(f"\nChunked results differ: {', '.join(found)}")
+        return 1
+    print(f"\n✓ All Task 2 results match ({len(expected)} entries)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Streaming versus in-memory duplicate removal: same rows, time and disk writes.
+
+The file is copied with ``--duplicate-share`` of its rows repeated and all
+rows shuffled, so duplicates are spread across batches. ``--shifted-rows``
+rows past the first batch get shifted columns (a text value such as
+'Navitgation' in the condition field), so the reader switches to coerced
+float32 columns mid-file and a row and its repeat can arrive with
+different dtypes; they must still count as duplicates. The duplicates are
+found once with ``find_duplicates(load_csv(...))`` and then streamed through
+a ``StreamingDeduplicator`` in ``--chunksize`` batches at several
+``--memory-keys`` limits, the smaller ones forcing many spills to disk. For
+each limit it reports the time, the spills and the bytes written per kept
+key, which grows with the logarithm of the spills rather than with the
+file. Finally ``dedup_file`` writes the kept rows to a CSV. Exits with
+status 1 if any count differs from the in-memory scan.
+
+Usage:
+    python benchmarks/bench_dedup.py path/to/car_prices.csv [--chunksize 50000] [--memory-keys 0 100000 10000]
+    python benchmarks/bench_dedup.py path/to/car_prices.csv --chunksize 1000 --shifted-rows 3
+"""
+
+import argparse
+import csv
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from carprices.dedup import StreamingDeduplicator, dedup_file, find_duplicates
+from carprices.io import iter_chunks, load_csv, open_source
+
+SHIFTED_VALUE = 'Navitgation'
+
+
+def shift(line, condition):
+    """``line`` with the fields from ``condition`` on moved one to the right."""
+    row = next(csv.reader([line]))
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerow(row[:condition] + [SHIFTED_VALUE] + row[condition:-1])
+    return buffer.getvalue()
+
+
+def write_duplicated(path, dest, share, shifted_rows, after, seed):
+    """Copy ``path`` with ``share`` of its lines repeated, shuffled and some shifted; returns the row count."""
+    with open_source(path) as source:
+        lines = source.read().decode('utf-8').splitlines()
+    header, body = lines[0], lines[1:]
+    rng = np.random.default_rng(seed)
+    repeated = rng.choice(len(body), int(len(body) * share), replace=False)
+    order = rng.permutation(np.concatenate([np.arange(len(body)), repeated]))
+    rows = [body[i] + '\n' for i in order]
+    condition = next(csv.reader([header])).index('condition')
+    for position in np.linspace(min(after, len(rows) - 1), len(rows) - 1, shifted_rows).astype(int):
+        rows[position] = shift(rows[position], condition)
+    with open(dest, 'w', newline='') as handle:
+        handle.write(header + '\n')
+        handle.writelines(rows)
+    return len(rows)
+
+
+def stream(path, chunksize, memory_keys):
+    """``(report, deduplicator, seconds)`` of one streaming pass."""
+    start = time.perf_counter()
+    with StreamingDeduplicator(max_memory_keys=memory_keys) as dedup:
+        for chunk in iter_chunks(path, chunksize=chunksize):
+            dedup.filter(chunk)
+        return dedup.report(), dedup, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='car_prices CSV file')
+    parser.add_argument('--chunksize', type=int, default=50_000, help='rows per batch')
+    parser.add_argument('--memory-keys', type=int, nargs='+', default=[0, 100_000, 10_000],
+                        help='in-memory key limits to stream with (0 = never spill)')
+    parser.add_argument('--duplicate-share', type=float, default=0.2, help='share of rows to repeat')
+    parser.add_argument('--shifted-rows', type=int, default=3, help='malformed rows to insert')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='carprices-dedup-')
+    try:
+        path = os.path.join(tmp_dir, 'duplicated.csv')
+        rows = write_duplicated(args.path, path, args.duplicate_share, args.shifted_rows,
+                                after=args.chunksize, seed=args.seed)
+        print(f"{rows:,} rows, {args.duplicate_share:.0%} of them repeated, {args.shifted_rows} shifted, "
+              f"in batches of {args.chunksize:,}")
+
+        start = time.perf_counter()
+        _, expected = find_duplicates(load_csv(path))
+        memory_seconds = time.perf_counter() - start
+        print(f"\n{'Deduplication':<26}{'Duplicates':>12}{'Seconds':>9}{'Spills':>8}{'Bytes/key':>11}")
+        print("-"*66)
+        print(f"{'in memory':<26}{expected.duplicates:>12,}{memory_seconds:>9.2f}")
+
+        failed = False
+        for memory_keys in args.memory_keys:
+            report, dedup, seconds = stream(path, args.chunksize, memory_keys or rows)
+            per_key = dedup.bytes_written / max(report.unique, 1)
+            status = '' if report.duplicates == expected.duplicates else '  MISMATCH'
+            failed |= bool(status)
+            name = f"streamed, {memory_keys:,} keys" if memory_keys else 'streamed, no spill'
+            print(f"{name:<26}{report.duplicates:>12,}{seconds:>9.2f}{dedup.spills:>8,}{per_key:>11.1f}{status}")
+
+        output = os.path.join(tmp_dir, 'unique.csv')
+        spilling = min((keys for keys in args.memory_keys if keys), default=rows)
+        start = time.perf_counter()
+        report = dedup_file(path, output, chunksize=args.chunksize, max_memory_keys=spilling)
+        seconds = time.perf_counter() - start
+        with open(output) as handle:
+            written = sum(1 for _ in handle) - 1
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    status = '' if report.duplicates == expected.duplicates and written == expected.unique else '  MISMATCH'
+    failed |= bool(status)
+    print(f"{'dedup_file to CSV':<26}{report.duplicates:>12,}{seconds:>9.2f}"
+          f"{'':>19}  {written:,} rows written{status}")
+
+    if failed:
+        print("\nStreaming deduplication FAILED")
+        return 1
+    print(f"\n✓ Same duplicates as the in-memory scan ({expected.summary()})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
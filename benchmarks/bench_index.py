@@ -0,0 +1,112 @@
+"""
+Row index versus boolean-mask scans for the Task 2 range filters.
+
+The file is cleaned and its rows repeated up to ``--rows``. A ``RowIndex``
+over price, year, condition and odometer (sorted) and make and state
+(bitmaps) is built, saved and loaded back. Then each filter is timed as a
+full scan (compare every row, then the matching positions) and as an index
+lookup: 2.4 at several thresholds, 2.10 at its defaults and a selective
+setting, 2.11 and conjunctions with make and state. Both must return the
+same rows. Exits with status 1 on a mismatch, or if a filter matching at
+most ``SELECTIVE_SHARE`` of the rows takes longer than ``--max-ms``.
+
+Usage:
+    python benchmarks/bench_index.py path/to/car_prices.csv [--rows 1000000] [--max-ms 1]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from carprices.dataset import CarPriceDataset
+from carprices.rowindex import RowIndex, mask_where
+
+# Filters matching at most this share of rows must meet --max-ms
+SELECTIVE_SHARE = 0.01
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+def best_of(repeat, func, *args):
+    runs = [timed(func, *args) for _ in range(repeat)]
+    return runs[0][0], min(seconds for _, seconds in runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='car_prices CSV file')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='rows to index (the file repeated)')
+    parser.add_argument('--max-ms', type=float, default=1.0, help='budget of the selective filters')
+    parser.add_argument('--repeat', type=int, default=5, help='runs to take the best of')
+    args = parser.parse_args()
+
+    data = CarPriceDataset(args.path)
+    columns = data.columns
+    df = data.df
+    df = df.iloc[np.resize(np.arange(len(df)), args.rows)].reset_index(drop=True)
+    numeric = [columns.price, columns.year, columns.condition, columns.odometer]
+    categorical = [columns.brand, columns.state]
+
+    index, build_seconds = timed(RowIndex.build, df, numeric, categorical)
+    tmp_dir = tempfile.mkdtemp(prefix='carprices-index-')
+    try:
+        path = os.path.join(tmp_dir, 'index.npz')
+        index.save(path)
+        size = os.path.getsize(path)
+        index, load_seconds = timed(RowIndex.load, path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"{index}")
+    print(f"Built in {build_seconds * 1000:.0f} ms; saved in {size / 1024**2:,.1f} MB, "
+          f"loaded in {load_seconds * 1000:.1f} ms")
+
+    make = df[columns.brand].value_counts().index[2]
+    state = df[columns.state].value_counts().index[4]
+    cases = [
+        ('2.4 price > 165,000', [(columns.price, '>', 165000)]),
+        ('2.4 price > 60,000', [(columns.price, '>', 60000)]),
+        ('2.4 price > 30,000', [(columns.price, '>', 30000)]),
+        ('2.10 cond >= 48, odo > 90K', [(columns.condition, '>=', 48), (columns.odometer, '>', 90000)]),
+        ('2.10 cond >= 49, odo > 250K', [(columns.condition, '>=', 49), (columns.odometer, '>', 250000)]),
+        ('2.11 year > 2013', [(columns.year, '>', 2013)]),
+        (f"{make}, price > 40,000", [(columns.brand, '==', make), (columns.price, '>', 40000)]),
+        (f"{make} in {state}", [(columns.brand, '==', make), (columns.state, '==', state)]),
+        (f"{make} in {state}, year > 2013", [(columns.brand, '==', make), (columns.state, '==', state),
+                                             (columns.year, '>', 2013)]),
+    ]
+
+    failed = False
+    print(f"\nFilters on {args.rows:,} rows (best of {args.repeat})")
+    print(f"{'Filter':<34}{'Rows':>10}{'Scan ms':>10}{'Index ms':>10}{'Speedup':>9}")
+    print("-"*73)
+    for name, predicates in cases:
+        scanned, scan_seconds = best_of(args.repeat, lambda: np.flatnonzero(mask_where(df, *predicates)))
+        looked_up, index_seconds = best_of(args.repeat, index.where, *predicates)
+        status = ''
+        if not np.array_equal(scanned, looked_up):
+            status, failed = '  MISMATCH', True
+        elif len(looked_up) <= SELECTIVE_SHARE * args.rows and index_seconds * 1000 > args.max_ms:
+            status, failed = '  OVER BUDGET', True
+        print(f"{name:<34}{len(looked_up):>10,}{scan_seconds * 1000:>10.2f}{index_seconds * 1000:>10.3f}"
+              f"{scan_seconds / index_seconds:>8.0f}x{status}")
+
+    if failed:
+        print("\nRow index FAILED")
+        return 1
+    print(f"\n✓ Same rows as the scans; selective filters under {args.max_ms:g} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
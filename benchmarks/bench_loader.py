@@ -0,0 +1,68 @@
+"""
+Loader benchmark: bare ``pd.read_csv`` versus the typed ``carprices`` loader.
+
+Each loader runs in a fresh process so peak RSS is measured in isolation.
+
+Usage:
+    python benchmarks/bench_loader.py path/to/car_prices.csv
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run(name, path, queue):
+    import pandas as pd
+    from carprices.io import load_csv
+
+    loaders = {
+        'pd.read_csv (baseline)': lambda: pd.read_csv(path),
+        'load_csv c engine': lambda: load_csv(path, engine='c'),
+        'load_csv pyarrow engine': lambda: load_csv(path, engine='pyarrow'),
+        'load_csv projected (make, sellingprice)': lambda: load_csv(path, columns=['make', 'sellingprice']),
+    }
+    start = time.perf_counter()
+    df = loaders[name]()
+    elapsed = time.perf_counter() - start
+    frame_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+    queue.put((name, elapsed, frame_mb, _peak_rss_mb()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='car_prices CSV file')
+    args = parser.parse_args()
+
+    from carprices.io import pyarrow_available
+
+    names = ['pd.read_csv (baseline)', 'load_csv c engine']
+    if pyarrow_available():
+        names.append('load_csv pyarrow engine')
+    names.append('load_csv projected (make, sellingprice)')
+
+    ctx = mp.get_context('spawn')
+    print(f"{'Loader':<42}{'Time (s)':>10}{'Frame (MB)':>12}{'Peak RSS (MB)':>15}")
+    print('-' * 79)
+    for name in names:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(name, args.path, queue))
+        proc.start()
+        result = queue.get()
+        proc.join()
+        print(f"{result[0]:<42}{result[1]:>10.2f}{result[2]:>12.1f}{result[3]:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Grouped-aggregation benchmark: sequential pandas groupbys versus the fused
+``QueryPlan`` used by the report.
+
+Usage:
+    python benchmarks/bench_planner.py path/to/car_prices.csv
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from carprices.io import load_csv
+from carprices.planner import QueryPlan
+
+
+def report_plan():
+    """The grouped aggregations behind sections 2.5-2.12, 3.2 and 3.4."""
+    plan = QueryPlan()
+    plan.add_filter('newer', lambda df: df['year'] > 2013)
+    plan.add_filter('excellent', lambda df: df['condition'] >= df['condition'].quantile(0.80))
+    plan.add('2.5 model counts', by='model', agg='size')
+    plan.add('2.6 avg price by make', by='make', value='sellingprice', agg='mean')
+    plan.add('2.7 min price by interior', by='interior', value='sellingprice', agg='min')
+    plan.add('2.8 max odometer by year', by='year', value='odometer', agg='max')
+    plan.add('2.11 avg price by state (year > 2013)', by='state', value='sellingprice', agg='mean', where='newer')
+    plan.add('2.12 avg price by make (excellent)', by='make', value='sellingprice', agg='mean', where='excellent')
+    plan.add('3.2 avg price by year', by='year', value='sellingprice', agg='mean')
+    plan.add('3.4 state counts', by='state', agg='size')
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='car_prices CSV file')
+    parser.add_argument('--repeat', type=int, default=5, help='runs to take the best of')
+    args = parser.parse_args()
+
+    df = load_csv(args.path)
+    plan = report_plan()
+    runs = [plan.compare(df) for _ in range(args.repeat)]
+    best = pd.concat(runs).groupby(level=0, sort=False).min()
+    best['speedup'] = best['sequential_ms'] / best['fused_ms']
+    with pd.option_context('display.float_format', '{:,.2f}'.format, 'display.width', 120):
+        print(best)
+
+
+if __name__ == '__main__':
+    main()
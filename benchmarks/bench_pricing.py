@@ -0,0 +1,105 @@
+"""
+Segment price models: holdout accuracy, model size and batch scoring throughput.
+
+The file is cleaned and split at random into training and holdout rows. The
+model is fitted on the training rows, saved and loaded back, and the holdout
+error is compared with pricing every car at its MMR and with each coarser
+level of the model. The holdout rows are then repeated up to ``--rows``
+listings and scored end to end (label lookup, features, scoring) and with
+the NumPy core alone. Exits with status 1 if end-to-end scoring is slower
+than ``--target`` rows per second.
+
+Usage:
+    python benchmarks/bench_pricing.py path/to/car_prices.csv [--rows 2000000] [--target 1000000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from carprices.dataset import CarPriceDataset
+from carprices.pricing import LEVELS, PRIOR_ROWS, PriceModel, fit_price_model
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+def best_of(repeat, func, *args, **kwargs):
+    return min(timed(func, *args, **kwargs)[1] for _ in range(repeat))
+
+
+def errors(predicted, actual):
+    """Mean absolute error, its share of the mean price, and R^2."""
+    mae = np.nanmean(np.abs(predicted - actual))
+    r2 = 1 - np.nansum((predicted - actual) ** 2) / np.sum((actual - actual.mean()) ** 2)
+    return mae, mae / actual.mean(), r2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='car_prices CSV file')
+    parser.add_argument('--holdout', type=float, default=0.2, help='share of rows kept out of the fit')
+    parser.add_argument('--prior-rows', type=float, default=PRIOR_ROWS, help='ridge strength, in rows')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='listings scored in the throughput test')
+    parser.add_argument('--target', type=float, default=1_000_000, help='required end-to-end rows per second')
+    parser.add_argument('--repeat', type=int, default=3, help='runs to take the best of')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    df = CarPriceDataset(args.path).df
+    order = np.random.default_rng(args.seed).permutation(len(df))
+    cut = int(len(df) * (1 - args.holdout))
+    train, holdout = df.iloc[order[:cut]], df.iloc[order[cut:]]
+
+    model, fit_seconds = timed(fit_price_model, train, prior_rows=args.prior_rows)
+    tmp_dir = tempfile.mkdtemp(prefix='carprices-pricing-')
+    try:
+        path = os.path.join(tmp_dir, 'price_model.npz')
+        model.save(path)
+        size = os.path.getsize(path)
+        loaded, load_seconds = timed(PriceModel.load, path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"{model}")
+    print(f"Fit on {len(train):,} rows in {fit_seconds * 1000:.1f} ms; "
+          f"saved in {size / 1024:,.1f} KB, loaded in {load_seconds * 1000:.1f} ms")
+
+    actual = holdout['sellingprice'].to_numpy(dtype='float64')
+    print(f"\nHoldout error on {len(holdout):,} rows")
+    print(f"{'Model':<28}{'MAE':>10}{'MAE %':>8}{'R^2':>8}")
+    print("-"*54)
+    candidates = [('MMR as the price', holdout['mmr'].to_numpy(dtype='float64'))]
+    candidates += [('linear, global' if depth == 0 else f"linear, per {level.replace('_', '/')}",
+                    loaded.predict(holdout, level=depth)) for depth, level in enumerate(LEVELS)]
+    for name, predicted in candidates:
+        mae, share, r2 = errors(predicted, actual)
+        print(f"{name:<28}{mae:>10,.0f}{share:>8.1%}{r2:>8.3f}")
+
+    listings = holdout.iloc[np.resize(np.arange(len(holdout)), args.rows)]
+    encoded = loaded.encode(listings)
+    end_to_end = best_of(args.repeat, loaded.predict, listings)
+    core = best_of(args.repeat, loaded.score, *encoded)
+    print(f"\nScoring {args.rows:,} listings (best of {args.repeat})")
+    print(f"  end to end (labels, features, score) {end_to_end:>8.3f} s {args.rows / end_to_end:>14,.0f} rows/s")
+    print(f"  NumPy core (segment lookup, dot)     {core:>8.3f} s {args.rows / core:>14,.0f} rows/s")
+
+    if args.rows / end_to_end < args.target:
+        print(f"\nBelow the target of {args.target:,.0f} rows/s")
+        return 1
+    print(f"\n✓ Scoring meets the target of {args.target:,.0f} rows/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Load test of the query service: latency percentiles and throughput under concurrency.
+
+Starts ``python -m carprices PATH --serve PORT`` (or uses a running service
+given with ``--url``) and sends ``--requests`` GETs from ``--concurrency``
+keep-alive clients. Requests are drawn at random from a fixed pool mixing
+the Task 2 queries and their parameters (price threshold, year cutoff,
+condition and odometer filters, one make's average). ``--distinct`` sets how
+many parameter values each query is drawn with, so a small pool is mostly
+cache hits and a large one mostly computed, batched misses.
+
+Prints p50, p90, p99 and max latency and requests per second, overall and
+per query, then the service's counters (cache hits, batches, coalesced
+requests). Exits with status 1 if the overall p99 is above ``--max-p99-ms``.
+
+Usage:
+    python benchmarks/bench_service.py path/to/car_prices.csv [--concurrency 32] [--requests 2000]
+    python benchmarks/bench_service.py --url http://127.0.0.1:8765 [--distinct 50]
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from carprices.service import DEFAULT_HOST
+
+PORT = 8799
+STARTUP_SECONDS = 120
+MAKES = ('ford', 'chevrolet', 'nissan', 'toyota', 'dodge', 'honda', 'hyundai', 'bmw', 'kia', 'chrysler')
+
+
+def request_pool(distinct, seed):
+    """Request paths: every query, each with up to ``distinct`` parameter sets."""
+    rng = random.Random(seed)
+    makers = {
+        'high_price_cars': lambda: {'threshold': rng.randrange(20_000, 170_000, 5_000), 'limit': 20},
+        'avg_price_by_state': lambda: {'newer_than': rng.randrange(2000, 2015)},
+        'well_kept_high_mileage': lambda: {'min_condition': rng.randrange(30, 50),
+                                           'min_odometer': rng.randrange(50_000, 200_000, 10_000),
+                                           'limit': 20},
+        'avg_price_by_make': lambda: {'label': rng.choice(MAKES)},
+        'top_models': lambda: {'n': rng.randrange(3, 20)},
+        'value_for_money': lambda: {'quantile': rng.choice((0.7, 0.75, 0.8, 0.85, 0.9)), 'limit': 20},
+        'price_stats': dict,
+        'correlation': dict,
+        'cars_by_state': dict,
+    }
+    pool = {}
+    for name, make in makers.items():
+        paths = {f"/query/{name}?{urlencode(make())}".rstrip('?') for _ in range(distinct)}
+        pool[name] = sorted(paths)
+    return pool
+
+
+async def fetch(reader, writer, host, path):
+    """One GET on an open keep-alive connection; ``(status, body)``."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        header, _, value = line.decode('latin-1').partition(':')
+        if header.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def load(host, port, pool, requests, concurrency, seed):
+    """``(latencies per query, failures, seconds)`` of ``requests`` GETs."""
+    rng = random.Random(seed + 1)
+    names = list(pool)
+    plan = [(name, rng.choice(pool[name])) for name in (rng.choice(names) for _ in range(requests))]
+    latencies = collections.defaultdict(list)
+    failures = collections.Counter()
+    queue = collections.deque(plan)
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while queue:
+                name, path = queue.popleft()
+                start = time.perf_counter()
+                status, body = await fetch(reader, writer, host, path)
+                latencies[name].append(time.perf_counter() - start)
+                if status != 200:
+                    failures[f"{name} ({status}): {json.loads(body).get('error')}"] += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, failures, time.perf_counter() - start
+
+
+async def get_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return json.loads((await fetch(reader, writer, host, path))[1])
+    finally:
+        writer.close()
+
+
+def wait_until_up(host, port, proc):
+    deadline = time.monotonic() + STARTUP_SECONDS
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise SystemExit(f"The service exited with status {proc.returncode}")
+        try:
+            return asyncio.run(get_json(host, port, '/health'))
+        except (ConnectionError, OSError):
+            time.sleep(0.2)
+    raise SystemExit(f"The service did not answer within {STARTUP_SECONDS}s")
+
+
+def percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return [np.percentile(ms, 50), np.percentile(ms, 90), np.percentile(ms, 99), ms.max()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', nargs='?', help='car_prices CSV file to serve')
+    parser.add_argument('--url', help='use the service already running at this URL')
+    parser.add_argument('--port', type=int, default=PORT, help='port of the started service')
+    parser.add_argument('--concurrency', type=int, default=32, help='keep-alive clients')
+    parser.add_argument('--requests', type=int, default=2000, help='GETs sent in the measured run')
+    parser.add_argument('--distinct', type=int, default=10, help='parameter sets per query')
+    parser.add_argument('--max-p99-ms', type=float, help='fail if the overall p99 is above this')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if not args.path and not args.url:
+        parser.error("give a CSV path or --url")
+
+    proc = tmp_dir = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        host, port = DEFAULT_HOST, args.port
+        tmp_dir = tempfile.mkdtemp(prefix='carprices-service-')
+        proc = subprocess.Popen([sys.executable, '-m', 'carprices', args.path, '--serve', str(port),
+                                 '--host', host, '--cache-dir', tmp_dir],
+                                cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        start = time.perf_counter()
+        health = wait_until_up(host, port, proc)
+        print(f"Service on {host}:{port} up with {health['rows']:,} rows "
+              f"after {time.perf_counter() - start:.2f}s")
+
+        pool = request_pool(args.distinct, args.seed)
+        before = asyncio.run(get_json(host, port, '/stats'))
+        latencies, failures, seconds = asyncio.run(
+            load(host, port, pool, args.requests, args.concurrency, args.seed))
+        after = asyncio.run(get_json(host, port, '/stats'))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\n{args.requests:,} requests from {args.concurrency} clients, "
+          f"{sum(len(paths) for paths in pool.values())} distinct, in {seconds:.2f}s "
+          f"({args.requests / seconds:,.0f} req/s)")
+    print(f"{'Query':<26}{'Requests':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    print("-"*71)
+    for name in sorted(latencies):
+        print(f"{name:<26}{len(latencies[name]):>9,}" + "".join(f"{value:>9.2f}"
+                                                              for value in percentiles(latencies[name])))
+    overall = percentiles([value for values in latencies.values() for value in values])
+    print("-"*71)
+    print(f"{'all':<26}{args.requests:>9,}" + "".join(f"{value:>9.2f}" for value in overall))
+
+    counters = {key: after.get(key, 0) - before.get(key, 0)
+                for key in ('queries', 'cache_hits', 'batches', 'computed', 'coalesced')}
+    print(f"\nService: {counters['cache_hits']:,} of {counters['queries']:,} answered from the cache, "
+          f"{counters['computed']:,} computed in {counters['batches']:,} batches, "
+          f"{counters['coalesced']:,} coalesced")
+    for failure, count in failures.items():
+        print(f"  {count:,} failed: {failure}")
+
+    if failures:
+        return 1
+    if args.max_p99_ms is not None and overall[2] > args.max_p99_ms:
+        print(f"\np99 of {overall[2]:.2f} ms is above {args.max_p99_ms:.2f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
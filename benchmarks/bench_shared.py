@@ -0,0 +1,89 @@
+"""
+Shared memory-mapped snapshot versus a private copy per process.
+
+The file is cleaned (optionally replicated ``--scale`` times), written both as
+Parquet and as the shared Arrow IPC snapshot, and then opened by ``--readers``
+separate processes at once, as notebook kernels or pool workers would. For
+each format the table shows the time to open and the private (anonymous)
+memory each reader gained; mapped pages are shared through the page cache.
+Linux only, since the memory figures come from /proc.
+
+Usage:
+    python benchmarks/bench_shared.py path/to/car_prices.csv [--readers 4] [--scale 10]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from carprices.cleaning import clean
+from carprices.io import load_csv
+from carprices.shared import open_shared, private_memory_mb, write_shared
+
+
+def reader(path, fmt, barrier, queue):
+    anon_before, _ = private_memory_mb()
+    start = time.perf_counter()
+    df = open_shared(path) if fmt == 'arrow' else pd.read_parquet(path)
+    # Touch every numeric column, as a query would
+    df.select_dtypes('number').sum()
+    seconds = time.perf_counter() - start
+    anon_after, file_backed = private_memory_mb()
+    queue.put((seconds, anon_after - anon_before, file_backed))
+    # Hold the frame until every reader has loaded it
+    barrier.wait()
+
+
+def measure(path, fmt, readers):
+    context = mp.get_context('spawn')
+    barrier = context.Barrier(readers)
+    queue = context.Queue()
+    procs = [context.Process(target=reader, args=(path, fmt, barrier, queue)) for _ in range(readers)]
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='car_prices CSV file')
+    parser.add_argument('--readers', type=int, default=4, help='processes opening the snapshot at once')
+    parser.add_argument('--scale', type=int, default=1, help='replicate the cleaned rows this many times')
+    args = parser.parse_args()
+
+    df, _ = clean(load_csv(args.path))
+    if args.scale > 1:
+        df = pd.concat([df] * args.scale, ignore_index=True)
+    tmp_dir = tempfile.mkdtemp(prefix='carprices-shared-')
+    try:
+        paths = {'parquet': os.path.join(tmp_dir, 'cleaned.parquet'),
+                 'arrow': os.path.join(tmp_dir, 'cleaned.arrow')}
+        df.to_parquet(paths['parquet'], index=False)
+        write_shared(df, paths['arrow'])
+        in_memory = df.memory_usage(deep=True).sum() / 1024**2
+        print(f"{len(df):,} rows, {in_memory:,.1f} MB in memory; {args.readers} concurrent readers\n")
+        print(f"{'Format':<10}{'File (MB)':>11}{'Open (s)':>10}{'Private MB/reader':>19}{'Total private MB':>18}")
+        print("-"*68)
+        for fmt, path in paths.items():
+            results = measure(path, fmt, args.readers)
+            seconds = max(result[0] for result in results)
+            private = [result[1] for result in results]
+            print(f"{fmt:<10}{os.path.getsize(path) / 1024**2:>11.1f}{seconds:>10.3f}"
+                  f"{sum(private) / len(private):>19.1f}{sum(private):>18.1f}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
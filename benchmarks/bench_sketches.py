@@ -0,0 +1,45 @@
+"""
+Quantile-sketch accuracy: sketched versus exact medians, the 2.12 condition
+percentile, the 3.7 IQR quartiles and the per-color median price order.
+
+Usage:
+    python benchmarks/bench_sketches.py path/to/car_prices.csv [--k 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from carprices.io import load_csv
+from carprices.sketches import DEFAULT_K, accuracy_report, k_for_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='car_prices CSV file')
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help='sketch accuracy parameter')
+    parser.add_argument('--epsilon', type=float, help='target rank error (overrides --k)')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='rows per sketched batch')
+    args = parser.parse_args()
+
+    k = k_for_error(args.epsilon) if args.epsilon else args.k
+    df = load_csv(args.path)
+    start = time.perf_counter()
+    report, order_matches = accuracy_report(df, k=k, chunksize=args.chunksize)
+    seconds = time.perf_counter() - start
+
+    with pd.option_context('display.float_format', '{:,.4f}'.format, 'display.width', 140,
+                           'display.max_rows', 200, 'display.max_columns', None):
+        print(report)
+    print(f"\nk={k}: worst rank error {report['rank_error'].max():.4%} "
+          f"(bound {report['bound'].iloc[0]:.4%}); {len(df):,} rows sketched in {seconds:.2f}s")
+    print(f"Per-color median order matches exact: {order_matches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Startup cost of the command-line entry points, measured with ``-X importtime``.
+
+Each target is imported in a fresh interpreter a few times; the best
+cumulative import time is compared with its budget, and the plotting and
+scientific stacks must not be imported at all (charts import them on first
+use). Exits with status 1 if any target is over budget.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 900]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> import budget in milliseconds. numpy and pandas alone take about
+# half of it on a laptop.
+BUDGETS = {
+    'carprices.cli': 900,
+    'carprices.dataset': 900,
+    'carprices.report': 900,
+}
+
+# Packages a query-only or Task 2 run must not import
+LAZY_PACKAGES = ('matplotlib', 'seaborn', 'scipy')
+
+
+def import_profile(module):
+    """``(cumulative microseconds per module, top-level target time)`` for one import."""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                          capture_output=True, text=True, env=env, cwd=ROOT, check=True)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative, cumulative[module]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per target')
+    parser.add_argument('--budget-ms', type=float, help='override every budget')
+    parser.add_argument('--top', type=int, default=5, help='heaviest top-level packages to list')
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'Module':<22}{'Best (ms)':>11}{'Budget':>9}  Status")
+    print("-"*60)
+    for module, budget in BUDGETS.items():
+        budget = args.budget_ms or budget
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        cumulative, best = min(runs, key=lambda run: run[1])
+        eager = sorted({name.split('.')[0] for name in cumulative} & set(LAZY_PACKAGES))
+        ok = best / 1000 <= budget and not eager
+        failed |= not ok
+        status = 'ok' if ok else 'OVER BUDGET' if not eager else f"imports {', '.join(eager)}"
+        print(f"{module:<22}{best / 1000:>11.1f}{budget:>9.0f}  {status}")
+
+        packages = {name: us for name, us in cumulative.items()
+                    if '.' not in name and name != module.split('.')[0]}
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        print("    " + ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in heaviest))
+
+    print(f"\nStartup {'FAILED' if failed else 'passed'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Stage-by-stage scaling benchmark on synthetic data, with regression baselines.
+
+For each ``--rows`` size a synthetic car_prices CSV is generated (see
+``carprices.synthetic``; kept in ``--data-dir`` for reuse) and run through the
+report pipeline in a fresh process: load, clean (null handling and vocabulary
+encoding), dedup, the Task 1 missing-value blocks, a streaming dedup of the
+file, every Task 2/3 section and the chart rendering. Each stage reports its best wall time over ``--repeat``
+runs, rows per second and peak memory above the resident size it started at.
+Peak memory is read from the kernel's high-water mark, which is reset before
+each stage (Linux only; elsewhere it shows as nan).
+
+``--save-baseline`` stores the results in a JSON file. Later runs compare
+against it and flag every stage that is more than ``--tolerance`` slower or
+larger (ignoring differences below 10 ms and 16 MB). The script exits with
+status 1 when anything regressed. Baselines are machine-specific, so record
+them on the machine that runs the comparison.
+
+Usage:
+    python benchmarks/bench_suite.py [--rows 10K 100K 1M] [--save-baseline]
+    python benchmarks/bench_suite.py --rows 50M --data-dir /scratch/carprices --stages 2.5 3.7
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from carprices.charts import DEFAULT_TARGETS, render_charts
+from carprices.dataset import CarPriceDataset
+from carprices.dedup import dedup_file
+from carprices.missingness import missing_fractions
+from carprices.plotting import use_headless_backend
+from carprices.sections import SECTIONS, Section, run_sections, select_sections
+from carprices.synthetic import DEFAULT_SEED, write_csv
+
+BASELINE_VERSION = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_SIZES = ['10K', '100K', '1M']
+DEFAULT_TOLERANCE = 0.25
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.01
+MIN_MEMORY_MB = 16.0
+PIPELINE_STAGES = ['load', 'clean', 'missing', 'dedup', 'dedup-file']
+SUFFIXES = {'K': 1_000, 'M': 1_000_000}
+
+
+def parse_rows(text):
+    """'10K' -> 10000, '2.5M' -> 2500000, '5000' -> 5000."""
+    text = text.strip().upper()
+    scale = SUFFIXES.get(text[-1:], 1)
+    try:
+        rows = int(float(text[:-1] if scale > 1 else text) * scale)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid row count '{text}', expected e.g. 10K, 2.5M or 5000")
+    if rows < 1:
+        raise argparse.ArgumentTypeError(f"row count must be positive, got '{text}'")
+    return rows
+
+
+def format_rows(rows):
+    for suffix, scale in sorted(SUFFIXES.items(), key=lambda item: -item[1]):
+        if rows >= scale and rows % scale == 0:
+            return f"{rows // scale}{suffix}"
+    return str(rows)
+
+
+# ---------------------------------------------------------------------------
+# Peak memory
+# ---------------------------------------------------------------------------
+
+def _status_mb(*fields):
+    with open('/proc/self/status') as handle:
+        values = dict(line.split(':', 1) for line in handle if line.startswith(fields))
+    return [int(values[field].split()[0]) / 1024 for field in fields]
+
+
+def reset_peak():
+    """Reset the high-water mark and return the current resident size in MB."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as handle:
+            handle.write('5')
+        return _status_mb('VmRSS')[0]
+    except OSError:
+        return float('nan')
+
+
+def peak_since(start_mb):
+    """Peak resident size above ``start_mb`` since the last ``reset_peak``."""
+    try:
+        return max(_status_mb('VmHWM')[0] - start_mb, 0.0)
+    except OSError:
+        return float('nan')
+
+
+class Stages:
+    """Collects wall time and peak memory per stage."""
+
+    def __init__(self):
+        self.results = {}
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        start_mb = reset_peak()
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        self.results[name] = {'seconds': seconds, 'peak_mb': peak_since(start_mb)}
+
+    def wrap(self, section):
+        """``section`` with its function measured under the section's name."""
+        def measured(ctx):
+            with self.measure(section.name):
+                return section.func(ctx)
+        measured.__doc__ = section.func.__doc__
+        return Section(section.name, measured, section.task, section.deps)
+
+
+def stage_table(results, rows, baseline=None, tolerance=DEFAULT_TOLERANCE):
+    """Per-stage timings with throughput, and regressions against ``baseline``."""
+    frame = pd.DataFrame.from_dict(results, orient='index')
+    frame.index.name = 'stage'
+    frame['rows_per_s'] = rows / frame['seconds']
+    frame['base_seconds'] = float('nan')
+    frame['regressed'] = False
+    if baseline:
+        base = pd.DataFrame.from_dict(baseline, orient='index').reindex(frame.index)
+        frame['base_seconds'] = base['seconds']
+        frame['regressed'] = (
+            ((frame['seconds'] > base['seconds'] * (1 + tolerance))
+             & (frame['seconds'] - base['seconds'] > MIN_SECONDS))
+            | ((frame['peak_mb'] > base['peak_mb'] * (1 + tolerance))
+               & (frame['peak_mb'] - base['peak_mb'] > MIN_MEMORY_MB)))
+    return frame
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def synthetic_file(data_dir, rows, seed):
+    path = os.path.join(data_dir, f"synthetic-{format_rows(rows)}-seed{seed}.csv")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        write_csv(path, rows, seed)
+        print(f"Generated {rows:,} rows in {time.perf_counter() - start:.1f} s: {path}")
+    return path
+
+
+def run_pipeline(path, stages, output_dir):
+    """Run the pipeline on ``path`` and return ``{stage: {seconds, peak_mb}}``.
+
+    Load, clean, missing, dedup and dedup-file always run. ``stages``
+    limits the sections (plus their dependencies) and whether charts are
+    rendered.
+    """
+    record = Stages()
+    dataset = CarPriceDataset(path)
+    with record.measure('load'):
+        dataset.raw
+    with record.measure('clean'):
+        dataset.cleaning
+    with record.measure('missing'):
+        missing_fractions(dataset.raw)
+    with record.measure('dedup'):
+        dataset.df
+    # Only the cleaned frame is needed from here on
+    del dataset.raw
+    with record.measure('dedup-file'):
+        dedup_file(path)
+
+    render = stages is None or 'render' in stages
+    names = [name for name in stages or () if name not in PIPELINE_STAGES + ['render']]
+    if stages is None or (render and not names):
+        sections = SECTIONS
+    else:
+        sections = select_sections(names) if names else []
+    if sections:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_sections(dataset.df, output_dir, workers=1,
+                                   sections=[record.wrap(section) for section in sections])
+        charts = [spec for result in results for spec in result.charts]
+        if render and charts:
+            use_headless_backend()
+            with record.measure('render'):
+                render_charts(charts, output_dir, DEFAULT_TARGETS, workers=1, force=True)
+    # Report order, not execution order
+    order = PIPELINE_STAGES + [section.name for section in SECTIONS] + ['render']
+    return {name: record.results[name] for name in order if name in record.results}
+
+
+def _run_in_child(path, stages, output_dir, queue):
+    queue.put(run_pipeline(path, stages, output_dir))
+
+
+def measure(path, stages, output_dir, repeat=1):
+    """Best of ``repeat`` runs of ``run_pipeline``, each in a fresh process.
+
+    Fresh processes keep sizes and repeats from sharing allocator state.
+    Each stage keeps its lowest time and lowest peak.
+    """
+    context = mp.get_context('spawn')
+    best = {}
+    for _ in range(repeat):
+        queue = context.Queue()
+        proc = context.Process(target=_run_in_child, args=(path, stages, output_dir, queue))
+        proc.start()
+        results = queue.get()
+        proc.join()
+        for stage, values in results.items():
+            kept = best.setdefault(stage, values)
+            best[stage] = {key: min(kept[key], value) for key, value in values.items()}
+    return best
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as handle:
+        stored = json.load(handle)
+    if stored.get('version') != BASELINE_VERSION:
+        raise SystemExit(f"Baseline {path} has version {stored.get('version')}, expected {BASELINE_VERSION}")
+    return stored['sizes']
+
+
+def save_baseline(path, sizes):
+    stored = {'version': BASELINE_VERSION, 'python': platform.python_version(),
+              'pandas': pd.__version__, 'sizes': {**load_baseline(path), **sizes}}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as handle:
+        json.dump(stored, handle, indent=1)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', nargs='+', type=parse_rows, default=[parse_rows(size) for size in DEFAULT_SIZES],
+                        metavar='N', help=f"dataset sizes, e.g. 10K 2.5M 50M (default: {' '.join(DEFAULT_SIZES)})")
+    parser.add_argument('--stages', nargs='+', metavar='STAGE',
+                        help=f"sections or tasks to time (plus their dependencies) and/or render; "
+                             f"{', '.join(PIPELINE_STAGES)} always run (default: everything)")
+    parser.add_argument('--repeat', type=int, default=3, help='runs per size; the best time is kept')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='synthetic data seed')
+    parser.add_argument('--data-dir', help='keep generated files here (default: a temporary folder)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='slowdown or memory growth (fraction) flagged as a regression')
+    args = parser.parse_args()
+
+    try:
+        select_sections([stage for stage in args.stages or () if stage not in PIPELINE_STAGES + ['render']])
+    except KeyError as error:
+        parser.error(error.args[0])
+
+    baseline = load_baseline(args.baseline)
+    measured = {}
+    regressions = []
+    with tempfile.TemporaryDirectory(prefix='carprices-bench-') as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        os.makedirs(data_dir, exist_ok=True)
+        for rows in args.rows:
+            path = synthetic_file(data_dir, rows, args.seed)
+            output_dir = os.path.join(tmp_dir, f"out-{rows}")
+            os.makedirs(output_dir, exist_ok=True)
+            results = measure(path, args.stages, output_dir, args.repeat)
+            key = f"{format_rows(rows)}-seed{args.seed}"
+            measured[key] = results
+            table = stage_table(results, rows, baseline.get(key), args.tolerance)
+
+            print(f"\n{rows:,} rows ({os.path.getsize(path) / 1024**2:,.1f} MB CSV)")
+            print(f"{'Stage':<12}{'Seconds':>10}{'Rows/s':>14}{'Peak MB':>10}{'Baseline s':>12}{'Change':>9}")
+            print("-"*67)
+            for stage, row in table.iterrows():
+                base = row['base_seconds']
+                change = '' if pd.isna(base) else f"{row['seconds'] / base - 1:+.0%}"
+                flag = '  REGRESSION' if row['regressed'] else ''
+                print(f"{stage:<12}{row['seconds']:>10.3f}{row['rows_per_s']:>14,.0f}{row['peak_mb']:>10.1f}"
+                      f"{base:>12.3f}{change:>9}{flag}")
+                if row['regressed']:
+                    regressions.append(f"{key} {stage}")
+            total = table['seconds'].sum()
+            print(f"{'TOTAL':<12}{total:>10.3f}{rows / total:>14,.0f}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, measured)
+        print(f"\n✓ Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,708 +6,19 @@ Date: November 13, 2025
 
 This script performs comprehensive data analysis on used car listings dataset
 covering data ingestion, quality profiling, queries, and visualization.
-"""
-
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
-import warnings
-warnings.filterwarnings('ignore')
-
-# Set display options for better output
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', None)
-pd.set_option('display.max_colwidth', None)
-
-# Set style for visualizations
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-
-print("="*80)
-print("CAR PRICE DATA ANALYSIS - HERO VIRED ASSIGNMENT")
-print("="*80)
-print()
-
-# ============================================================================
-# TASK 1: DATA INGESTION & QUALITY PROFILING
-# ============================================================================
-
-print("\n" + "="*80)
-print("TASK 1: DATA INGESTION & QUALITY PROFILING")
-print("="*80)
-
-# 1.1 Load & Inspect
-print("\n1.1 LOAD & INSPECT")
-print("-"*80)
-
-# Read the CSV file (decompressed version)
-df = pd.read_csv('/home/claude/car_prices_decompressed.csv')
-
-print("\nFirst 5 rows of the dataset:")
-print(df.head())
-
-print("\n\nData Types and Record Count:")
-print(df.info())
-
-print(f"\n\nTotal Records: {len(df)}")
-
-# 1.2 Understanding the Data Structure
-print("\n\n1.2 UNDERSTANDING THE DATA STRUCTURE")
-print("-"*80)
-
-print(f"\nDataset Shape: {df.shape}")
-print(f"Number of Rows: {df.shape[0]}")
-print(f"Number of Columns: {df.shape[1]}")
-
-print("\n\nColumn Names and Data Types:")
-print(pd.DataFrame({
-    'Column Name': df.columns,
-    'Data Type': df.dtypes.values,
-    'Non-Null Count': df.count().values,
-    'Null Count': df.isnull().sum().values
-}))
-
-# 1.3 Missing & Anomaly Detection
-print("\n\n1.3 MISSING & ANOMALY DETECTION")
-print("-"*80)
-
-# Quantify nulls per column
-print("\nNull Values Per Column:")
-null_counts = df.isnull().sum()
-null_percentage = (df.isnull().sum() / len(df)) * 100
-null_df = pd.DataFrame({
-    'Column': df.columns,
-    'Null Count': null_counts.values,
-    'Null Percentage': null_percentage.values
-})
-null_df = null_df[null_df['Null Count'] > 0].sort_values('Null Count', ascending=False)
-print(null_df)
-
-# Visualize missing values
-plt.figure(figsize=(12, 6))
-null_counts_sorted = df.isnull().sum().sort_values(ascending=False)
-null_counts_sorted = null_counts_sorted[null_counts_sorted > 0]
-plt.bar(range(len(null_counts_sorted)), null_counts_sorted.values)
-plt.xticks(range(len(null_counts_sorted)), null_counts_sorted.index, rotation=45, ha='right')
-plt.ylabel('Number of Missing Values')
-plt.xlabel('Columns')
-plt.title('Missing Values by Column')
-plt.tight_layout()
-plt.savefig('/mnt/user-data/outputs/1_missing_values_bar.png', dpi=300, bbox_inches='tight')
-print("\n✓ Missing values bar chart saved as '1_missing_values_bar.png'")
-plt.close()
-
-# Create heatmap for missing values
-plt.figure(figsize=(12, 8))
-sns.heatmap(df.isnull(), cbar=True, yticklabels=False, cmap='viridis')
-plt.title('Missing Values Heatmap')
-plt.tight_layout()
-plt.savefig('/mnt/user-data/outputs/2_missing_values_heatmap.png', dpi=300, bbox_inches='tight')
-print("✓ Missing values heatmap saved as '2_missing_values_heatmap.png'")
-plt.close()
-
-# Resolve null values with appropriate strategies
-print("\n\nResolving Null Values...")
-
-# Store original shape for comparison
-original_shape = df.shape
-
-# Strategy: 
-# - For numerical columns with <5% nulls: fill with median
-# - For categorical columns with <5% nulls: fill with mode
-# - For columns with >30% nulls: consider dropping or special handling
-# - For 5-30% nulls: evaluate case by case
-
-for column in df.columns:
-    null_pct = (df[column].isnull().sum() / len(df)) * 100
-    
-    if null_pct > 0:
-        if null_pct > 30:
-            print(f"  - {column}: {null_pct:.2f}% nulls - Dropping column (too many missing values)")
-            df = df.drop(column, axis=1)
-        elif df[column].dtype in ['int64', 'float64']:
-            median_val = df[column].median()
-            df[column].fillna(median_val, inplace=True)
-            print(f"  - {column}: {null_pct:.2f}% nulls - Filled with median ({median_val})")
-        else:
-            mode_val = df[column].mode()[0] if not df[column].mode().empty else 'Unknown'
-            df[column].fillna(mode_val, inplace=True)
-            print(f"  - {column}: {null_pct:.2f}% nulls - Filled with mode ('{mode_val}')")
-
-print(f"\nShape after handling nulls: {df.shape}")
-
-# Count and delete duplicate records
-print("\n\nDuplicate Records:")
-duplicate_count = df.duplicated().sum()
-print(f"Number of duplicate records: {duplicate_count}")
-
-if duplicate_count > 0:
-    df = df.drop_duplicates()
-    print(f"✓ Deleted {duplicate_count} duplicate records")
-    print(f"New shape: {df.shape}")
-else:
-    print("✓ No duplicate records found")
-
-# Save cleaned dataset
-df.to_csv('/mnt/user-data/outputs/car_prices_cleaned.csv', index=False)
-print("\n✓ Cleaned dataset saved as 'car_prices_cleaned.csv'")
-
-# ============================================================================
-# TASK 2: DATA FRAMES QUERIES
-# ============================================================================
-
-print("\n\n" + "="*80)
-print("TASK 2: DATA FRAMES QUERIES")
-print("="*80)
-
-# 2.1 Calculate average, minimum, and maximum car price
-print("\n2.1 CAR PRICE STATISTICS")
-print("-"*80)
-
-# Check if sellingprice column exists
-price_column = None
-for col in df.columns:
-    if 'price' in col.lower() or 'selling' in col.lower():
-        price_column = col
-        break
-
-if price_column:
-    avg_price = df[price_column].mean()
-    min_price = df[price_column].min()
-    max_price = df[price_column].max()
-    
-    print(f"Average Car Price: ${avg_price:,.2f}")
-    print(f"Minimum Car Price: ${min_price:,.2f}")
-    print(f"Maximum Car Price: ${max_price:,.2f}")
-else:
-    print("Price column not found in dataset")
-
-# 2.2 List all unique colors
-print("\n\n2.2 UNIQUE CAR COLORS")
-print("-"*80)
-
-color_column = None
-for col in df.columns:
-    if 'color' in col.lower():
-        color_column = col
-        break
-
-if color_column:
-    unique_colors = df[color_column].unique()
-    print(f"Number of unique colors: {len(unique_colors)}")
-    print(f"Unique colors: {', '.join(map(str, unique_colors))}")
-else:
-    print("Color column not found in dataset")
-
-# 2.3 Find number of unique car brands and models
-print("\n\n2.3 UNIQUE BRANDS AND MODELS")
-print("-"*80)
-
-brand_column = None
-model_column = None
-
-for col in df.columns:
-    if 'make' in col.lower() or 'brand' in col.lower():
-        brand_column = col
-    if 'model' in col.lower() and 'year' not in col.lower():
-        model_column = col
-
-if brand_column:
-    unique_brands = df[brand_column].nunique()
-    print(f"Number of unique car brands: {unique_brands}")
-    print(f"Brands: {', '.join(map(str, df[brand_column].unique()[:10]))}...")
-else:
-    print("Brand column not found")
-
-if model_column:
-    unique_models = df[model_column].nunique()
-    print(f"\nNumber of unique car models: {unique_models}")
-    print(f"Sample models: {', '.join(map(str, df[model_column].unique()[:10]))}...")
-else:
-    print("Model column not found")
-
-# 2.4 Find cars with selling price > $165,000
-print("\n\n2.4 CARS WITH PRICE > $165,000")
-print("-"*80)
-
-if price_column:
-    high_price_cars = df[df[price_column] > 165000]
-    print(f"Number of cars with price > $165,000: {len(high_price_cars)}")
-    if len(high_price_cars) > 0:
-        print(f"\nSample records (first 5):")
-        print(high_price_cars.head())
-else:
-    print("Price column not found")
 
-# 2.5 Top 5 most frequently sold car models
-print("\n\n2.5 TOP 5 MOST FREQUENTLY SOLD CAR MODELS")
-print("-"*80)
+The analysis itself lives in the ``carprices`` package; this script is the
+command-line entry point and is equivalent to ``python -m carprices``:
 
-if model_column:
-    top_models = df[model_column].value_counts().head(5)
-    print(top_models)
-    print(f"\nMost popular model: {top_models.index[0]} ({top_models.values[0]} listings)")
-else:
-    print("Model column not found")
-
-# 2.6 Average selling price by brand
-print("\n\n2.6 AVERAGE SELLING PRICE BY BRAND (MAKE)")
-print("-"*80)
-
-if price_column and brand_column:
-    avg_price_by_brand = df.groupby(brand_column)[price_column].mean().sort_values(ascending=False)
-    print(avg_price_by_brand.head(10))
-else:
-    print("Required columns not found")
-
-# 2.7 Minimum selling price by interior
-print("\n\n2.7 MINIMUM SELLING PRICE BY INTERIOR")
-print("-"*80)
-
-interior_column = None
-for col in df.columns:
-    if 'interior' in col.lower():
-        interior_column = col
-        break
-
-if price_column and interior_column:
-    min_price_by_interior = df.groupby(interior_column)[price_column].min().sort_values()
-    print(min_price_by_interior)
-else:
-    print("Interior or price column not found")
-
-# 2.8 Highest odometer reading per year (highest to lowest)
-print("\n\n2.8 HIGHEST ODOMETER READING PER YEAR")
-print("-"*80)
-
-odometer_column = None
-year_column = None
-
-for col in df.columns:
-    if 'odometer' in col.lower() or 'mileage' in col.lower():
-        odometer_column = col
-    if 'year' in col.lower():
-        year_column = col
-
-if odometer_column and year_column:
-    max_odometer_by_year = df.groupby(year_column)[odometer_column].max().sort_values(ascending=False)
-    print(max_odometer_by_year.head(15))
-else:
-    print("Odometer or year column not found")
-
-# 2.9 Create new column for car age
-print("\n\n2.9 CREATE CAR AGE COLUMN")
-print("-"*80)
-
-if year_column:
-    df['car_age'] = 2025 - df[year_column]
-    print(f"✓ Created 'car_age' column")
-    print(f"\nCar age statistics:")
-    print(df['car_age'].describe())
-    print(f"\nSample data with car age:")
-    print(df[[year_column, 'car_age']].head(10))
-else:
-    print("Year column not found")
-
-# 2.10 Cars with condition >= 48 and odometer > 90000
-print("\n\n2.10 CARS WITH CONDITION >= 48 AND ODOMETER > 90000")
-print("-"*80)
-
-condition_column = None
-for col in df.columns:
-    if 'condition' in col.lower():
-        condition_column = col
-        break
-
-if condition_column and odometer_column:
-    filtered_cars = df[(df[condition_column] >= 48) & (df[odometer_column] > 90000)]
-    print(f"Number of cars matching criteria: {len(filtered_cars)}")
-    if len(filtered_cars) > 0:
-        print(f"\nSample records:")
-        print(filtered_cars.head())
-else:
-    print("Condition or odometer column not found")
-
-# 2.11 State with higher car prices for newer cars (year > 2013)
-print("\n\n2.11 STATE WITH HIGHER PRICES FOR NEWER CARS (YEAR > 2013)")
-print("-"*80)
-
-state_column = None
-for col in df.columns:
-    if 'state' in col.lower():
-        state_column = col
-        break
-
-if price_column and year_column and state_column:
-    newer_cars = df[df[year_column] > 2013]
-    avg_price_by_state = newer_cars.groupby(state_column)[price_column].mean().sort_values(ascending=False)
-    print(f"Top 10 states with highest average prices for newer cars:")
-    print(avg_price_by_state.head(10))
-    print(f"\nState with consistently higher prices: {avg_price_by_state.index[0]} (${avg_price_by_state.values[0]:,.2f})")
-else:
-    print("Required columns not found")
-
-# 2.12 Value for money - excellent condition cars with lowest average price
-print("\n\n2.12 VALUE FOR MONEY - TOP 20% CONDITION, LOWEST AVERAGE PRICE BY MAKE")
-print("-"*80)
-
-if condition_column and price_column and brand_column:
-    # Calculate 80th percentile for excellent condition
-    excellent_threshold = df[condition_column].quantile(0.80)
-    excellent_cars = df[df[condition_column] >= excellent_threshold]
-    
-    print(f"Excellent condition threshold (top 20%): {excellent_threshold}")
-    print(f"Number of cars with excellent condition: {len(excellent_cars)}")
-    
-    # Calculate average price by make for excellent condition cars
-    value_for_money = excellent_cars.groupby(brand_column)[price_column].mean().sort_values()
-    
-    print(f"\nTop 10 makes with lowest average price (best value for money):")
-    print(value_for_money.head(10))
-else:
-    print("Required columns not found")
-
-# ============================================================================
-# TASK 3: DATA VISUALIZATION AND INSIGHTS
-# ============================================================================
-
-print("\n\n" + "="*80)
-print("TASK 3: DATA VISUALIZATION AND INSIGHTS")
-print("="*80)
-
-# 3.1 Correlation matrix for numerical features
-print("\n3.1 CORRELATION OF NUMERICAL FEATURES")
-print("-"*80)
-
-numerical_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-print(f"Numerical columns: {', '.join(numerical_cols)}")
-
-if len(numerical_cols) > 1:
-    correlation_matrix = df[numerical_cols].corr()
-    
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(correlation_matrix, annot=True, fmt='.2f', cmap='coolwarm', 
-                center=0, square=True, linewidths=1, cbar_kws={"shrink": 0.8})
-    plt.title('Correlation Matrix of Numerical Features', fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig('/mnt/user-data/outputs/3_correlation_matrix.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Correlation matrix saved as '3_correlation_matrix.png'")
-    plt.close()
-    
-    print("\nKey correlations with selling price:")
-    if price_column in numerical_cols:
-        price_corr = correlation_matrix[price_column].sort_values(ascending=False)
-        print(price_corr)
-else:
-    print("Not enough numerical columns for correlation analysis")
-
-# 3.2 Average selling price by year
-print("\n\n3.2 AVERAGE SELLING PRICE BY YEAR")
-print("-"*80)
-
-if price_column and year_column:
-    avg_price_by_year = df.groupby(year_column)[price_column].mean().sort_index()
-    
-    plt.figure(figsize=(14, 6))
-    plt.plot(avg_price_by_year.index, avg_price_by_year.values, marker='o', 
-             linewidth=2, markersize=6, color='#2E86AB')
-    plt.xlabel('Year', fontsize=12, fontweight='bold')
-    plt.ylabel('Average Selling Price ($)', fontsize=12, fontweight='bold')
-    plt.title('Average Selling Price by Year', fontsize=14, fontweight='bold')
-    plt.grid(True, alpha=0.3)
-    plt.xticks(rotation=45)
-    
-    # Add trend line
-    z = np.polyfit(avg_price_by_year.index, avg_price_by_year.values, 1)
-    p = np.poly1d(z)
-    plt.plot(avg_price_by_year.index, p(avg_price_by_year.index), 
-             "--", color='red', alpha=0.8, label='Trend Line')
-    plt.legend()
-    
-    plt.tight_layout()
-    plt.savefig('/mnt/user-data/outputs/4_price_by_year.png', dpi=300, bbox_inches='tight')
-    print("✓ Graph saved as '4_price_by_year.png'")
-    plt.close()
-    
-    print("\nINSIGHTS:")
-    print("- Line plot is chosen because it effectively shows trends over continuous time periods")
-    print("- The graph shows how average car prices change across different model years")
-    print(f"- Price range: ${avg_price_by_year.min():,.2f} to ${avg_price_by_year.max():,.2f}")
-    
-    # Calculate year-over-year change
-    pct_change = ((avg_price_by_year.iloc[-1] - avg_price_by_year.iloc[0]) / avg_price_by_year.iloc[0]) * 100
-    print(f"- Overall price change from {avg_price_by_year.index[0]} to {avg_price_by_year.index[-1]}: {pct_change:.2f}%")
-else:
-    print("Required columns not found")
-
-# 3.3 Average selling price by odometer
-print("\n\n3.3 AVERAGE SELLING PRICE BY ODOMETER")
-print("-"*80)
-
-if price_column and odometer_column:
-    # Create bins for odometer readings
-    df['odometer_bin'] = pd.cut(df[odometer_column], bins=20)
-    avg_price_by_odometer = df.groupby('odometer_bin')[price_column].mean()
-    
-    # Get bin centers for plotting
-    bin_centers = [interval.mid for interval in avg_price_by_odometer.index]
-    
-    plt.figure(figsize=(14, 6))
-    plt.scatter(bin_centers, avg_price_by_odometer.values, alpha=0.6, s=100, color='#A23B72')
-    plt.plot(bin_centers, avg_price_by_odometer.values, alpha=0.4, linewidth=2, color='#A23B72')
-    plt.xlabel('Odometer Reading', fontsize=12, fontweight='bold')
-    plt.ylabel('Average Selling Price ($)', fontsize=12, fontweight='bold')
-    plt.title('Average Selling Price by Odometer Reading', fontsize=14, fontweight='bold')
-    plt.grid(True, alpha=0.3)
-    
-    # Format x-axis labels
-    ax = plt.gca()
-    ax.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{int(x/1000)}K'))
-    
-    plt.tight_layout()
-    plt.savefig('/mnt/user-data/outputs/5_price_by_odometer.png', dpi=300, bbox_inches='tight')
-    print("✓ Graph saved as '5_price_by_odometer.png'")
-    plt.close()
-    
-    print("\nINSIGHTS:")
-    print("- Clear negative correlation between odometer reading and selling price")
-    print("- As mileage increases, the average selling price decreases")
-    print("- This is expected as higher mileage indicates more wear and tear")
-    print("- The steepest decline typically occurs in the lower mileage ranges")
-    
-    # Drop temporary column
-    df = df.drop('odometer_bin', axis=1)
-else:
-    print("Required columns not found")
-
-# 3.4 Number of cars sold by state
-print("\n\n3.4 NUMBER OF CARS SOLD BY STATE")
-print("-"*80)
-
-if state_column:
-    cars_by_state = df[state_column].value_counts()
-    
-    plt.figure(figsize=(16, 8))
-    plt.bar(range(len(cars_by_state)), cars_by_state.values, color='#F18F01')
-    plt.xlabel('State', fontsize=12, fontweight='bold')
-    plt.ylabel('Number of Cars', fontsize=12, fontweight='bold')
-    plt.title('Number of Cars Sold by State', fontsize=14, fontweight='bold')
-    plt.xticks(range(len(cars_by_state)), cars_by_state.index, rotation=45, ha='right')
-    plt.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    plt.savefig('/mnt/user-data/outputs/6_cars_by_state.png', dpi=300, bbox_inches='tight')
-    print("✓ Graph saved as '6_cars_by_state.png'")
-    plt.close()
-    
-    print(f"\nTop 3 states with highest car sales:")
-    for i, (state, count) in enumerate(cars_by_state.head(3).items(), 1):
-        print(f"{i}. {state}: {count} cars ({count/len(df)*100:.2f}%)")
-else:
-    print("State column not found")
-
-# 3.5 Average selling price by condition score ranges (size 5)
-print("\n\n3.5 AVERAGE SELLING PRICE BY CONDITION SCORE RANGES (SIZE 5)")
-print("-"*80)
-
-if price_column and condition_column:
-    # Create bins of size 5
-    min_condition = df[condition_column].min()
-    max_condition = df[condition_column].max()
-    bins = range(int(min_condition), int(max_condition) + 6, 5)
-    
-    df['condition_range'] = pd.cut(df[condition_column], bins=bins)
-    avg_price_by_condition = df.groupby('condition_range')[price_column].mean()
-    
-    plt.figure(figsize=(12, 6))
-    bars = plt.bar(range(len(avg_price_by_condition)), avg_price_by_condition.values, 
-                   color='#06A77D', alpha=0.8, edgecolor='black')
-    plt.xlabel('Condition Score Range', fontsize=12, fontweight='bold')
-    plt.ylabel('Average Selling Price ($)', fontsize=12, fontweight='bold')
-    plt.title('Average Selling Price by Condition Score Ranges', fontsize=14, fontweight='bold')
-    plt.xticks(range(len(avg_price_by_condition)), 
-               [str(x) for x in avg_price_by_condition.index], rotation=45, ha='right')
-    plt.grid(True, alpha=0.3, axis='y')
-    
-    # Add value labels on bars
-    for bar in bars:
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height,
-                f'${height:,.0f}', ha='center', va='bottom', fontsize=9)
-    
-    plt.tight_layout()
-    plt.savefig('/mnt/user-data/outputs/7_price_by_condition_ranges.png', dpi=300, bbox_inches='tight')
-    print("✓ Graph saved as '7_price_by_condition_ranges.png'")
-    plt.close()
-    
-    print("\nINSIGHTS:")
-    print("- Strong positive correlation between condition score and selling price")
-    print("- Cars in better condition (higher scores) command significantly higher prices")
-    print("- Price increases progressively as condition improves")
-    print(f"- Price difference between lowest and highest condition: ${avg_price_by_condition.max() - avg_price_by_condition.min():,.2f}")
-    print("- Buyers are willing to pay premium for well-maintained vehicles")
-    
-    # Drop temporary column
-    df = df.drop('condition_range', axis=1)
-else:
-    print("Required columns not found")
-
-# 3.6 Number of cars sold by condition ranges (size 10)
-print("\n\n3.6 NUMBER OF CARS SOLD BY CONDITION RANGES (SIZE 10)")
-print("-"*80)
-
-if condition_column:
-    # Create bins of size 10
-    min_condition = df[condition_column].min()
-    max_condition = df[condition_column].max()
-    bins = range(int(min_condition), int(max_condition) + 11, 10)
-    
-    df['condition_range_10'] = pd.cut(df[condition_column], bins=bins)
-    cars_by_condition = df['condition_range_10'].value_counts().sort_index()
-    
-    plt.figure(figsize=(12, 6))
-    bars = plt.bar(range(len(cars_by_condition)), cars_by_condition.values, 
-                   color='#C73E1D', alpha=0.8, edgecolor='black')
-    plt.xlabel('Condition Score Range', fontsize=12, fontweight='bold')
-    plt.ylabel('Number of Cars', fontsize=12, fontweight='bold')
-    plt.title('Number of Cars Sold by Condition Ranges (Size 10)', fontsize=14, fontweight='bold')
-    plt.xticks(range(len(cars_by_condition)), 
-               [str(x) for x in cars_by_condition.index], rotation=45, ha='right')
-    plt.grid(True, alpha=0.3, axis='y')
-    
-    # Add value labels on bars
-    for bar in bars:
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height,
-                f'{int(height)}', ha='center', va='bottom', fontsize=9)
-    
-    plt.tight_layout()
-    plt.savefig('/mnt/user-data/outputs/8_cars_by_condition_ranges.png', dpi=300, bbox_inches='tight')
-    print("✓ Graph saved as '8_cars_by_condition_ranges.png'")
-    plt.close()
-    
-    print("\nINSIGHTS:")
-    print("- Distribution shows the concentration of cars across condition ranges")
-    print(f"- Most cars fall in the condition range: {cars_by_condition.idxmax()}")
-    print(f"- Peak volume: {cars_by_condition.max()} cars")
-    print("- This indicates the typical condition of cars in the used car market")
-    print("- Lower condition ranges may indicate older vehicles or those needing repairs")
-    print("- Higher condition ranges represent well-maintained or newer vehicles")
-    
-    # Drop temporary column
-    df = df.drop('condition_range_10', axis=1)
-else:
-    print("Condition column not found")
-
-# 3.7 Box plot for price distribution by color
-print("\n\n3.7 PRICE DISTRIBUTION BY COLOR (BOX PLOT)")
-print("-"*80)
-
-if price_column and color_column:
-    # Remove rows with missing colors for cleaner visualization
-    df_color = df[df[color_column].notna()].copy()
-    
-    # Create initial box plot
-    plt.figure(figsize=(14, 6))
-    
-    # Get unique colors and sort by median price
-    color_order = df_color.groupby(color_column)[price_column].median().sort_values(ascending=False).index
-    
-    sns.boxplot(data=df_color, x=color_column, y=price_column, order=color_order, palette='Set2')
-    plt.xlabel('Color', fontsize=12, fontweight='bold')
-    plt.ylabel('Selling Price ($)', fontsize=12, fontweight='bold')
-    plt.title('Distribution of Car Prices by Color (With Outliers)', fontsize=14, fontweight='bold')
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    plt.savefig('/mnt/user-data/outputs/9_price_by_color_with_outliers.png', dpi=300, bbox_inches='tight')
-    print("✓ Graph with outliers saved as '9_price_by_color_with_outliers.png'")
-    plt.close()
-    
-    print("\nINSIGHTS (With Outliers):")
-    print("- Significant outliers present across most colors")
-    print("- Outliers represent luxury or rare vehicles with exceptionally high prices")
-    print("- Wide price ranges indicate diverse vehicle types within each color")
-    
-    # Calculate IQR and remove outliers
-    Q1 = df_color[price_column].quantile(0.25)
-    Q3 = df_color[price_column].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-    
-    df_color_no_outliers = df_color[(df_color[price_column] >= lower_bound) & 
-                                     (df_color[price_column] <= upper_bound)]
-    
-    outliers_removed = len(df_color) - len(df_color_no_outliers)
-    print(f"\n✓ Removed {outliers_removed} outliers ({outliers_removed/len(df_color)*100:.2f}% of data)")
-    
-    # Create box plot without outliers
-    plt.figure(figsize=(14, 6))
-    sns.boxplot(data=df_color_no_outliers, x=color_column, y=price_column, 
-                order=color_order, palette='Set2')
-    plt.xlabel('Color', fontsize=12, fontweight='bold')
-    plt.ylabel('Selling Price ($)', fontsize=12, fontweight='bold')
-    plt.title('Distribution of Car Prices by Color (Without Outliers)', fontsize=14, fontweight='bold')
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    plt.savefig('/mnt/user-data/outputs/10_price_by_color_without_outliers.png', dpi=300, bbox_inches='tight')
-    print("✓ Graph without outliers saved as '10_price_by_color_without_outliers.png'")
-    plt.close()
-    
-    print("\nINSIGHTS (Without Outliers):")
-    print("- Clearer view of typical price distributions after removing extreme values")
-    
-    # Calculate statistics by color
-    color_stats = df_color_no_outliers.groupby(color_column)[price_column].agg(['median', 'mean', 'std'])
-    color_stats = color_stats.sort_values('median', ascending=False)
-    print("\nPrice statistics by color (without outliers):")
-    print(color_stats)
-    
-    print(f"\n- Highest median price color: {color_stats.index[0]} (${color_stats['median'].iloc[0]:,.2f})")
-    print(f"- Lowest median price color: {color_stats.index[-1]} (${color_stats['median'].iloc[-1]:,.2f})")
-    print("- Color preferences may reflect market demand and perceived value")
-    print("- Certain colors (e.g., white, black) often command higher resale values")
-else:
-    print("Required columns not found")
-
-# ============================================================================
-# SUMMARY REPORT
-# ============================================================================
-
-print("\n\n" + "="*80)
-print("ANALYSIS SUMMARY REPORT")
-print("="*80)
-
-print(f"""
-Dataset Overview:
-- Total Records: {len(df):,}
-- Total Features: {len(df.columns)}
-- Date Range: {df[year_column].min()} - {df[year_column].max() if year_column else 'N/A'}
-
-Key Findings:
-1. Price Analysis: Average price is ${df[price_column].mean():,.2f} with significant variation
-2. Condition Impact: Strong positive correlation between condition and price
-3. Mileage Effect: Clear negative correlation between odometer reading and price
-4. Market Distribution: Concentrated in top 3 states
-5. Popular Models: Top models show clear market preferences
-6. Color Preferences: Some colors command premium prices
+    python car_price_analysis.py car_prices.csv.gz --output outputs
+    python car_price_analysis.py car_prices.csv --sections 2.5 3.7
+    python car_price_analysis.py car_prices.csv --query top_models
+    python car_price_analysis.py --list
+"""
 
-Data Quality:
-- Missing values handled appropriately based on percentage and data type
-- Duplicate records removed
-- Outliers identified and handled for visualization clarity
+import sys
 
-All visualizations have been saved to the outputs folder.
-""")
+from carprices.cli import main
 
-print("\n" + "="*80)
-print("ANALYSIS COMPLETE!")
-print("="*80)
-print("\nAll outputs saved to: /mnt/user-data/outputs/")
-print("- Cleaned dataset: car_prices_cleaned.csv")
-print("- 10 visualization files (PNG format)")
-print("\nThank you for using this analysis tool!")
-print("="*80)
+if __name__ == '__main__':
+    sys.exit(main())
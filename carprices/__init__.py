@@ -0,0 +1,29 @@
+"""
+Car price analysis toolkit.
+
+Reusable building blocks behind ``car_price_analysis.py``: typed (optionally
+compressed) ingestion of the car_prices auction export, cleaning, and the
+aggregation engines the analysis sections share.
+"""
+
+from carprices.schema import COLUMNS, CATEGORICAL_COLUMNS, NUMERIC_DTYPES
+from carprices.cleaning import CleaningPolicy, clean, null_profile
+from carprices.chunked import Task2Aggregator, task2_chunked, task2_in_memory
+from carprices.io import ReadStats, iter_chunks, iter_frame_chunks, load_csv, open_source
+
+__all__ = [
+    'COLUMNS',
+    'CATEGORICAL_COLUMNS',
+    'CleaningPolicy',
+    'NUMERIC_DTYPES',
+    'ReadStats',
+    'Task2Aggregator',
+    'clean',
+    'iter_chunks',
+    'iter_frame_chunks',
+    'load_csv',
+    'null_profile',
+    'open_source',
+    'task2_chunked',
+    'task2_in_memory',
+]
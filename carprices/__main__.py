@@ -0,0 +1,7 @@
+"""``python -m carprices``: run the car price report from the command line."""
+
+import sys
+
+from carprices.cli import main
+
+sys.exit(main())
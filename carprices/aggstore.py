@@ -0,0 +1,294 @@
+"""
+Persistent, incrementally updated aggregate store.
+
+Every average, minimum, maximum and count in Tasks 2 and 3 can be derived
+from a few small tables of partial aggregates: per group, the row count and
+the count, sum, min and max of each numeric column. ``AggregateStore`` keeps
+those tables on disk (one Parquet file per grouping) and folds each new batch
+of sales into them, so a nightly refresh costs a groupby over the new rows
+plus a merge over the existing group keys, however long the history is.
+
+Batches are append-only and identified by a content hash (or an explicit
+id); applying the same batch twice is a no-op. Each batch is encoded with
+the store's own vocabulary (``carprices.vocab``) first, so spelling
+variants that first appear in later batches join the existing groups.
+``verify`` recomputes the partials from a full frame and reports any
+difference.
+
+The groupings are make, model, interior, state, year, color, raw condition
+score, odometer in fixed 10,000-mile bins, (state, year) for 2.11 and
+(make, condition) for 2.12. Condition ranges of any width are derived from
+the raw condition scores, so they stay exact.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from carprices.chunked import EXCELLENT_QUANTILE, NEWER_CAR_YEAR, TOP_MODELS, TOP_STATES, _plain_index, \
+    _sorted_counts, quantile_from_counts
+from carprices.dedup import row_hashes
+from carprices.histogram import Bins
+from carprices.io import pyarrow_available
+from carprices.vocab import VOCAB_FILE, VocabularyStore
+
+STORE_VERSION = 2
+MANIFEST = 'manifest.json'
+ODOMETER_BIN_WIDTH = 10_000
+
+VALUE_COLUMNS = ['sellingprice', 'odometer', 'condition', 'mmr']
+
+# Partial table name -> key columns ('all' is a single global group)
+DIMENSIONS = {
+    'all': (),
+    'make': ('make',),
+    'model': ('model',),
+    'interior': ('interior',),
+    'state': ('state',),
+    'year': ('year',),
+    'color': ('color',),
+    'condition': ('condition',),
+    'odometer_bin': ('odometer_bin',),
+    'state_year': ('state', 'year'),
+    'make_condition': ('make', 'condition'),
+}
+
+STATISTICS = ('count', 'sum', 'min', 'max')
+
+
+def _key(df, column):
+    if column == 'odometer_bin':
+        return (df['odometer'].astype('float64') // ODOMETER_BIN_WIDTH * ODOMETER_BIN_WIDTH).rename(column)
+    return df[column]
+
+
+def compute_partials(df):
+    """Partial-aggregate tables for ``df``, keyed by dimension name."""
+    values = [column for column in VALUE_COLUMNS if column in df.columns]
+    frame = df[values].astype('float64')
+    tables = {}
+    for name, keys in DIMENSIONS.items():
+        needed = ['odometer' if key == 'odometer_bin' else key for key in keys]
+        if any(column not in df.columns for column in needed):
+            continue
+        by = [_key(df, key) for key in keys] or [pd.Series(0, index=df.index, name='all')]
+        grouped = frame.groupby(by, observed=True)
+        parts = [grouped.size().rename('rows').to_frame()]
+        parts += [getattr(grouped, stat)().add_suffix(f"_{stat}") for stat in STATISTICS]
+        table = pd.concat(parts, axis=1)
+        table.index = _plain_index(table['rows']).index
+        tables[name] = table
+    return tables
+
+
+def _merge_table(left, right):
+    if left is None:
+        return right
+    combined = pd.concat([left, right])
+    grouped = combined.groupby(level=list(range(combined.index.nlevels)))
+    additive = [c for c in combined.columns if c == 'rows' or c.endswith(('_count', '_sum'))]
+    merged = pd.concat([
+        grouped[additive].sum(),
+        grouped[[c for c in combined.columns if c.endswith('_min')]].min(),
+        grouped[[c for c in combined.columns if c.endswith('_max')]].max(),
+    ], axis=1)[combined.columns]
+    merged['rows'] = merged['rows'].astype('int64')
+    return merged
+
+
+def merge_partials(left, right):
+    """Combine two ``compute_partials`` results."""
+    return {name: _merge_table(left.get(name), right.get(name)) for name in set(left) | set(right)}
+
+
+def batch_digest(df):
+    """Content hash of a batch's rows, used as its default id."""
+    return hashlib.blake2b(row_hashes(df).tobytes(), digest_size=16).hexdigest()
+
+
+class AggregateStore:
+    """Directory of partial-aggregate tables plus a manifest of applied batches.
+
+    Parameters
+    ----------
+    store_dir : str or path-like
+        Where the tables live; created on first write.
+    """
+
+    def __init__(self, store_dir):
+        if not pyarrow_available():
+            raise ImportError("The aggregate store requires pyarrow")
+        self.store_dir = str(store_dir)
+        self.manifest = self._read_manifest()
+        self.vocabulary = VocabularyStore(os.path.join(self.store_dir, VOCAB_FILE))
+        self.tables = {name: pd.read_parquet(self._table_path(name))
+                       for name in self.manifest['tables']}
+
+    # -- persistence --------------------------------------------------------
+
+    def _table_path(self, name):
+        return os.path.join(self.store_dir, f"partials-{name}.parquet")
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.store_dir, MANIFEST)) as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return {'version': STORE_VERSION, 'rows': 0, 'tables': [], 'batches': []}
+        if manifest.get('version') != STORE_VERSION:
+            raise ValueError(f"Aggregate store {self.store_dir} has version {manifest.get('version')}, "
+                             f"expected {STORE_VERSION}; rebuild it from the full dataset")
+        return manifest
+
+    def _save(self, names):
+        os.makedirs(self.store_dir, exist_ok=True)
+        for name in names:
+            path = self._table_path(name)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            self.tables[name].to_parquet(tmp)
+            os.replace(tmp, path)
+        self.vocabulary.save()
+        # The manifest goes last, so a crash never records a half-applied batch
+        self.manifest['tables'] = sorted(self.tables)
+        path = os.path.join(self.store_dir, MANIFEST)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as handle:
+            json.dump(self.manifest, handle, indent=2)
+        os.replace(tmp, path)
+
+    # -- updates ------------------------------------------------------------
+
+    @property
+    def rows(self):
+        return self.manifest['rows']
+
+    def applied(self, batch_id):
+        return any(batch['id'] == batch_id for batch in self.manifest['batches'])
+
+    def apply(self, delta, batch_id=None):
+        """Fold a batch of new (cleaned) sales into the store.
+
+        Returns False, without changing anything, if the batch was already
+        applied.
+        """
+        batch_id = batch_id or batch_digest(delta)
+        if self.applied(batch_id):
+            return False
+        start = time.perf_counter()
+        self.tables = merge_partials(self.tables, compute_partials(self.vocabulary.encode_frame(delta)))
+        self.manifest['rows'] += len(delta)
+        self.manifest['batches'].append({
+            'id': batch_id,
+            'rows': len(delta),
+            'applied_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seconds': round(time.perf_counter() - start, 4),
+        })
+        self._save(self.tables)
+        return True
+
+    # -- results ------------------------------------------------------------
+
+    def _mean(self, name, column='sellingprice'):
+        table = self.tables[name]
+        return (table[f"{column}_sum"] / table[f"{column}_count"]).dropna()
+
+    def condition_ranges(self, width):
+        """Rows and price sum/count per condition range, binned like sections 3.5/3.6."""
+        table = self.tables['condition']
+        conditions = table.index.to_numpy(dtype='float64')
+        bins = Bins.fixed_width(conditions.min(), conditions.max(), width)
+        codes = bins.assign(conditions)
+        inside = codes >= 0
+        sums = {column: np.bincount(codes[inside], weights=table[column].to_numpy(dtype='float64')[inside],
+                                    minlength=len(bins))
+                for column in ('rows', 'sellingprice_sum', 'sellingprice_count')}
+        ranges = pd.DataFrame(sums, index=pd.Index(bins.labels, name='condition'))
+        return ranges.astype({'rows': 'int64', 'sellingprice_count': 'int64'})
+
+    def results(self):
+        """Task 2 and Task 3 tables derived from the stored partials."""
+        overall = self.tables['all'].iloc[0]
+        condition_counts = self.tables['condition']['rows']
+        threshold = quantile_from_counts(condition_counts, EXCELLENT_QUANTILE)
+        make_condition = self.tables['make_condition']
+        excellent = make_condition[make_condition.index.get_level_values(1) >= threshold].groupby(level=0).sum()
+        state_year = self.tables['state_year']
+        newer = state_year[state_year.index.get_level_values(1) > NEWER_CAR_YEAR].groupby(level=0).sum()
+        range_5 = self.condition_ranges(5)
+
+        return {
+            'rows': self.rows,
+            'price_stats': {
+                'count': int(overall['sellingprice_count']),
+                'mean': overall['sellingprice_sum'] / overall['sellingprice_count'],
+                'min': overall['sellingprice_min'],
+                'max': overall['sellingprice_max'],
+            },
+            'distinct_makes': len(self.tables['make']),
+            'distinct_models': len(self.tables['model']),
+            'top_models': _sorted_counts(self.tables['model']['rows']).head(TOP_MODELS),
+            'top_states': _sorted_counts(self.tables['state']['rows']).head(TOP_STATES),
+            'avg_price_by_make': self._mean('make').sort_values(ascending=False),
+            'min_price_by_interior': self.tables['interior']['sellingprice_min'].dropna().sort_values(),
+            'max_odometer_by_year': self.tables['year']['odometer_max'].dropna().sort_values(ascending=False),
+            'avg_price_by_state_newer': (newer['sellingprice_sum'] / newer['sellingprice_count'])
+                                        .dropna().sort_values(ascending=False),
+            'excellent_threshold': threshold,
+            'excellent_count': int(condition_counts[condition_counts.index >= threshold].sum()),
+            'value_for_money': (excellent['sellingprice_sum'] / excellent['sellingprice_count'])
+                               .dropna().sort_values(),
+            'avg_price_by_year': self._mean('year').sort_index(),
+            'avg_price_by_odometer_bin': self._mean('odometer_bin').sort_index(),
+            'state_counts': _sorted_counts(self.tables['state']['rows']),
+            'avg_price_by_condition_5': range_5['sellingprice_sum'] / range_5['sellingprice_count'],
+            'cars_by_condition_10': self.condition_ranges(10)['rows'],
+            'avg_price_by_color': self._mean('color').sort_values(ascending=False),
+        }
+
+    # -- verification -------------------------------------------------------
+
+    def verify(self, df, rtol=1e-9):
+        """Compare the stored partials with a full recompute over ``df``.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Per table: group counts, whether keys and counts match exactly,
+            the largest relative difference of sums/min/max, and ``ok``.
+        """
+        full = compute_partials(self.vocabulary.encode_frame(df))
+        rows = []
+        for name in sorted(set(full) | set(self.tables)):
+            stored = self.tables.get(name)
+            expected = full.get(name)
+            if stored is None or expected is None:
+                rows.append({'table': name, 'stored_groups': None if stored is None else len(stored),
+                             'full_groups': None if expected is None else len(expected),
+                             'counts_match': False, 'max_rel_diff': np.nan, 'ok': False})
+                continue
+            stored = stored.sort_index()
+            expected = expected.sort_index()
+            keys_match = stored.index.equals(expected.index)
+            counts = [c for c in expected.columns if c == 'rows' or c.endswith('_count')]
+            counts_match = keys_match and all((stored[c].to_numpy() == expected[c].to_numpy()).all()
+                                              for c in counts)
+            max_rel_diff = np.nan
+            if keys_match:
+                others = [c for c in expected.columns if c not in counts]
+                a = stored[others].to_numpy(dtype='float64')
+                b = expected[others].to_numpy(dtype='float64')
+                scale = np.maximum(np.abs(b), 1.0)
+                diff = np.where(np.isnan(a) & np.isnan(b), 0.0, np.abs(a - b) / scale)
+                max_rel_diff = float(np.nanmax(diff)) if diff.size else 0.0
+            rows.append({'table': name, 'stored_groups': len(stored), 'full_groups': len(expected),
+                         'counts_match': counts_match, 'max_rel_diff': max_rel_diff,
+                         'ok': counts_match and max_rel_diff <= rtol})
+        report = pd.DataFrame(rows).set_index('table')
+        report.loc['(rows)'] = {'stored_groups': self.rows, 'full_groups': len(df),
+                                'counts_match': self.rows == len(df), 'max_rel_diff': 0.0,
+                                'ok': self.rows == len(df)}
+        return report
@@ -0,0 +1,148 @@
+"""
+Pre-aggregated box-plot statistics.
+
+``sns.boxplot`` receives every raw row, recomputes the quartiles per box and
+draws every outlier as its own marker. ``GroupedBoxStats`` instead sorts the
+values once by (group, value); each group is then a contiguous sorted slice,
+so quartiles, whiskers and outliers come straight from index arithmetic and
+``searchsorted``. Restricting the plot to a value range (such as IQR outlier
+bounds) narrows each slice instead of filtering a copy of the frame, so the
+with- and without-outlier plots share the same single aggregation.
+
+The per-box dictionaries are in the format ``Axes.bxp`` draws, with the
+outliers capped at ``max_fliers`` evenly spaced points per box (always
+including the most extreme ones).
+"""
+
+import numpy as np
+import pandas as pd
+
+from carprices.planner import factorize
+
+DEFAULT_MAX_FLIERS = 200
+
+
+def _quantiles(sorted_values, q):
+    """Linear-interpolated quantiles of an ascending array, like ``np.quantile``."""
+    return np.quantile(sorted_values, q) if len(sorted_values) else np.full(np.shape(q), np.nan)
+
+
+def _cap(fliers, max_fliers):
+    if max_fliers is None or len(fliers) <= max_fliers:
+        return fliers
+    return fliers[np.linspace(0, len(fliers) - 1, max_fliers).round().astype(np.int64)]
+
+
+class GroupedBoxStats:
+    """Quartiles, whiskers and outliers of ``value`` for every group of ``key``.
+
+    Parameters
+    ----------
+    keys : pandas.Series
+        Group labels; rows with a null key are ignored.
+    values : pandas.Series
+        Numeric values aligned with ``keys``; nulls are ignored.
+    whis : float
+        Whisker reach as a multiple of the IQR (matplotlib's default 1.5).
+    max_fliers : int, optional
+        Most outlier points kept per box; None keeps them all.
+    """
+
+    def __init__(self, keys, values, whis=1.5, max_fliers=DEFAULT_MAX_FLIERS):
+        codes, labels = factorize(keys)
+        has_key = codes >= 0
+        values = values.to_numpy(dtype='float64', na_value=np.nan)
+        valid = has_key & ~np.isnan(values)
+        codes = codes[valid]
+        values = values[valid]
+
+        order = np.lexsort((values, codes))
+        self.values = values[order]
+        counts = np.bincount(codes, minlength=len(labels))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.labels = pd.Index(np.asarray(labels))
+        # Rows with a key, including those with a null value
+        self.rows = int(has_key.sum())
+        self.whis = whis
+        self.max_fliers = max_fliers
+
+    def _slice(self, i, lower=None, upper=None):
+        group = self.values[self.offsets[i]:self.offsets[i + 1]]
+        start = 0 if lower is None else np.searchsorted(group, lower, side='left')
+        stop = len(group) if upper is None else np.searchsorted(group, upper, side='right')
+        return group[start:stop]
+
+    def quantile(self, q):
+        """Quantile(s) of all values regardless of group."""
+        return np.quantile(self.values, q)
+
+    def count(self, lower=None, upper=None):
+        """Number of values within ``[lower, upper]`` across all groups."""
+        return sum(len(self._slice(i, lower, upper)) for i in range(len(self.labels)))
+
+    def medians(self):
+        """Median per observed group, as a Series."""
+        data = {label: _quantiles(self._slice(i), 0.5) for i, label in enumerate(self.labels)
+                if self.offsets[i + 1] > self.offsets[i]}
+        return pd.Series(data, dtype='float64')
+
+    def order_by_median(self, ascending=False):
+        """Observed group labels sorted by median, highest first by default."""
+        return self.medians().sort_values(ascending=ascending).index
+
+    def stats(self, order=None, lower=None, upper=None):
+        """List of ``Axes.bxp`` dictionaries, one per group in ``order``.
+
+        ``lower`` and ``upper`` restrict every box to values in that range,
+        as if the rows outside it had been filtered out first.
+        """
+        positions = {label: i for i, label in enumerate(self.labels)}
+        result = []
+        for label in (self.labels if order is None else order):
+            group = self._slice(positions[label], lower, upper)
+            if not len(group):
+                continue
+            q1, med, q3 = _quantiles(group, [0.25, 0.5, 0.75])
+            iqr = q3 - q1
+            lo = np.searchsorted(group, q1 - self.whis * iqr, side='left')
+            hi = np.searchsorted(group, q3 + self.whis * iqr, side='right')
+            fliers = np.concatenate([group[:lo], group[hi:]])
+            result.append({
+                'label': label,
+                'med': med,
+                'q1': q1,
+                'q3': q3,
+                'whislo': group[lo] if lo < len(group) else q1,
+                'whishi': group[hi - 1] if hi > 0 else q3,
+                'mean': group.mean(),
+                'fliers': _cap(fliers, self.max_fliers),
+                'n_fliers': len(fliers),
+            })
+        return result
+
+    def summary(self, lower=None, upper=None):
+        """Median, mean and sample standard deviation per observed group."""
+        rows = {}
+        for i, label in enumerate(self.labels):
+            group = self._slice(i, lower, upper)
+            if len(group):
+                std = group.std(ddof=1) if len(group) > 1 else np.nan
+                rows[label] = {'median': _quantiles(group, 0.5), 'mean': group.mean(), 'std': std}
+        return pd.DataFrame.from_dict(rows, orient='index', columns=['median', 'mean', 'std'])
+
+
+def plot_box_stats(stats, ax=None, palette='Set2'):
+    """Draw pre-computed box statistics with ``Axes.bxp`` and return the axes."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if ax is None:
+        ax = plt.gca()
+    line = {'color': '0.3'}
+    artists = ax.bxp(stats, widths=0.8, patch_artist=True, showfliers=True,
+                     flierprops={'marker': 'o', 'markerfacecolor': 'none', 'markeredgecolor': '0.3'},
+                     medianprops=line, whiskerprops=line, capprops=line)
+    for box, color in zip(artists['boxes'], sns.color_palette(palette, len(stats))):
+        box.set_facecolor(color)
+        box.set_edgecolor('0.3')
+    return ax
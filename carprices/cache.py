@@ -0,0 +1,171 @@
+"""
+Columnar cache of the cleaned car_prices dataset.
+
+By default the cleaned, typed frame is stored as a shared Arrow IPC file
+(see ``carprices.shared``). The script, notebook kernels and pool workers
+all memory-map that one file zero-copy, so the page cache holds a single
+physical copy of the data however many processes read it. Parquet (compact
+on disk, decoded into private memory on every read) and Feather are also
+supported. Each entry is keyed on the content
+hash of the source file plus the cleaning-policy version, so a changed
+export or a changed cleaning rule produces a new entry, while an unchanged
+pair skips both the CSV parse and Task 1 cleaning.
+
+Hashing a multi-hundred-MB source costs a full read, so digests are
+remembered in a small sidecar file against the source's size and mtime.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from carprices.io import pyarrow_available
+from carprices.shared import SHARED_SUFFIX, open_shared, write_shared
+
+CACHE_FORMATS = {
+    'arrow': SHARED_SUFFIX,
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+
+DIGEST_INDEX = 'digests.json'
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path, chunk_size=HASH_CHUNK_SIZE):
+    """Return the BLAKE2b hex digest of a file's bytes, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CleanedCache:
+    """Directory of cleaned-dataset snapshots keyed by source hash and policy.
+
+    Parameters
+    ----------
+    cache_dir : str or path-like
+        Where the snapshots live; created on first write.
+    fmt : {'arrow', 'parquet', 'feather'}
+        Storage format. Arrow is one uncompressed record batch, memory-mapped
+        zero-copy on read and shared between processes; Feather is
+        uncompressed and memory-mapped, but copied into pandas.
+    """
+
+    def __init__(self, cache_dir, fmt='arrow'):
+        if fmt not in CACHE_FORMATS:
+            raise ValueError(f"Unknown cache format '{fmt}', expected one of: {', '.join(CACHE_FORMATS)}")
+        if not pyarrow_available():
+            raise ImportError("The cleaned-dataset cache requires pyarrow")
+        self.cache_dir = str(cache_dir)
+        self.fmt = fmt
+
+    # -- keys ---------------------------------------------------------------
+
+    def _digest_index_path(self):
+        return os.path.join(self.cache_dir, DIGEST_INDEX)
+
+    def _read_digest_index(self):
+        try:
+            with open(self._digest_index_path()) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {}
+
+    def source_digest(self, source):
+        """Content hash of ``source``, reusing the last one if size/mtime match."""
+        stat = os.stat(source)
+        name = os.path.abspath(source)
+        index = self._read_digest_index()
+        entry = index.get(name)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['digest']
+        digest = file_digest(source)
+        index[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._atomic_write_text(self._digest_index_path(), json.dumps(index, indent=2))
+        return digest
+
+    def key(self, source, policy_version):
+        """Cache key for a source file under a given cleaning-policy version."""
+        return f"{self.source_digest(source)}-v{policy_version}"
+
+    def path_for(self, key):
+        """Snapshot file path for ``key``."""
+        return os.path.join(self.cache_dir, f"cleaned-{key}{CACHE_FORMATS[self.fmt]}")
+
+    # -- read / write -------------------------------------------------------
+
+    @property
+    def shared(self):
+        """True if snapshots can be memory-mapped by other processes as they are."""
+        return self.fmt == 'arrow'
+
+    def _read(self, path):
+        if self.fmt == 'arrow':
+            return open_shared(path)
+        if self.fmt == 'feather':
+            import pyarrow.feather as feather
+            table = feather.read_table(path, memory_map=True)
+            return table.to_pandas()
+        return pd.read_parquet(path)
+
+    def _atomic_write_text(self, path, text):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as handle:
+            handle.write(text)
+        os.replace(tmp, path)
+
+    def get(self, key):
+        """Return the cached frame for ``key``, or None on a miss."""
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        return self._read(path)
+
+    def put(self, key, df):
+        """Store ``df`` under ``key`` and return the snapshot path."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        df = df.reset_index(drop=True)
+        if self.fmt == 'arrow':
+            write_shared(df, tmp)
+        elif self.fmt == 'feather':
+            # Uncompressed so the file can be memory-mapped on read
+            df.to_feather(tmp, compression='uncompressed')
+        else:
+            df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        return path
+
+    def latest(self):
+        """Return the most recently written snapshot, or None if empty.
+
+        Handy for notebooks that just want the current cleaned data without
+        knowing which source produced it.
+        """
+        suffix = CACHE_FORMATS[self.fmt]
+        try:
+            names = [name for name in os.listdir(self.cache_dir)
+                     if name.startswith('cleaned-') and name.endswith(suffix)]
+        except FileNotFoundError:
+            return None
+        if not names:
+            return None
+        paths = [os.path.join(self.cache_dir, name) for name in names]
+        return self._read(max(paths, key=os.path.getmtime))
+
+    def load_or_build(self, source, policy_version, build):
+        """Return ``(df, hit)``; on a miss ``build()`` produces and stores the frame."""
+        key = self.key(source, policy_version)
+        df = self.get(key)
+        if df is not None:
+            return df, True
+        df = build()
+        self.put(key, df)
+        return df, False
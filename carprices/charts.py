@@ -0,0 +1,339 @@
+"""
+Batched chart rendering from precomputed plot data.
+
+Sections no longer draw their charts. Each one describes a figure as a
+``ChartSpec``: a kind (bar, trend, scatter_line, correlation,
+missing_heatmap, box) plus the plain values to plot, such as labels,
+numbers, a matrix or box statistics. DataFrames are never passed along.
+``render_charts`` then draws all of them in one batch on a process pool
+using the Agg backend.
+
+Each ``RenderTarget`` has its own format (PNG, SVG or WebP) and DPI. A
+report can therefore write 300 dpi PNGs next to 96 dpi WebP files for the
+dashboard without rescaling images afterwards. The output folder holds a
+small manifest that maps each written file to the digest of its spec and
+target. A figure whose data, labels and target are all unchanged is not
+drawn again. With a ``ResultCache``, drawn files are also kept under that
+digest and copied into other output folders instead of being redrawn.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from carprices.plotting import pyplot, seaborn, use_headless_backend
+from carprices.taskgraph import _mp_context
+
+# Bump when a renderer changes how it draws, so cached figures are redrawn
+RENDER_VERSION = 1
+MANIFEST = 'charts.json'
+FORMATS = ('png', 'svg', 'webp')
+DEFAULT_DPI = 300
+
+
+class RenderTarget:
+    """One output format of every chart.
+
+    Parameters
+    ----------
+    format : {'png', 'svg', 'webp'}
+    dpi : int
+        Raster resolution (SVG text and lines are resolution independent).
+    subdir : str, optional
+        Folder under the output directory; '' writes next to the report.
+    tight : bool
+        Crop to the drawn area (``bbox_inches='tight'``).
+    """
+
+    def __init__(self, format='png', dpi=DEFAULT_DPI, subdir='', tight=True):
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported chart format '{format}', expected one of: {', '.join(FORMATS)}")
+        self.format = format
+        self.dpi = int(dpi)
+        self.subdir = subdir
+        self.tight = tight
+
+    def filename(self, name):
+        return os.path.join(self.subdir, f"{name}.{self.format}")
+
+    def key(self):
+        return f"{self.format}:{self.dpi}:{int(self.tight)}"
+
+    def __repr__(self):
+        return f"RenderTarget({self.format}@{self.dpi}dpi{', ' + self.subdir if self.subdir else ''})"
+
+
+DEFAULT_TARGETS = (RenderTarget(),)
+
+
+def parse_targets(specs):
+    """``RenderTarget`` list from ``FORMAT[:DPI]`` strings such as ``['png:300', 'webp:96']``.
+
+    The first target writes next to the report; the others go to
+    ``<format>-<dpi>dpi/`` subfolders so their file names never collide.
+    """
+    targets = []
+    for i, spec in enumerate(specs):
+        format, _, dpi = spec.lower().partition(':')
+        dpi = int(dpi) if dpi else DEFAULT_DPI
+        targets.append(RenderTarget(format, dpi, subdir='' if i == 0 else f"{format}-{dpi}dpi"))
+    return targets
+
+
+def _feed(digest, value):
+    if isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(f"<{key}>".encode())
+            _feed(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"[{len(value)}".encode())
+        for item in value:
+            _feed(digest, item)
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        if value.dtype.kind in 'OUS':
+            digest.update('\x1f'.join(map(str, value.ravel())).encode())
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode())
+
+
+class ChartSpec:
+    """Everything needed to draw one figure, without the source frame.
+
+    Parameters
+    ----------
+    name : str
+        File stem, e.g. ``'4_price_by_year'``.
+    kind : str
+        Key of ``RENDERERS``.
+    data : dict
+        Plot data (arrays, lists, scalars or box-statistics dicts).
+    **options
+        Labels, colors and sizes understood by the renderer.
+    """
+
+    def __init__(self, name, kind, data, **options):
+        if kind not in RENDERERS:
+            raise ValueError(f"Unknown chart kind '{kind}', expected one of: {', '.join(RENDERERS)}")
+        self.name = name
+        self.kind = kind
+        self.data = data
+        self.options = options
+
+    def digest(self, target=None):
+        """Content hash of the spec (and ``target``), used to skip unchanged figures."""
+        digest = hashlib.blake2b(digest_size=16)
+        _feed(digest, [RENDER_VERSION, self.kind, self.options, self.data,
+                       None if target is None else target.key()])
+        return digest.hexdigest()
+
+
+class ChartResult:
+    """Files written for one chart and the time spent drawing and saving it.
+
+    ``skipped`` charts were not drawn; ``cached`` ones of them had files
+    copied from the result cache.
+    """
+
+    def __init__(self, name, paths, seconds, skipped, cached=False):
+        self.name = name
+        self.paths = paths
+        self.seconds = seconds
+        self.skipped = skipped
+        self.cached = cached
+
+
+# ---------------------------------------------------------------------------
+# Renderers: draw ``data`` on the current pyplot figure
+# ---------------------------------------------------------------------------
+
+def _labels(plt, options):
+    # Task 3 charts use bold, larger axis labels; the Task 1 charts do not
+    bold = {'fontsize': 12, 'fontweight': 'bold'} if options.get('bold', True) else {}
+    title = {'fontsize': options.get('title_size', 14), 'fontweight': 'bold'} if options.get('bold', True) else {}
+    if 'xlabel' in options:
+        plt.xlabel(options['xlabel'], **bold)
+    if 'ylabel' in options:
+        plt.ylabel(options['ylabel'], **bold)
+    if 'title' in options:
+        plt.title(options['title'], **title)
+
+
+def draw_bar(plt, data, options):
+    positions = range(len(data['values']))
+    bar_style = {key: options[key] for key in ('color', 'alpha', 'edgecolor') if key in options}
+    bars = plt.bar(positions, data['values'], **bar_style)
+    _labels(plt, options)
+    plt.xticks(positions, data['labels'], rotation=45, ha='right')
+    if options.get('grid', True):
+        plt.grid(True, alpha=0.3, axis='y')
+    value_format = options.get('value_format')
+    if value_format:
+        for bar in bars:
+            height = bar.get_height()
+            plt.text(bar.get_x() + bar.get_width()/2., height,
+                     value_format.format(height), ha='center', va='bottom', fontsize=9)
+
+
+def draw_trend(plt, data, options):
+    x, y = data['x'], data['y']
+    plt.plot(x, y, marker='o', linewidth=2, markersize=6, color=options.get('color', '#2E86AB'))
+    _labels(plt, options)
+    plt.grid(True, alpha=0.3)
+    plt.xticks(rotation=45)
+    # Linear trend line
+    p = np.poly1d(np.polyfit(x, y, 1))
+    plt.plot(x, p(x), "--", color='red', alpha=0.8, label='Trend Line')
+    plt.legend()
+
+
+def draw_scatter_line(plt, data, options):
+    x, y = data['x'], data['y']
+    color = options.get('color', '#A23B72')
+    plt.scatter(x, y, alpha=0.6, s=100, color=color)
+    plt.plot(x, y, alpha=0.4, linewidth=2, color=color)
+    _labels(plt, options)
+    plt.grid(True, alpha=0.3)
+    if options.get('thousands'):
+        plt.gca().xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{int(x/1000)}K'))
+
+
+def draw_correlation(plt, data, options):
+    seaborn().heatmap(data['matrix'], xticklabels=data['labels'], yticklabels=data['labels'],
+                      annot=True, fmt='.2f', cmap='coolwarm', center=0, square=True, linewidths=1,
+                      cbar_kws={"shrink": 0.8})
+    _labels(plt, options)
+
+
+def draw_missing_heatmap(plt, data, options):
+    import pandas as pd
+
+    from carprices.missingness import plot_missing_heatmap
+
+    fractions = pd.DataFrame(data['fractions'], columns=data['columns'],
+                             index=pd.Index(data['first_row'], name='first_row'))
+    plot_missing_heatmap(fractions)
+
+
+def draw_box(plt, data, options):
+    from carprices.boxstats import plot_box_stats
+
+    plot_box_stats(data['stats'], palette=options.get('palette', 'Set2'))
+    _labels(plt, options)
+    plt.xticks(rotation=45, ha='right')
+    plt.grid(True, alpha=0.3, axis='y')
+
+
+RENDERERS = {
+    'bar': draw_bar,
+    'trend': draw_trend,
+    'scatter_line': draw_scatter_line,
+    'correlation': draw_correlation,
+    'missing_heatmap': draw_missing_heatmap,
+    'box': draw_box,
+}
+
+
+# ---------------------------------------------------------------------------
+# Batch rendering
+# ---------------------------------------------------------------------------
+
+def render_chart(spec, jobs):
+    """Draw ``spec`` once and save it for each ``(target, path)`` in ``jobs``."""
+    start = time.perf_counter()
+    plt = pyplot()
+    figure = plt.figure(figsize=spec.options.get('figsize', (12, 6)))
+    try:
+        RENDERERS[spec.kind](plt, spec.data, spec.options)
+        plt.tight_layout()
+        for target, path in jobs:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            figure.savefig(path, format=target.format, dpi=target.dpi,
+                           bbox_inches='tight' if target.tight else None)
+    finally:
+        plt.close(figure)
+    return time.perf_counter() - start
+
+
+def _read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('version') == RENDER_VERSION else {}
+
+
+def _write_manifest(output_dir, files):
+    path = os.path.join(output_dir, MANIFEST)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as handle:
+        json.dump({'version': RENDER_VERSION, 'files': files}, handle, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def render_charts(specs, output_dir, targets=None, workers=None, force=False, cache=None):
+    """Render every chart for every target and return ``ChartResult`` objects.
+
+    Parameters
+    ----------
+    specs : list of ChartSpec
+    output_dir : str or path-like
+    targets : list of RenderTarget, optional
+        Default: one 300 dpi PNG per chart.
+    workers : int, optional
+        Rendering processes (default: all cores; 1 renders in this process).
+    force : bool
+        Redraw even if the manifest or the cache has the file.
+    cache : ResultCache, optional
+        Copy figures drawn before from here, and store newly drawn ones.
+    """
+    targets = list(targets or DEFAULT_TARGETS)
+    os.makedirs(output_dir, exist_ok=True)
+    files = {} if force else _read_manifest(output_dir).get('files', {})
+
+    pending = []
+    copied = set()
+    for spec in specs:
+        jobs = []
+        for target in targets:
+            filename = target.filename(spec.name)
+            path = os.path.join(output_dir, filename)
+            digest = spec.digest(target)
+            if files.get(filename) == digest and os.path.exists(path):
+                continue
+            if cache is not None and not force and cache.fetch_file(digest, f".{target.format}", path):
+                copied.add(spec.name)
+                continue
+            jobs.append((target, path))
+        pending.append((spec, jobs))
+
+    to_render = [(spec, jobs) for spec, jobs in pending if jobs]
+    workers = min(workers or os.cpu_count() or 1, len(to_render))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(),
+                                 initializer=use_headless_backend) as pool:
+            seconds = list(pool.map(render_chart, *zip(*to_render)))
+    else:
+        seconds = [render_chart(spec, jobs) for spec, jobs in to_render]
+    timings = {spec.name: value for (spec, _), value in zip(to_render, seconds)}
+    if cache is not None:
+        for spec, jobs in to_render:
+            for target, path in jobs:
+                cache.store_file(spec.digest(target), path)
+
+    results = []
+    for spec, jobs in pending:
+        for target in targets:
+            files[target.filename(spec.name)] = spec.digest(target)
+        results.append(ChartResult(spec.name, [path for _, path in jobs],
+                                   timings.get(spec.name, 0.0), skipped=not jobs,
+                                   cached=not jobs and spec.name in copied))
+    _write_manifest(output_dir, files)
+    return results
@@ -0,0 +1,371 @@
+"""
+Out-of-core execution of the Task 2 aggregations.
+
+Every Task 2 query used by the report reduces to mergeable partial
+aggregates: counts, sums, minima, maxima and value counts, optionally per
+group. ``Task2Aggregator`` keeps exactly those partials, folds in one batch
+at a time and can merge with another aggregator (e.g. one per file or per
+worker). ``results()`` turns the partials into the same tables the
+in-memory path (``task2_in_memory``) produces for the concatenated input.
+
+The 3.7 box-plot inputs, the price quartiles that set the IQR bounds and
+the median price per color that orders the boxes, come from price counts
+per color, which merge like the rest.
+
+Memory is bounded by the batch size plus the number of distinct group keys,
+independent of the number of rows. For high-cardinality keys the top-N and
+distinct counts can switch to the bounded ``SpaceSaving`` and
+``HyperLogLog`` summaries of ``carprices.heavyhitters``, and the 3.7
+quantiles to the KLL sketches of ``carprices.sketches``.
+"""
+
+import numpy as np
+import pandas as pd
+
+from carprices.heavyhitters import DEFAULT_PRECISION, HyperLogLog, SpaceSaving
+from carprices.io import DEFAULT_CHUNKSIZE, iter_chunks
+from carprices.sketches import GroupedSketches, QuantileSketch
+
+# Thresholds used by the Task 2 sections
+NEWER_CAR_YEAR = 2013          # 2.11: year > 2013
+EXCELLENT_QUANTILE = 0.80      # 2.12: top 20% condition
+TOP_MODELS = 5                 # 2.5
+TOP_STATES = 3                 # 3.4
+IQR_WHISKER = 1.5              # 3.7: outliers beyond Q1 - 1.5 IQR, Q3 + 1.5 IQR
+
+TASK2_COLUMNS = ['year', 'make', 'model', 'interior', 'state', 'condition', 'odometer', 'color',
+                 'sellingprice']
+
+
+# ----------------------------------------------------------------------------
+# Partial-aggregate helpers
+# ----------------------------------------------------------------------------
+
+def _plain_index(series):
+    """Drop categorical index dtypes so partials from different batches align."""
+    index = series.index
+    if isinstance(index, pd.CategoricalIndex):
+        series.index = index.astype(index.categories.dtype)
+    elif isinstance(index, pd.MultiIndex):
+        series.index = pd.MultiIndex.from_arrays(
+            [level.astype(level.categories.dtype) if isinstance(level, pd.CategoricalIndex) else level
+             for level in (index.get_level_values(i) for i in range(index.nlevels))],
+            names=index.names,
+        )
+    return series
+
+
+def _group_sum_count(values, keys):
+    """Per-key float64 sum and non-null count as a two-column frame."""
+    values = values.astype('float64')
+    grouped = values.groupby(keys, observed=True)
+    frame = pd.DataFrame({'sum': grouped.sum(), 'count': grouped.count()})
+    frame.index = _plain_index(frame['sum']).index
+    return frame[frame['count'] > 0]
+
+
+def _group_reduce(values, keys, how):
+    """Per-key min or max, ignoring nulls."""
+    result = getattr(values.groupby(keys, observed=True), how)()
+    return _plain_index(result.dropna())
+
+
+def _value_counts(values):
+    return _plain_index(values.value_counts(dropna=True))
+
+
+def _merge_add(left, right):
+    if left is None:
+        return right
+    return left.add(right, fill_value=0)
+
+
+def _merge_reduce(left, right, how):
+    if left is None:
+        return right
+    combined = pd.concat([left, right])
+    return getattr(combined.groupby(level=list(range(combined.index.nlevels))), how)()
+
+
+def _sorted_counts(counts):
+    """Sort value counts by count (descending), breaking ties by label."""
+    counts = counts.astype('int64')
+    frame = pd.DataFrame({'label': counts.index, 'count': counts.values})
+    frame = frame.sort_values(['count', 'label'], ascending=[False, True], kind='stable')
+    return pd.Series(frame['count'].values, index=pd.Index(frame['label'].values, name=counts.index.name),
+                     name='count')
+
+
+def quantile_from_counts(counts, q):
+    """Exact linearly interpolated quantile from a value -> count table.
+
+    Matches ``Series.quantile(q)`` on the expanded values, which is what lets
+    2.12's 80th percentile be computed from mergeable counts.
+    """
+    counts = counts[counts > 0].sort_index()
+    if counts.empty:
+        return np.nan
+    values = counts.index.to_numpy(dtype='float64')
+    cumulative = np.cumsum(counts.to_numpy())
+    position = (cumulative[-1] - 1) * q
+    lower = int(np.floor(position))
+    fraction = position - lower
+    lower_value = values[np.searchsorted(cumulative, lower + 1)]
+    if fraction == 0:
+        return lower_value
+    upper_value = values[np.searchsorted(cumulative, lower + 2)]
+    return lower_value + (upper_value - lower_value) * fraction
+
+
+def iqr_bounds(q1, q3):
+    """The 3.7 quartiles and the outlier bounds ``IQR_WHISKER`` IQRs beyond them."""
+    iqr = q3 - q1
+    return {'q1': q1, 'q3': q3, 'lower': q1 - IQR_WHISKER * iqr, 'upper': q3 + IQR_WHISKER * iqr}
+
+
+# ----------------------------------------------------------------------------
+# Aggregator
+# ----------------------------------------------------------------------------
+
+class Task2Aggregator:
+    """Mergeable partial aggregates behind sections 2.1-2.12.
+
+    Parameters
+    ----------
+    heavy_hitters : int, optional
+        Counter capacity of the ``SpaceSaving`` summaries behind the top
+        models (2.5) and states (3.4). None (default) counts exactly.
+    distinct_precision : int, optional
+        ``HyperLogLog`` precision for the distinct make and model counts
+        (2.3). None (default) counts exactly.
+    quantile_k : int, optional
+        ``k`` of the KLL sketches behind the 3.7 price quartiles and color
+        medians. None (default) keeps exact price counts per color.
+    """
+
+    def __init__(self, heavy_hitters=None, distinct_precision=None, quantile_k=None):
+        self.rows = 0
+        self.price_count = 0
+        self.price_sum = 0.0
+        self.price_min = np.inf
+        self.price_max = -np.inf
+        self.model_counts = SpaceSaving(heavy_hitters)
+        self.state_counts = SpaceSaving(heavy_hitters)
+        self.distinct_makes = HyperLogLog(distinct_precision or DEFAULT_PRECISION, exact=distinct_precision is None)
+        self.distinct_models = HyperLogLog(distinct_precision or DEFAULT_PRECISION, exact=distinct_precision is None)
+        self.make_price = None
+        self.interior_min_price = None
+        self.year_max_odometer = None
+        self.newer_state_price = None
+        self.condition_counts = None
+        self.make_condition_price = None
+        # 3.7: prices of rows with a color, as counts or sketches
+        self.color_price_counts = None
+        self.price_sketch = self.color_sketches = None
+        if quantile_k is not None:
+            self.price_sketch = QuantileSketch(quantile_k)
+            self.color_sketches = GroupedSketches(quantile_k)
+
+    def update(self, chunk):
+        """Fold one batch of rows into the partial aggregates."""
+        self.rows += len(chunk)
+        price = chunk['sellingprice'].astype('float64')
+
+        # 2.1 price statistics
+        valid = price.dropna()
+        if len(valid):
+            self.price_count += len(valid)
+            self.price_sum += valid.sum()
+            self.price_min = min(self.price_min, valid.min())
+            self.price_max = max(self.price_max, valid.max())
+
+        # 2.3 distinct makes and models, 2.5 / 3.4 model and state frequencies
+        self.distinct_makes.update(chunk['make'])
+        self.distinct_models.update(chunk['model'])
+        self.model_counts.update(chunk['model'])
+        self.state_counts.update(chunk['state'])
+
+        # 2.6 average price by make
+        self.make_price = _merge_add(self.make_price, _group_sum_count(price, chunk['make']))
+
+        # 2.7 minimum price by interior
+        self.interior_min_price = _merge_reduce(
+            self.interior_min_price, _group_reduce(price, chunk['interior'], 'min'), 'min')
+
+        # 2.8 maximum odometer per year
+        self.year_max_odometer = _merge_reduce(
+            self.year_max_odometer,
+            _group_reduce(chunk['odometer'].astype('float64'), chunk['year'], 'max'), 'max')
+
+        # 2.11 average price by state for newer cars (mask, no copy)
+        newer = chunk['year'] > NEWER_CAR_YEAR
+        self.newer_state_price = _merge_add(
+            self.newer_state_price, _group_sum_count(price[newer], chunk['state'][newer]))
+
+        # 2.12 condition distribution plus price by (make, condition); the
+        # excellent threshold is only known once all batches are in
+        self.condition_counts = _merge_add(self.condition_counts, _value_counts(chunk['condition']))
+        self.make_condition_price = _merge_add(
+            self.make_condition_price,
+            _group_sum_count(price, [chunk['make'], chunk['condition']]))
+
+        # 3.7 price quartiles and median per color, over rows with both
+        colored = (chunk['color'].notna() & price.notna()).to_numpy()
+        color, colored_price = chunk['color'][colored], price[colored]
+        if self.price_sketch is not None:
+            self.price_sketch.update(colored_price.to_numpy())
+            self.color_sketches.update(color, colored_price)
+        else:
+            self.color_price_counts = _merge_add(
+                self.color_price_counts,
+                _plain_index(colored_price.groupby([color, colored_price], observed=True).size()))
+        return self
+
+    def merge(self, other):
+        """Combine another aggregator's partials into this one."""
+        self.rows += other.rows
+        self.price_count += other.price_count
+        self.price_sum += other.price_sum
+        self.price_min = min(self.price_min, other.price_min)
+        self.price_max = max(self.price_max, other.price_max)
+        for name in ('model_counts', 'state_counts', 'distinct_makes', 'distinct_models'):
+            getattr(self, name).merge(getattr(other, name))
+        for name in ('make_price', 'newer_state_price', 'condition_counts', 'make_condition_price'):
+            if getattr(other, name) is not None:
+                setattr(self, name, _merge_add(getattr(self, name), getattr(other, name)))
+        if other.color_price_counts is not None:
+            self.color_price_counts = _merge_add(self.color_price_counts, other.color_price_counts)
+        if other.price_sketch is not None:
+            self.price_sketch.merge(other.price_sketch)
+            self.color_sketches.merge(other.color_sketches)
+        if other.interior_min_price is not None:
+            self.interior_min_price = _merge_reduce(self.interior_min_price, other.interior_min_price, 'min')
+        if other.year_max_odometer is not None:
+            self.year_max_odometer = _merge_reduce(self.year_max_odometer, other.year_max_odometer, 'max')
+        return self
+
+    def results(self):
+        """Final Task 2 tables, in the shape returned by ``task2_in_memory``.
+
+        Without any rows the statistics are NaN and the tables empty, as
+        ``task2_in_memory`` returns them for an empty frame.
+        """
+        def mean(frame):
+            if frame is None:
+                return pd.Series(dtype='float64')
+            return (frame['sum'] / frame['count']).sort_values(ascending=False)
+
+        def reduced(series, ascending):
+            if series is None:
+                return pd.Series(dtype='float64')
+            return series.sort_values(ascending=ascending)
+
+        condition_counts = self.condition_counts
+        if condition_counts is None:
+            condition_counts = pd.Series(dtype='int64')
+        threshold = quantile_from_counts(condition_counts, EXCELLENT_QUANTILE)
+        excellent = None
+        if self.make_condition_price is not None:
+            conditions = self.make_condition_price.index.get_level_values(1)
+            excellent = self.make_condition_price[conditions >= threshold]
+            excellent = excellent.groupby(level=0).sum()
+        excellent_count = int(condition_counts[condition_counts.index >= threshold].sum())
+
+        if self.price_sketch is not None:
+            quartiles = self.price_sketch.quantile([0.25, 0.75])
+            color_medians = self.color_sketches.quantile(0.5)
+        elif self.color_price_counts is not None:
+            counts = self.color_price_counts
+            prices = counts.groupby(level=1).sum()
+            quartiles = [quantile_from_counts(prices, 0.25), quantile_from_counts(prices, 0.75)]
+            color_medians = pd.Series({color: quantile_from_counts(group.droplevel(0), 0.5)
+                                       for color, group in counts.groupby(level=0)}, dtype='float64')
+        else:
+            quartiles, color_medians = [np.nan, np.nan], pd.Series(dtype='float64')
+
+        return {
+            'rows': self.rows,
+            'price_stats': {
+                'count': self.price_count,
+                'mean': self.price_sum / self.price_count if self.price_count else np.nan,
+                'min': self.price_min if self.price_count else np.nan,
+                'max': self.price_max if self.price_count else np.nan,
+            },
+            'distinct_makes': self.distinct_makes.count(),
+            'distinct_models': self.distinct_models.count(),
+            'top_models': self.model_counts.top(TOP_MODELS).rename_axis('model'),
+            'top_states': self.state_counts.top(TOP_STATES).rename_axis('state'),
+            'avg_price_by_make': mean(self.make_price),
+            'min_price_by_interior': reduced(self.interior_min_price, ascending=True),
+            'max_odometer_by_year': reduced(self.year_max_odometer, ascending=False),
+            'avg_price_by_state_newer': mean(self.newer_state_price),
+            'excellent_threshold': threshold,
+            'excellent_count': excellent_count,
+            'value_for_money': mean(excellent).sort_values(),
+            'price_iqr': iqr_bounds(*quartiles),
+            'color_median_price': color_medians.sort_values(ascending=False),
+        }
+
+
+# ----------------------------------------------------------------------------
+# Entry points
+# ----------------------------------------------------------------------------
+
+def task2_chunked(path, chunksize=DEFAULT_CHUNKSIZE, max_memory_mb=None, stats=None,
+                  heavy_hitters=None, distinct_precision=None, quantile_k=None):
+    """Run the Task 2 aggregations over a CSV source in bounded memory.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Plain or compressed car_prices CSV.
+    chunksize : int
+        Rows per batch (upper bound when ``max_memory_mb`` is given).
+    max_memory_mb : float, optional
+        Memory ceiling for a parsed batch; the batch size is derived from it.
+    stats : ReadStats, optional
+        Filled with read throughput.
+    heavy_hitters, distinct_precision, quantile_k : int, optional
+        Approximate top-N, distinct counts and 3.7 quantiles; see
+        ``Task2Aggregator``.
+    """
+    aggregator = Task2Aggregator(heavy_hitters, distinct_precision, quantile_k)
+    for chunk in iter_chunks(path, columns=TASK2_COLUMNS, chunksize=chunksize,
+                             stats=stats, max_memory_mb=max_memory_mb):
+        aggregator.update(chunk)
+    return aggregator.results()
+
+
+def task2_in_memory(df):
+    """Reference in-memory computation of the same Task 2 tables."""
+    price = df['sellingprice'].astype('float64')
+    newer = df['year'] > NEWER_CAR_YEAR
+    threshold = df['condition'].quantile(EXCELLENT_QUANTILE)
+    excellent = df['condition'] >= threshold
+    colored = df['color'].notna() & price.notna()
+    return {
+        'rows': len(df),
+        'price_stats': {
+            'count': int(price.count()),
+            'mean': price.mean(),
+            'min': price.min(),
+            'max': price.max(),
+        },
+        'distinct_makes': int(df['make'].nunique()),
+        'distinct_models': int(df['model'].nunique()),
+        'top_models': _sorted_counts(_value_counts(df['model'])).head(TOP_MODELS),
+        'top_states': _sorted_counts(_value_counts(df['state'])).head(TOP_STATES),
+        'avg_price_by_make': price.groupby(df['make'], observed=True).mean().dropna().sort_values(ascending=False),
+        'min_price_by_interior': price.groupby(df['interior'], observed=True).min().dropna().sort_values(),
+        'max_odometer_by_year': df['odometer'].astype('float64').groupby(df['year']).max().dropna()
+                                .sort_values(ascending=False),
+        'avg_price_by_state_newer': price[newer].groupby(df['state'][newer], observed=True).mean().dropna()
+                                    .sort_values(ascending=False),
+        'excellent_threshold': threshold,
+        'excellent_count': int(excellent.sum()),
+        'value_for_money': price[excellent].groupby(df['make'][excellent], observed=True).mean().dropna()
+                           .sort_values(),
+        'price_iqr': iqr_bounds(*price[colored].quantile([0.25, 0.75])),
+        'color_median_price': price[colored].groupby(df['color'][colored], observed=True).median()
+                              .sort_values(ascending=False),
+    }
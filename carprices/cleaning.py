@@ -0,0 +1,146 @@
+"""
+Null handling for Task 1.3.
+
+``clean`` profiles nulls once, turns the policy into a single drop list and
+a single column -> fill value map, and applies both in one step:
+
+* columns with more than ``drop_above_pct`` percent nulls are dropped;
+* numeric columns are filled with their median;
+* all other columns are filled with their mode (``fallback_value`` if the
+  column has no mode).
+
+``CleaningPolicy.version`` identifies the rules and their parameters, and is
+what the cleaned-dataset cache keys on.
+"""
+
+import hashlib
+
+import pandas as pd
+
+# Bump when the cleaning logic itself changes (not just the parameters)
+CLEANING_LOGIC_VERSION = 1
+
+
+class CleaningPolicy:
+    """Thresholds and fill strategies for null handling.
+
+    Parameters
+    ----------
+    drop_above_pct : float
+        Drop a column when its null percentage is above this (default 30).
+    numeric_fill : {'median', 'mean'}
+        Fill value for numeric columns.
+    categorical_fill : {'mode'}
+        Fill value for non-numeric columns.
+    fallback_value : str
+        Used when a non-numeric column has no mode.
+    """
+
+    def __init__(self, drop_above_pct=30.0, numeric_fill='median', categorical_fill='mode',
+                 fallback_value='Unknown'):
+        if numeric_fill not in ('median', 'mean'):
+            raise ValueError(f"numeric_fill must be 'median' or 'mean', got '{numeric_fill}'")
+        if categorical_fill != 'mode':
+            raise ValueError(f"categorical_fill must be 'mode', got '{categorical_fill}'")
+        self.drop_above_pct = drop_above_pct
+        self.numeric_fill = numeric_fill
+        self.categorical_fill = categorical_fill
+        self.fallback_value = fallback_value
+
+    @property
+    def version(self):
+        """Stable identifier of the cleaning logic plus these parameters."""
+        params = f"{self.drop_above_pct}|{self.numeric_fill}|{self.categorical_fill}|{self.fallback_value}"
+        digest = hashlib.blake2b(params.encode(), digest_size=4).hexdigest()
+        return f"{CLEANING_LOGIC_VERSION}-{digest}"
+
+    def __repr__(self):
+        return (f"CleaningPolicy(drop_above_pct={self.drop_above_pct}, numeric_fill='{self.numeric_fill}', "
+                f"categorical_fill='{self.categorical_fill}', fallback_value='{self.fallback_value}')")
+
+
+class ColumnAction:
+    """What ``clean`` did to one column."""
+
+    def __init__(self, column, null_pct, action, value=None):
+        self.column = column
+        self.null_pct = null_pct
+        self.action = action
+        self.value = value
+
+    def describe(self):
+        """Report line in the format the analysis script prints."""
+        if self.action == 'drop':
+            return f"  - {self.column}: {self.null_pct:.2f}% nulls - Dropping column (too many missing values)"
+        if self.action == 'mode':
+            return f"  - {self.column}: {self.null_pct:.2f}% nulls - Filled with mode ('{self.value}')"
+        return f"  - {self.column}: {self.null_pct:.2f}% nulls - Filled with {self.action} ({self.value})"
+
+
+def null_profile(df):
+    """Null count and percentage per column, computed in one pass."""
+    null_counts = len(df) - df.count()
+    null_percentage = null_counts / len(df) * 100 if len(df) else null_counts * 0.0
+    return pd.DataFrame({
+        'Column': df.columns,
+        'Null Count': null_counts.values,
+        'Null Percentage': null_percentage.values,
+    })
+
+
+def _fill_value(series, policy, sketches=None):
+    if pd.api.types.is_numeric_dtype(series):
+        if policy.numeric_fill == 'median' and sketches is not None and series.name in sketches:
+            return 'median', sketches.quantile(series.name, 0.5)
+        return policy.numeric_fill, getattr(series, policy.numeric_fill)()
+    mode = series.mode()
+    return 'mode', mode.iloc[0] if not mode.empty else policy.fallback_value
+
+
+def plan_cleaning(df, policy=None, profile=None, sketches=None):
+    """Work out the drop list and fill map without touching ``df``.
+
+    Pass ``profile`` (from ``null_profile``) to reuse an existing null count,
+    and ``sketches`` (a ``ColumnSketches`` fed chunk by chunk) to take the
+    numeric medians from quantile sketches instead of sorting each column.
+    """
+    policy = policy or CleaningPolicy()
+    if profile is None:
+        profile = null_profile(df)
+    actions = []
+    drop = []
+    fill = {}
+    for column, null_pct in zip(profile['Column'], profile['Null Percentage']):
+        if null_pct <= 0:
+            continue
+        if null_pct > policy.drop_above_pct:
+            drop.append(column)
+            actions.append(ColumnAction(column, null_pct, 'drop'))
+        else:
+            strategy, value = _fill_value(df[column], policy, sketches)
+            fill[column] = value
+            actions.append(ColumnAction(column, null_pct, strategy, value))
+    return drop, fill, actions
+
+
+def clean(df, policy=None, profile=None, sketches=None):
+    """Drop and fill null-heavy columns according to ``policy``.
+
+    ``profile`` and ``sketches`` are passed through to ``plan_cleaning``.
+
+    Returns
+    -------
+    (pandas.DataFrame, list of ColumnAction)
+        The cleaned frame and a per-column record of what was done.
+    """
+    drop, fill, actions = plan_cleaning(df, policy, profile, sketches)
+    if drop:
+        df = df.drop(columns=drop)
+    for column, value in fill.items():
+        # A categorical can only be filled with one of its categories
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+            df = df.assign(**{column: series.cat.add_categories([value])})
+    if fill:
+        df = df.fillna(fill)
+    return df, actions
@@ -0,0 +1,200 @@
+"""
+Command-line entry point for the car price report.
+
+Examples:
+    python -m carprices car_prices.csv.gz -o outputs
+    python -m carprices car_prices.csv --sections 2.5 3.7 --workers 1
+    python -m carprices car_prices.csv --query top_models --query value_for_money
+    python -m carprices car_prices.csv --charts png:300 webp:96
+    python -m carprices car_prices.csv --profile profile.json --sample 100000
+    python -m carprices car_prices.csv --profile - --baseline profile.json
+    python -m carprices car_prices.csv --serve 8765
+    python -m carprices car_prices.csv.gz --dedup unique.csv
+    python -m carprices --list
+"""
+
+import argparse
+import os
+import sys
+import warnings
+
+import pandas as pd
+
+from carprices.cleaning import CleaningPolicy
+from carprices.dataset import CarPriceDataset
+from carprices.resultcache import DEFAULT_MAX_MB, ResultCache
+from carprices.service import DEFAULT_HOST, DEFAULT_PORT, serve
+
+DEFAULT_OUTPUT_DIR = 'outputs'
+RESULTS_DIR = 'results'
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='carprices',
+        description='Car price analysis report: data quality, queries and charts.',
+    )
+    parser.add_argument('input', nargs='?',
+                        help='car_prices CSV export (plain, .gz, .bz2, .zst or .zip)')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT_DIR,
+                        help=f"folder for charts and the cleaned data (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument('-s', '--sections', nargs='+', metavar='N',
+                        help='sections or tasks to run, e.g. 1 2.5 3.7 or 3 (default: full report)')
+    parser.add_argument('-q', '--query', action='append', metavar='NAME',
+                        help='print one query result instead of the report (repeatable)')
+    parser.add_argument('-w', '--workers', type=int,
+                        help='processes for the Task 2/3 sections (default: all cores; 1 = serial)')
+    parser.add_argument('--cache-dir',
+                        help='cleaned-dataset cache folder (default: <output>/cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always parse and clean the source and recompute every section')
+    parser.add_argument('--cache-size', type=float, default=DEFAULT_MAX_MB, metavar='MB',
+                        help=f"size limit of the section-result and chart cache in <cache-dir>/results; "
+                             f"least recently used entries are evicted (default: {DEFAULT_MAX_MB})")
+    parser.add_argument('--drop-above', type=float, default=30.0, metavar='PCT',
+                        help='drop columns with more than PCT%% nulls (default: 30)')
+    parser.add_argument('--charts', nargs='+', default=['png:300'], metavar='FORMAT[:DPI]',
+                        help='chart formats (png, svg, webp) and resolutions; the first is written '
+                             'to the output folder, the others to <format>-<dpi>dpi/ (default: png:300)')
+    parser.add_argument('--profile', nargs='?', const='-', metavar='JSON',
+                        help='only profile the columns of the input and write the profile as JSON '
+                             '(to stdout without a file name)')
+    parser.add_argument('--sample', type=int, metavar='ROWS',
+                        help='with --profile: take distinct counts, quantiles and top values from a '
+                             'random sample of ROWS rows')
+    parser.add_argument('--baseline', metavar='JSON',
+                        help='with --profile: compare against an earlier profile and exit with '
+                             'status 1 on schema drift')
+    parser.add_argument('--dedup', metavar='CSV',
+                        help='only drop the repeated rows of the input in one streaming pass, '
+                             'spilling seen rows to disk, and write the rest to CSV')
+    parser.add_argument('--serve', nargs='?', type=int, const=DEFAULT_PORT, metavar='PORT',
+                        help=f"load the data once and answer the queries as JSON over HTTP "
+                             f"(default port: {DEFAULT_PORT})")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"with --serve: address to listen on "
+                                                              f"(default: {DEFAULT_HOST})")
+    parser.add_argument('--list', action='store_true', help='list sections and queries, then exit')
+    return parser
+
+
+def list_available():
+    from carprices.sections import SECTIONS
+
+    print("Sections:")
+    print("  1     Task 1: load, profile, clean and deduplicate (1.1-1.3)")
+    for section in SECTIONS:
+        if section.name[0].isdigit():
+            print(f"  {section.name:<5} {section.func.__doc__.split(' ', 1)[1]}")
+    print("\nQueries:")
+    for name in CarPriceDataset.queries():
+        doc = getattr(CarPriceDataset, name).__doc__.splitlines()[0]
+        print(f"  {name:<24} {doc}")
+
+
+def profile_input(args):
+    """Stream the input through the profiler; returns the exit status."""
+    import json
+
+    from carprices.profiler import load_profile, profile_file, profile_table, schema_drift, write_profile
+
+    profile = profile_file(args.input, sample=args.sample)
+    if args.profile == '-':
+        json.dump(profile, sys.stdout, indent=1)
+        print()
+    else:
+        write_profile(profile, args.profile)
+        sampled = f", {profile['sample']['rows']:,} sampled" if profile['sample'] else ''
+        print(f"Profile of {profile['rows']:,} rows{sampled}:")
+        with pd.option_context('display.max_columns', None, 'display.width', None):
+            print(profile_table(profile).to_string(index=False))
+        print(f"\n✓ Profile saved as '{args.profile}'")
+    if args.baseline is None:
+        return 0
+    changes = schema_drift(load_profile(args.baseline), profile)
+    for change in changes:
+        print(f"Schema drift: {change}", file=sys.stderr)
+    return 1 if changes else 0
+
+
+def dedup_input(args):
+    """Stream the input through the deduplicator; returns the exit status."""
+    from carprices.dedup import dedup_file
+
+    report = dedup_file(args.input, args.dedup)
+    print(report.summary())
+    print(f"\n✓ {report.unique:,} rows saved as '{args.dedup}'")
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+    if args.list:
+        list_available()
+        return 0
+    if args.input is None:
+        parser.error('the input file is required')
+    if not os.path.exists(args.input):
+        parser.error(f"input file not found: {args.input}")
+    if args.profile is None and (args.sample is not None or args.baseline is not None):
+        parser.error('--sample and --baseline only apply with --profile')
+    if args.sample is not None and args.sample < 1:
+        parser.error('--sample must be a positive row count')
+    if args.cache_size <= 0:
+        parser.error('--cache-size must be positive')
+    if args.baseline is not None and not os.path.exists(args.baseline):
+        parser.error(f"baseline profile not found: {args.baseline}")
+    if args.profile is not None:
+        return profile_input(args)
+    if args.dedup is not None:
+        return dedup_input(args)
+
+    if args.sections:
+        from carprices.report import TASK1_SECTIONS
+        from carprices.sections import select_sections
+        try:
+            select_sections([name for name in args.sections if name not in TASK1_SECTIONS])
+        except KeyError as error:
+            parser.error(error.args[0])
+
+    cache_dir = None if args.no_cache else (args.cache_dir or os.path.join(args.output, 'cache'))
+    dataset = CarPriceDataset(args.input, policy=CleaningPolicy(drop_above_pct=args.drop_above),
+                              cache_dir=cache_dir)
+
+    if args.serve is not None:
+        serve(dataset, host=args.host, port=args.serve)
+        return 0
+
+    if args.query:
+        known = CarPriceDataset.queries()
+        for name in args.query:
+            if name not in known:
+                parser.error(f"unknown query '{name}', expected one of: {', '.join(known)}")
+        with pd.option_context('display.max_columns', None, 'display.width', None):
+            for name in args.query:
+                print(f"\n{name}")
+                print("-"*80)
+                print(getattr(dataset, name)())
+        return 0
+
+    from carprices.charts import parse_targets
+    from carprices.plotting import use_headless_backend
+    from carprices.report import run_report
+
+    try:
+        chart_targets = parse_targets(args.charts)
+    except ValueError as error:
+        parser.error(str(error))
+    result_cache = None if cache_dir is None else ResultCache(os.path.join(cache_dir, RESULTS_DIR),
+                                                              max_bytes=int(args.cache_size * 1024**2))
+    # Charts are only saved to files; matplotlib itself is imported when the
+    # batch renderer draws the first one
+    use_headless_backend()
+    run_report(dataset, args.output, sections=args.sections, workers=args.workers,
+               chart_targets=chart_targets, result_cache=result_cache)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+Query API over one car_prices export.
+
+``CarPriceDataset`` wraps a source file (or an already cleaned frame) and
+exposes each analysis of the report as a method. Nothing is read until it is
+needed: the raw file is parsed on first access, the cleaned and deduplicated
+frame is built (or loaded from the columnar cache) on first query, and every
+query result is memoized per argument set, so asking for the top models
+costs one groupby and no charts.
+
+    >>> data = CarPriceDataset('car_prices.csv', cache_dir='outputs/cache')
+    >>> data.top_models(5)
+    >>> data.value_for_money()
+
+For interactive use, ``row_index`` loads (or builds and saves beside the
+snapshot) sorted and bitmap indexes. Once it is loaded, the range filters
+of 2.4 and 2.10 are index lookups instead of full scans:
+
+    >>> data.row_index.count(('sellingprice', '>', 50000), ('make', '==', 'bmw'))
+    >>> data.high_price_cars(100000)
+"""
+
+import functools
+import os
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from carprices.boxstats import GroupedBoxStats
+from carprices.cache import CleanedCache
+from carprices.cleaning import CleaningPolicy, clean, null_profile
+from carprices.dedup import available_key, find_duplicates
+from carprices.io import ReadStats, load_csv, pyarrow_available
+from carprices.planner import QueryPlan
+from carprices.pricing import PRIOR_ROWS, fit_price_model
+from carprices.resultcache import frame_fingerprint
+from carprices.rowindex import RowIndex, index_path, mask_where
+from carprices.schema import CURRENT_YEAR
+from carprices.sections import detect_columns
+from carprices.vocab import VOCAB_FILE, VOCAB_VERSION, VocabularyStore
+
+
+def query(method):
+    """Memoize a query method on its instance, keyed by its arguments."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in self._results:
+            self._results[key] = method(self, *args, **kwargs)
+        return self._results[key]
+    wrapper.is_query = True
+    return wrapper
+
+
+class CarPriceDataset:
+    """Lazily loaded, cleaned car_prices data with memoized analyses.
+
+    Parameters
+    ----------
+    path : str or path-like, optional
+        Plain or compressed CSV export. Not needed when ``df`` is given.
+    df : pandas.DataFrame, optional
+        An already cleaned frame to query instead of reading ``path``.
+    policy : CleaningPolicy, optional
+        Null-handling rules (default ``CleaningPolicy()``).
+    cache_dir : str or path-like, optional
+        Directory of the cleaned-dataset cache; None disables caching. The
+        cache is skipped when pyarrow is not installed. With the default
+        Arrow format the cleaned frame is a zero-copy memory map of the
+        snapshot, shared with worker processes and notebook kernels.
+    vocabulary : VocabularyStore, optional
+        Stable codes for the repeated string columns. Defaults to the
+        vocabulary file in ``cache_dir`` (in memory only without one).
+    """
+
+    def __init__(self, path=None, df=None, policy=None, cache_dir=None, vocabulary=None):
+        if path is None and df is None:
+            raise ValueError("CarPriceDataset needs a source path or a frame")
+        self.path = path
+        self.policy = policy or CleaningPolicy()
+        self.cache = CleanedCache(cache_dir) if cache_dir is not None and pyarrow_available() else None
+        if vocabulary is None:
+            vocabulary = VocabularyStore(None if cache_dir is None else os.path.join(cache_dir, VOCAB_FILE))
+        self.vocabulary = vocabulary
+        self.read_stats = ReadStats()
+        self.snapshot_path = None
+        self._frame = df
+        self._results = {}
+
+    @classmethod
+    def queries(cls):
+        """Names of the query methods."""
+        return [name for name, member in vars(cls).items() if getattr(member, 'is_query', False)]
+
+    # -- loading and cleaning -----------------------------------------------
+
+    @cached_property
+    def cache_key(self):
+        if self.cache is None or self.path is None:
+            return None
+        # Snapshots hold vocabulary-normalized labels, so the key covers both
+        return self.cache.key(self.path, f"{self.policy.version}-n{VOCAB_VERSION}")
+
+    @cached_property
+    def cached_frame(self):
+        """The cleaned frame from the cache, or None on a miss."""
+        if self._frame is not None or self.cache_key is None:
+            return None
+        return self.cache.get(self.cache_key)
+
+    @cached_property
+    def raw(self):
+        """The source file as read, before cleaning (1.1)."""
+        return load_csv(self.path, stats=self.read_stats)
+
+    @cached_property
+    def profile(self):
+        """Null count and percentage per raw column (1.2, 1.3)."""
+        return null_profile(self.raw)
+
+    @cached_property
+    def cleaning(self):
+        """``(cleaned frame, actions)`` after null handling (1.3).
+
+        The repeated string columns are vocabulary-encoded: case and
+        whitespace variants are merged and the codes are stable across runs.
+        """
+        cleaned, actions = clean(self.raw, self.policy, self.profile)
+        cleaned = self.vocabulary.encode_frame(cleaned)
+        self.vocabulary.save()
+        return cleaned, actions
+
+    @property
+    def cleaning_actions(self):
+        return self.cleaning[1]
+
+    @cached_property
+    def duplicates(self):
+        """``(mask, DedupReport)`` of exact duplicate rows after cleaning."""
+        return find_duplicates(self.cleaning[0])
+
+    @cached_property
+    def repeated_sales(self):
+        """``DedupReport`` keyed on the sale (VIN, date, price), or None."""
+        key = available_key(self.cleaning[0])
+        return find_duplicates(self.cleaning[0], subset=key)[1] if key else None
+
+    @property
+    def df(self):
+        """The cleaned, deduplicated frame every query runs on."""
+        if self._frame is None:
+            if self.cached_frame is not None:
+                self._frame = self.cached_frame
+            else:
+                cleaned = self.cleaning[0]
+                mask, report = self.duplicates
+                # Positional labels: the Arrow export the section workers map
+                # drops the index, so results must line up with 0..n-1
+                self._frame = cleaned[~mask].reset_index(drop=True) if report.duplicates else cleaned
+                if self.cache_key is not None:
+                    self.snapshot_path = self.cache.put(self.cache_key, self._frame)
+                    if self.cache.shared:
+                        # Continue on the memory-mapped snapshot, so this
+                        # process and its workers share one copy of the data
+                        self._frame = self.cache.get(self.cache_key)
+        return self._frame
+
+    @property
+    def from_cache(self):
+        return self._frame is not None and self._frame is self.cached_frame
+
+    @property
+    def shared_path(self):
+        """Arrow IPC snapshot holding exactly ``df``, for workers to map; None if not shared."""
+        if self.cache is None or not self.cache.shared or self.cache_key is None:
+            return None
+        self.df
+        return self.cache.path_for(self.cache_key)
+
+    @cached_property
+    def fingerprint(self):
+        """Identity of ``df`` for the result cache: the snapshot key, else a content hash."""
+        return self.cache_key or frame_fingerprint(self.df)
+
+    @cached_property
+    def columns(self):
+        """Column names used by the queries, detected by name."""
+        return detect_columns(self.df)
+
+    @cached_property
+    def row_index(self):
+        """``RowIndex`` over price, year, condition and odometer (sorted) and make and state (bitmaps).
+
+        Saved beside the cleaned snapshot when there is a cache, so it is
+        built once per source file and cleaning policy.
+        """
+        numeric = [column for column in (self.columns.price, self.columns.year, self.columns.condition,
+                                         self.columns.odometer) if column is not None]
+        categorical = [column for column in (self.columns.brand, self.columns.state) if column is not None]
+        path = None if self.cache_key is None else index_path(self.cache.cache_dir, self.cache_key)
+        return RowIndex.load_or_build(self.df, numeric, categorical, path=path)[0]
+
+    @property
+    def indexed(self):
+        """True once ``row_index`` is loaded; filters then use it instead of scanning."""
+        return 'row_index' in self.__dict__
+
+    def invalidate(self):
+        """Forget memoized query results (the frame itself is kept)."""
+        self._results.clear()
+
+    # -- helpers ------------------------------------------------------------
+
+    def _require(self, *names):
+        missing = [name for name in names if getattr(self.columns, name) is None]
+        if missing:
+            raise KeyError(f"Column(s) not found in dataset: {', '.join(missing)}")
+        return [getattr(self.columns, name) for name in names]
+
+    def _grouped(self, by, agg, value=None, where=None, frame=None):
+        plan = QueryPlan()
+        if where is not None:
+            plan.add_filter('where', lambda frame: where)
+        plan.add('result', by=by, agg=agg, value=value, where=None if where is None else 'where')
+        return plan.execute(self.df if frame is None else frame)['result']
+
+    def _where(self, *predicates):
+        """Rows matching every ``(column, op, value)`` predicate, by index lookup once indexed."""
+        if self.indexed:
+            return self.df.iloc[self.row_index.where(*predicates)]
+        return self.df[mask_where(self.df, *predicates)]
+
+    # -- Task 2 -------------------------------------------------------------
+
+    @query
+    def price_stats(self):
+        """Average, minimum and maximum selling price (2.1)."""
+        price, = self._require('price')
+        values = self.df[price]
+        return pd.Series({'mean': values.mean(), 'min': values.min(), 'max': values.max()}, name=price)
+
+    @query
+    def unique_colors(self):
+        """Distinct colors in order of appearance (2.2)."""
+        color, = self._require('color')
+        return self.df[color].unique()
+
+    @query
+    def unique_counts(self):
+        """Number of distinct brands and models (2.3)."""
+        brand, model = self._require('brand', 'model')
+        return pd.Series({'brands': self.df[brand].nunique(), 'models': self.df[model].nunique()})
+
+    @query
+    def high_price_cars(self, threshold=165000):
+        """Sales above ``threshold`` dollars (2.4)."""
+        price, = self._require('price')
+        return self._where((price, '>', threshold))
+
+    @query
+    def top_models(self, n=5):
+        """The ``n`` most frequently sold models (2.5)."""
+        model, = self._require('model')
+        return self._grouped(model, 'size').sort_values(ascending=False).head(n)
+
+    @query
+    def avg_price_by_make(self):
+        """Average selling price per make, highest first (2.6)."""
+        price, brand = self._require('price', 'brand')
+        return self._grouped(brand, 'mean', price).sort_values(ascending=False)
+
+    @query
+    def min_price_by_interior(self):
+        """Lowest selling price per interior color (2.7)."""
+        price, interior = self._require('price', 'interior')
+        return self._grouped(interior, 'min', price).sort_values()
+
+    @query
+    def max_odometer_by_year(self):
+        """Highest odometer reading per model year, highest first (2.8)."""
+        odometer, year = self._require('odometer', 'year')
+        return self._grouped(year, 'max', odometer).sort_values(ascending=False)
+
+    @query
+    def car_age(self, reference_year=CURRENT_YEAR):
+        """Age of each car in years (2.9)."""
+        year, = self._require('year')
+        return (reference_year - self.df[year]).rename('car_age')
+
+    @query
+    def well_kept_high_mileage(self, min_condition=48, min_odometer=90000):
+        """Cars with condition >= ``min_condition`` and odometer > ``min_odometer`` (2.10)."""
+        condition, odometer = self._require('condition', 'odometer')
+        return self._where((condition, '>=', min_condition), (odometer, '>', min_odometer))
+
+    @query
+    def avg_price_by_state(self, newer_than=2013):
+        """Average price per state for model years after ``newer_than`` (2.11)."""
+        price, year, state = self._require('price', 'year', 'state')
+        if self.indexed:
+            # Only the matching rows are read and grouped
+            result = self._grouped(state, 'mean', price, frame=self._where((year, '>', newer_than)))
+        else:
+            newer = (self.df[year] > newer_than).to_numpy()
+            result = self._grouped(state, 'mean', price, where=newer)
+        return result.sort_values(ascending=False)
+
+    @query
+    def excellent_threshold(self, quantile=0.80):
+        """Condition score at the ``quantile`` (2.12)."""
+        condition, = self._require('condition')
+        return self.df[condition].quantile(quantile)
+
+    @query
+    def value_for_money(self, quantile=0.80):
+        """Average price per make among top-condition cars, cheapest first (2.12)."""
+        price, brand, condition = self._require('price', 'brand', 'condition')
+        excellent = (self.df[condition] >= self.excellent_threshold(quantile)).to_numpy()
+        return self._grouped(brand, 'mean', price, where=excellent).sort_values()
+
+    # -- Task 3 -------------------------------------------------------------
+
+    @query
+    def correlation(self):
+        """Correlation matrix of the numeric columns plus car age (3.1)."""
+        numerical = self.df.select_dtypes(include=[np.number])
+        if self.columns.year is not None:
+            numerical = numerical.assign(car_age=self.car_age())
+        return numerical.corr()
+
+    @query
+    def avg_price_by_year(self):
+        """Average selling price per model year (3.2)."""
+        price, year = self._require('price', 'year')
+        return self._grouped(year, 'mean', price).sort_index()
+
+    @query
+    def cars_by_state(self):
+        """Number of sales per state, most first (3.4)."""
+        state, = self._require('state')
+        return self._grouped(state, 'size').sort_values(ascending=False)
+
+    @cached_property
+    def price_box_stats(self):
+        """``GroupedBoxStats`` of price per color, for plotting 3.7."""
+        price, color = self._require('price', 'color')
+        return GroupedBoxStats(self.df[color], self.df[price])
+
+    @query
+    def price_by_color(self):
+        """Quartiles, whiskers and outlier count of price per color, by median (3.7)."""
+        stats = self.price_box_stats.stats(order=self.price_box_stats.order_by_median())
+        table = pd.DataFrame([{key: box[key] for key in ('label', 'whislo', 'q1', 'med', 'q3', 'whishi',
+                                                         'mean', 'n_fliers')} for box in stats])
+        return table.set_index('label').rename_axis(self.columns.color)
+
+    # -- Pricing ------------------------------------------------------------
+
+    @query
+    def price_model(self, prior_rows=PRIOR_ROWS):
+        """Per-(make, body, year) linear price model on MMR, condition, odometer and age."""
+        return fit_price_model(self.df, prior_rows=prior_rows, sale_year=CURRENT_YEAR)
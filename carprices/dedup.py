@@ -0,0 +1,294 @@
+"""
+Hash-based duplicate detection.
+
+Rows are reduced to one 64-bit hash each with the vectorized
+``pd.util.hash_pandas_object``, either over every column (exact-duplicate
+rows, like ``df.duplicated()``) or over a sale key of VIN, sale date and
+selling price. Duplicates are then found among integers instead of by
+comparing wide string rows.
+
+``StreamingDeduplicator`` applies the same idea to chunked input. The new
+hashes of each chunk form a sorted run; runs of similar size are merged,
+and above a memory limit they are split by partition and written to disk,
+where the runs are merged the same way and searched through a memory map.
+Each hash is thus sorted and rewritten a logarithmic number of times, and
+``dedup_file`` deduplicates inputs far larger than memory in one pass.
+
+With 64-bit hashes, the chance of any collision among 100M rows is about
+3 in 10,000.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from carprices.io import DEFAULT_CHUNKSIZE, iter_chunks
+
+# Identity of a sale: the same car sold on the same date for the same price
+SALE_KEY = ['vin', 'saledate', 'sellingprice']
+
+DEFAULT_PARTITION_BITS = 6
+DEFAULT_MAX_MEMORY_KEYS = 10_000_000
+# Runs are merged while the older one is less than this times the newer one's size
+MERGE_RATIO = 1.5
+# Keys read from each run per step of an on-disk merge
+MERGE_BLOCK = 1 << 20
+
+
+def row_hashes(df, subset=None):
+    """One uint64 hash per row over ``subset`` (default: all columns).
+
+    Numeric columns are hashed as float64, so a value hashes the same in a
+    batch read as int16 and in one coerced to float32 (see ``iter_chunks``).
+    """
+    frame = df if subset is None else df[list(subset)]
+    numeric = {column: 'float64' for column, dtype in frame.dtypes.items()
+               if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+               and dtype != 'float64'}
+    if numeric:
+        frame = frame.astype(numeric)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def available_key(df, key=SALE_KEY):
+    """``key`` if all of its columns are present in ``df``, else None."""
+    return list(key) if all(column in df.columns for column in key) else None
+
+
+def duplicate_mask(df, subset=None, keep='first'):
+    """Boolean mask of duplicate rows, like ``df.duplicated(subset, keep)``."""
+    hashes = pd.Series(row_hashes(df, subset), index=df.index)
+    return hashes.duplicated(keep=keep)
+
+
+class DedupReport:
+    """Counts and a few example rows from a duplicate scan."""
+
+    def __init__(self, rows, duplicates, examples, subset=None):
+        self.rows = rows
+        self.duplicates = duplicates
+        self.examples = examples
+        self.subset = subset
+
+    @property
+    def unique(self):
+        return self.rows - self.duplicates
+
+    def summary(self):
+        on = 'all columns' if self.subset is None else ' + '.join(self.subset)
+        pct = self.duplicates / self.rows * 100 if self.rows else 0.0
+        return f"{self.duplicates:,} duplicate rows of {self.rows:,} ({pct:.2f}%) keyed on {on}"
+
+
+def find_duplicates(df, subset=None, max_examples=5):
+    """Scan ``df`` and return ``(mask, DedupReport)``."""
+    mask = duplicate_mask(df, subset)
+    examples = df[mask].head(max_examples)
+    return mask, DedupReport(len(df), int(mask.sum()), examples, subset)
+
+
+def drop_duplicates(df, subset=None):
+    """Hash-based equivalent of ``df.drop_duplicates(subset)``."""
+    return df[~duplicate_mask(df, subset)]
+
+
+class StreamingDeduplicator:
+    """Removes duplicates across a stream of chunks with a disk-spilling hash set.
+
+    Parameters
+    ----------
+    subset : list of str, optional
+        Columns defining a duplicate (default: all columns).
+    max_memory_keys : int
+        Hashes held in memory before they are written to disk as sorted runs.
+    partition_bits : int
+        The top bits of each hash select one of ``2**partition_bits``
+        partitions, so a spill or lookup only touches that partition's runs.
+    spill_dir : str, optional
+        Where the runs go; a temporary directory by default, removed by
+        ``close()``.
+    max_examples : int
+        Duplicate rows kept for the report.
+    """
+
+    def __init__(self, subset=None, max_memory_keys=DEFAULT_MAX_MEMORY_KEYS,
+                 partition_bits=DEFAULT_PARTITION_BITS, spill_dir=None, max_examples=5):
+        self.subset = subset
+        self.max_memory_keys = max_memory_keys
+        self.partition_bits = partition_bits
+        self.partitions = 1 << partition_bits
+        self._own_dir = spill_dir is None
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix='carprices-dedup-')
+        os.makedirs(self.spill_dir, exist_ok=True)
+        # Sorted runs of new keys: one per chunk, merged as they pile up
+        self._memory = []
+        self._memory_keys = 0
+        # Per partition, the sorted run files on disk as memory maps
+        self._runs = [[] for _ in range(self.partitions)]
+        self._run_count = 0
+        self.spills = 0
+        self.bytes_written = 0
+        self.rows = 0
+        self.duplicates = 0
+        self.max_examples = max_examples
+        self._examples = []
+
+    def _partition_bounds(self, keys):
+        """Start of each partition in the sorted ``keys``, plus ``len(keys)``."""
+        firsts = np.arange(1, self.partitions, dtype=np.uint64) << np.uint64(64 - self.partition_bits)
+        return np.concatenate([[0], np.searchsorted(keys, firsts), [len(keys)]])
+
+    def _write_run(self, p, keys):
+        path = os.path.join(self.spill_dir, f"part-{p:04d}-{self._run_count:06d}.u64")
+        self._run_count += 1
+        keys.tofile(path)
+        self.bytes_written += keys.nbytes
+        return path
+
+    def _merge_on_disk(self, p, older, newer):
+        """Stream two sorted runs into one file, a block at a time."""
+        path = os.path.join(self.spill_dir, f"part-{p:04d}-{self._run_count:06d}.u64")
+        self._run_count += 1
+        i = j = 0
+        with open(path, 'wb') as handle:
+            while i < len(older) or j < len(newer):
+                left, right = older[i:i + MERGE_BLOCK], newer[j:j + MERGE_BLOCK]
+                if len(left) and len(right):
+                    # Everything up to the smaller block end is final
+                    limit = min(left[-1], right[-1])
+                    left = left[:np.searchsorted(left, limit, side='right')]
+                    right = right[:np.searchsorted(right, limit, side='right')]
+                block = np.sort(np.concatenate([left, right]), kind='stable')
+                block.tofile(handle)
+                i, j = i + len(left), j + len(right)
+        self.bytes_written += (len(older) + len(newer)) * 8
+        os.remove(older.filename)
+        os.remove(newer.filename)
+        return np.memmap(path, dtype=np.uint64, mode='r')
+
+    def _spill(self):
+        keys = _merged(self._memory)
+        bounds = self._partition_bounds(keys)
+        for p in np.flatnonzero(np.diff(bounds)):
+            runs = self._runs[p]
+            path = self._write_run(p, keys[bounds[p]:bounds[p + 1]])
+            runs.append(np.memmap(path, dtype=np.uint64, mode='r'))
+            # Merge runs of similar size, so each key is rewritten O(log spills) times
+            while len(runs) > 1 and len(runs[-2]) < MERGE_RATIO * len(runs[-1]):
+                newer, older = runs.pop(), runs.pop()
+                runs.append(self._merge_on_disk(p, older, newer))
+        self._memory = []
+        self._memory_keys = 0
+        self.spills += 1
+
+    def filter(self, chunk):
+        """Return the rows of ``chunk`` not seen before (in this or earlier chunks)."""
+        hashes = row_hashes(chunk, self.subset)
+        # Sorted stably, repeats within the chunk follow their first occurrence
+        order = np.argsort(hashes, kind='stable')
+        keys = hashes[order]
+        repeat = np.zeros(len(keys), dtype=bool)
+        repeat[1:] = keys[1:] == keys[:-1]
+        seen = repeat.copy()
+        for run in self._memory:
+            seen |= _contains(run, keys)
+        bounds = self._partition_bounds(keys)
+        for p in np.flatnonzero(np.diff(bounds)):
+            for run in self._runs[p]:
+                part = slice(bounds[p], bounds[p + 1])
+                seen[part] |= _contains(run, keys[part])
+        duplicate = np.empty(len(keys), dtype=bool)
+        duplicate[order] = seen
+
+        new_keys = keys[~seen]
+        if len(new_keys):
+            self._memory.append(new_keys)
+            self._memory_keys += len(new_keys)
+            while len(self._memory) > 1 and len(self._memory[-2]) < MERGE_RATIO * len(self._memory[-1]):
+                newer, older = self._memory.pop(), self._memory.pop()
+                self._memory.append(_merged([older, newer]))
+
+        self.rows += len(chunk)
+        found = int(duplicate.sum())
+        self.duplicates += found
+        if found and len(self._examples) < self.max_examples:
+            self._examples.append(chunk[duplicate].head(self.max_examples - len(self._examples)))
+        if self._memory_keys > self.max_memory_keys:
+            self._spill()
+        return chunk[~duplicate]
+
+    def report(self):
+        """``DedupReport`` for everything filtered so far."""
+        examples = pd.concat(self._examples) if self._examples else None
+        return DedupReport(self.rows, self.duplicates, examples, self.subset)
+
+    def close(self):
+        """Remove the spill files if the directory was created here."""
+        self._runs = [[] for _ in range(self.partitions)]
+        if self._own_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _merged(runs):
+    """One sorted array from sorted ``runs`` (the stable sort merges them in linear time)."""
+    if not runs:
+        return np.empty(0, dtype=np.uint64)
+    return np.sort(np.concatenate(runs), kind='stable')
+
+
+def _contains(run, keys):
+    """Which of the sorted ``keys`` are in the sorted ``run``."""
+    if not len(run):
+        return np.zeros(len(keys), dtype=bool)
+    index = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+    return run[index] == keys
+
+
+def dedup_file(path, output=None, subset=None, chunksize=DEFAULT_CHUNKSIZE,
+               max_memory_keys=DEFAULT_MAX_MEMORY_KEYS, spill_dir=None, stats=None):
+    """Find or drop the duplicate rows of a CSV file in one streaming pass.
+
+    Parameters
+    ----------
+    path : str or path-like
+        CSV file, plain or compressed, read with ``iter_chunks``.
+    output : str, optional
+        Write the rows seen for the first time here as CSV (typed values,
+        so sale dates come out in ISO format).
+    subset : list of str, optional
+        Columns defining a duplicate (default: all columns).
+    chunksize : int
+        Rows per batch.
+    max_memory_keys, spill_dir
+        As for ``StreamingDeduplicator``.
+    stats : ReadStats, optional
+        Filled with the bytes and time of the read.
+
+    Returns
+    -------
+    DedupReport
+    """
+    tmp = f"{output}.{os.getpid()}.tmp"
+    with StreamingDeduplicator(subset, max_memory_keys, spill_dir=spill_dir) as dedup:
+        try:
+            with open(tmp if output else os.devnull, 'w', newline='') as handle:
+                for number, chunk in enumerate(iter_chunks(path, chunksize=chunksize, stats=stats)):
+                    unique = dedup.filter(chunk)
+                    if output:
+                        unique.to_csv(handle, header=number == 0, index=False)
+            if output:
+                os.replace(tmp, output)
+        finally:
+            if output and os.path.exists(tmp):
+                os.remove(tmp)
+        return dedup.report()
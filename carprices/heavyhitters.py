@@ -0,0 +1,180 @@
+"""
+Heavy hitters and distinct counts in bounded memory.
+
+Top-N models or states and the number of distinct makes and models are
+normally computed from a hash table of every distinct value. On a
+multi-million-row feed with high-cardinality model and trim strings, two
+bounded-memory summaries take their place:
+
+* ``SpaceSaving`` keeps at most ``capacity`` counters. A value that is not
+  tracked takes over the smallest counter, and the count it inherits is
+  recorded as that counter's possible overestimate. Every value occurring
+  more than ``n / capacity`` times is guaranteed to be tracked, and each
+  reported count is an upper bound within ``error`` of the truth.
+* ``HyperLogLog`` hashes each value to one of ``2**precision`` one-byte
+  registers and estimates the distinct count from the longest run of
+  leading zero bits seen per register, with a relative standard error of
+  ``1.04 / sqrt(2**precision)`` (0.8% at the default precision 14, 16 KiB).
+
+Both fold in whole batches at a time and ``merge`` with a summary built on
+another chunk or process. ``capacity=None`` and ``exact=True`` switch them to
+exact counting, so the approximations can be validated on the same code path.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CAPACITY = 1000
+DEFAULT_PRECISION = 14
+
+
+def _batch_counts(values):
+    """Value counts of one batch with a plain (non-categorical) index, nulls dropped."""
+    counts = values.value_counts(dropna=True)
+    counts = counts[counts > 0]
+    if isinstance(counts.index, pd.CategoricalIndex):
+        counts.index = counts.index.astype(counts.index.categories.dtype)
+    return counts.astype('int64')
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter summary.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        Most counters kept. None counts every distinct value exactly.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.errors = pd.Series(dtype='int64')
+        self.n = 0
+
+    @property
+    def exact(self):
+        return self.capacity is None
+
+    @property
+    def floor(self):
+        """Upper bound on the count of any value that is not tracked."""
+        if self.capacity is None or len(self.counts) < self.capacity:
+            return 0
+        return int(self.counts.min())
+
+    def _combine(self, counts, errors, floor):
+        index = self.counts.index.union(counts.index)
+        own_floor = self.floor
+        self.counts = (self.counts.reindex(index, fill_value=own_floor)
+                       + counts.reindex(index, fill_value=floor))
+        self.errors = (self.errors.reindex(index, fill_value=own_floor)
+                       + errors.reindex(index, fill_value=floor))
+        if self.capacity is not None and len(self.counts) > self.capacity:
+            keep = self.counts.sort_values(ascending=False, kind='stable').index[:self.capacity]
+            self.counts = self.counts[keep]
+            self.errors = self.errors[keep]
+
+    def update(self, values):
+        """Count a batch of values (a Series); nulls are ignored. Returns the summary."""
+        counts = _batch_counts(values)
+        self.n += int(counts.sum())
+        self._combine(counts, pd.Series(0, index=counts.index, dtype='int64'), 0)
+        return self
+
+    def merge(self, other):
+        """Fold in a summary built on other rows. Returns the summary."""
+        self.n += other.n
+        self._combine(other.counts, other.errors, other.floor)
+        return self
+
+    def top(self, n):
+        """The ``n`` largest (estimated) counts, ties broken by label."""
+        frame = pd.DataFrame({'label': self.counts.index, 'count': self.counts.values})
+        frame = frame.sort_values(['count', 'label'], ascending=[False, True], kind='stable').head(n)
+        return pd.Series(frame['count'].values, index=pd.Index(frame['label'].values), name='count')
+
+    def bounds(self, n):
+        """Lower and upper count bounds for the top ``n``, and whether each is certain.
+
+        ``guaranteed`` means the value's lower bound beats the upper bound of
+        every value ranked below it, so it is in the true top ``n``.
+        """
+        top = self.top(n)
+        lower = top - self.errors[top.index].to_numpy()
+        rest = self.counts.drop(top.index)
+        next_upper = max(int(rest.max()) if len(rest) else 0, self.floor)
+        return pd.DataFrame({'lower': lower, 'upper': top, 'guaranteed': lower >= next_upper})
+
+
+def _bit_length(values):
+    """Exact bit length of each uint64 (0 for 0)."""
+    length = np.zeros(len(values), dtype=np.int64)
+    remaining = values.copy()
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = remaining >= (np.uint64(1) << np.uint64(shift))
+        length[high] += shift
+        remaining[high] >>= np.uint64(shift)
+    return length + (remaining > 0)
+
+
+class HyperLogLog:
+    """Mergeable approximate distinct count.
+
+    Parameters
+    ----------
+    precision : int
+        ``2**precision`` registers; the relative error is ``1.04 / sqrt(2**precision)``.
+    exact : bool
+        Keep the distinct values themselves instead, for validation.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION, exact=False):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.exact = exact
+        self.registers = None if exact else np.zeros(1 << precision, dtype=np.uint8)
+        self.values = set() if exact else None
+
+    @property
+    def relative_error(self):
+        return 0.0 if self.exact else 1.04 / np.sqrt(1 << self.precision)
+
+    def update(self, values):
+        """Add a batch of values (a Series); nulls are ignored. Returns the sketch."""
+        values = values.dropna()
+        if self.exact:
+            self.values.update(values.unique())
+            return self
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        p = np.uint64(self.precision)
+        register = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        rest = hashes << p
+        # Position of the first 1 bit in the remaining 64 - p bits
+        rank = np.where(rest == 0, 64 - self.precision + 1, 64 - _bit_length(rest) + 1)
+        np.maximum.at(self.registers, register, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        """Fold in a sketch with the same precision and mode. Returns the sketch."""
+        if self.exact != other.exact or self.precision != other.precision:
+            raise ValueError("Can only merge HyperLogLog sketches with the same precision and mode")
+        if self.exact:
+            self.values |= other.values
+        else:
+            np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Estimated number of distinct values."""
+        if self.exact:
+            return len(self.values)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting on the empty registers
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
@@ -0,0 +1,230 @@
+"""
+Binned counts, sums and means over fixed bin edges.
+
+Sections 3.3, 3.5 and 3.6 bin odometer and condition with ``pd.cut`` and
+group the price on the resulting ``Interval`` categories. ``Bins`` holds the
+edges as a plain float array instead. A value's bin is an integer code from
+one ``np.searchsorted``, and ``Histogram`` accumulates row counts, value
+counts and value sums per code with ``np.bincount``. Labels and bin centres
+are computed once per bin, not per row, and the frame is never modified.
+
+Bins are right-closed, ``(left, right]``, as with ``pd.cut``. Values outside
+the edges and nulls get code -1 and are not counted. The constructors
+reproduce ``pd.cut``'s edges:
+
+* ``Bins.fixed_width`` for ``bins=range(low, high + width + 1, width)``;
+* ``Bins.equal_width`` for ``bins=n``, including the 0.1% widening of the
+  first edge and the three-significant-digit rounding of the labels;
+* ``Bins.quantiles`` for quantile edges from values or a ``QuantileSketch``.
+
+``HistogramPlan`` collects several histograms, possibly over the same column
+at different widths. It converts each key and value column once, then bins
+it for every histogram that uses it. Edges are fixed before the first
+batch, so plans fed chunk by chunk ``merge`` exactly.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Significant digits of equal-width labels, as pd.cut's default precision
+LABEL_PRECISION = 3
+
+
+def _round_frac(x, precision):
+    """Round ``x`` to ``precision`` digits after its leading digit (pd.cut's label rounding)."""
+    if not np.isfinite(x) or x == 0:
+        return x
+    frac, whole = np.modf(x)
+    digits = -int(np.floor(np.log10(abs(frac)))) - 1 + precision if whole == 0 else precision
+    return np.around(x, digits)
+
+
+class Bins:
+    """Right-closed bins between consecutive ``edges``.
+
+    Parameters
+    ----------
+    edges : array-like
+        Increasing bin edges; ``len(edges) - 1`` bins.
+    label_edges : array-like, optional
+        Edges as shown in labels and used for bin centres (defaults to
+        ``edges``; ``equal_width`` passes rounded ones).
+
+    Integer edges are labelled as integers, float edges as floats
+    (``'(1, 6]'`` versus ``'(1.0, 6.0]'``), as ``pd.cut`` labels them.
+    """
+
+    def __init__(self, edges, label_edges=None):
+        self.integer = np.issubdtype(np.asarray(edges).dtype, np.integer)
+        edges = np.asarray(edges, dtype='float64')
+        if edges.ndim != 1 or len(edges) < 2:
+            raise ValueError("Bins need at least two edges")
+        if (np.diff(edges) <= 0).any():
+            raise ValueError("Bin edges must be strictly increasing")
+        self.edges = edges
+        self.label_edges = edges if label_edges is None else np.asarray(label_edges, dtype='float64')
+
+    @classmethod
+    def fixed_width(cls, low, high, width):
+        """Integer edges ``int(low), int(low) + width, ...`` up to at least ``high`` plus one bin.
+
+        The same edges as ``range(int(low), int(high) + width + 1, width)``.
+        """
+        return cls(np.arange(int(low), int(high) + width + 1, width))
+
+    @classmethod
+    def equal_width(cls, low, high, count):
+        """``count`` equal-width bins over ``[low, high]``, like ``pd.cut(values, bins=count)``.
+
+        Pass ``low`` and ``high`` in the column's own dtype (e.g. the float32
+        minimum of a float32 column) to get exactly pd.cut's edges.
+        """
+        if low == high:
+            low -= 0.001 * abs(low) if low != 0 else 0.001
+            high += 0.001 * abs(high) if high != 0 else 0.001
+            edges = np.linspace(low, high, count + 1, endpoint=True)
+        else:
+            edges = np.linspace(low, high, count + 1, endpoint=True)
+            edges[0] -= (high - low) * 0.001
+        edges = edges.astype('float64')
+        for precision in range(LABEL_PRECISION, 20):
+            label_edges = np.array([_round_frac(edge, precision) for edge in edges])
+            if len(np.unique(label_edges)) == len(edges):
+                break
+        return cls(edges, label_edges)
+
+    @classmethod
+    def quantiles(cls, source, count):
+        """Up to ``count`` bins holding about equal numbers of rows.
+
+        ``source`` is an array of values or a ``QuantileSketch``. Duplicate
+        edges (heavily repeated values) are merged. The lowest edge is moved
+        just below the minimum, so the smallest value is counted too.
+        """
+        q = np.linspace(0, 1, count + 1)
+        if hasattr(source, 'quantile'):
+            edges = np.asarray(source.quantile(q), dtype='float64')
+        else:
+            values = np.asarray(source, dtype='float64')
+            edges = np.quantile(values[~np.isnan(values)], q)
+        label_edges = np.unique(edges)
+        edges = label_edges.copy()
+        edges[0] = np.nextafter(edges[0], -np.inf)
+        return cls(edges, label_edges)
+
+    def __len__(self):
+        return len(self.edges) - 1
+
+    @property
+    def labels(self):
+        """``'(left, right]'`` per bin, as ``str(Interval)`` prints it."""
+        edges = self.label_edges.astype(np.int64) if self.integer else self.label_edges
+        edges = [str(edge) for edge in edges]
+        return [f"({left}, {right}]" for left, right in zip(edges[:-1], edges[1:])]
+
+    @property
+    def mids(self):
+        """Bin centres (of the label edges, like ``Interval.mid``)."""
+        return (self.label_edges[:-1] + self.label_edges[1:]) / 2
+
+    def assign(self, values):
+        """Bin code (int64) of each value; -1 for nulls and values outside the edges."""
+        values = np.asarray(values, dtype='float64')
+        codes = np.searchsorted(self.edges, values, side='left') - 1
+        codes[(codes < 0) | (codes >= len(self))] = -1
+        return codes
+
+
+class Histogram:
+    """Rows, value counts and value sums per bin; mergeable.
+
+    Parameters
+    ----------
+    bins : Bins
+    value : str, optional
+        Name of the summed column (only used for labelling).
+    """
+
+    def __init__(self, bins, value=None):
+        self.bins = bins
+        self.value = value
+        self.rows = np.zeros(len(bins), dtype=np.int64)
+        self.counts = np.zeros(len(bins), dtype=np.int64)
+        self.sums = np.zeros(len(bins), dtype='float64')
+
+    def update(self, codes, values=None):
+        """Add a batch of bin codes (from ``bins.assign``) and optional float64 values."""
+        inside = codes >= 0
+        self.rows += np.bincount(codes[inside], minlength=len(self.bins))
+        if values is not None:
+            valid = inside & ~np.isnan(values)
+            self.counts += np.bincount(codes[valid], minlength=len(self.bins))
+            self.sums += np.bincount(codes[valid], weights=values[valid], minlength=len(self.bins))
+        return self
+
+    def merge(self, other):
+        """Fold in a histogram over the same bins. Returns the histogram."""
+        if not np.array_equal(self.bins.edges, other.bins.edges):
+            raise ValueError("Can only merge histograms with the same bin edges")
+        self.rows += other.rows
+        self.counts += other.counts
+        self.sums += other.sums
+        return self
+
+    def _series(self, data, name):
+        return pd.Series(data, index=pd.Index(self.bins.labels, name='bin'), name=name)
+
+    def size(self):
+        """Rows per bin, empty bins included."""
+        return self._series(self.rows, 'count')
+
+    def sum(self):
+        return self._series(self.sums, self.value)
+
+    def mean(self):
+        """Mean value per bin; NaN for bins without values."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._series(np.where(self.counts > 0, self.sums / np.maximum(self.counts, 1), np.nan),
+                                self.value)
+
+
+class HistogramPlan:
+    """Several histograms computed in one pass over each batch."""
+
+    def __init__(self):
+        self.specs = {}
+        self.histograms = {}
+
+    def add(self, name, column, bins, value=None):
+        """Register a histogram of ``column`` over ``bins``, summing ``value`` if given."""
+        self.specs[name] = (column, bins, value)
+        self.histograms[name] = Histogram(bins, value)
+        return self
+
+    def update(self, df):
+        """Fold in a batch of rows. Returns the plan."""
+        numbers = {}
+
+        def column_values(column):
+            if column not in numbers:
+                numbers[column] = df[column].to_numpy(dtype='float64', na_value=np.nan)
+            return numbers[column]
+
+        codes = {}
+        for name, (column, bins, value) in self.specs.items():
+            key = (column, id(bins))
+            if key not in codes:
+                codes[key] = bins.assign(column_values(column))
+            self.histograms[name].update(codes[key], None if value is None else column_values(value))
+        return self
+
+    def merge(self, other):
+        """Fold in a plan with the same histograms built on other rows. Returns the plan."""
+        for name, histogram in other.histograms.items():
+            self.histograms[name].merge(histogram)
+        return self
+
+    def execute(self, df):
+        """``update`` with the whole frame and return ``{name: Histogram}``."""
+        self.update(df)
+        return self.histograms
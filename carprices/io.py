@@ -0,0 +1,370 @@
+"""
+Typed CSV ingestion for the car_prices dataset.
+
+``load_csv`` reads the file with the declared schema from
+``carprices.schema``: categoricals for the repeated strings, narrow numeric
+types for the measurements and a parsed ``saledate``. Passing ``columns``
+projects the read down to just the fields an analysis needs.
+
+Compressed sources (``.gz``, ``.bz2``, ``.zst``, ``.zip``) are decompressed
+as a stream while the parser consumes them, so the decompressed CSV never
+touches the disk. ``iter_chunks`` yields typed batches for chunked
+aggregation.
+"""
+
+import bz2
+import gzip
+import io
+import os
+import time
+import zipfile
+
+import pandas as pd
+
+from carprices.schema import COLUMNS, DATE_COLUMNS, NUMERIC_DTYPES, dtype_map
+
+# The raw saledate looks like 'Tue Dec 16 2014 12:30:00 GMT-0800 (PST)';
+# the first 33 characters carry everything up to and including the offset.
+SALEDATE_FORMAT = '%a %b %d %Y %H:%M:%S GMT%z'
+SALEDATE_WIDTH = 33
+
+
+# File suffix -> compression codec
+COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+    '.zip': 'zip',
+}
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def pyarrow_available():
+    """Return True if the pyarrow CSV engine can be used."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_engine(engine='auto'):
+    """Map ``'auto'`` to ``'pyarrow'`` when installed, else the C engine."""
+    if engine == 'auto':
+        return 'pyarrow' if pyarrow_available() else 'c'
+    if engine == 'pyarrow' and not pyarrow_available():
+        raise ImportError("engine='pyarrow' requested but pyarrow is not installed")
+    return engine
+
+
+def detect_compression(path):
+    """Return the codec implied by the file suffix, or None for plain CSV."""
+    suffix = os.path.splitext(str(path))[1].lower()
+    return COMPRESSION_SUFFIXES.get(suffix)
+
+
+class ReadStats:
+    """Byte counts and timing for one read of a (possibly compressed) source."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Zero the counts, e.g. before a source is read again from the start."""
+        self.compressed_bytes = 0
+        self.decompressed_bytes = 0
+        self.seconds = 0.0
+        self.codec = None
+
+    @property
+    def mb_per_s(self):
+        """Decompressed throughput in MB/s."""
+        if self.seconds <= 0:
+            return 0.0
+        return self.decompressed_bytes / (1024 * 1024) / self.seconds
+
+    def summary(self):
+        """One-line human readable summary."""
+        mb = self.decompressed_bytes / (1024 * 1024)
+        text = f"Read {mb:,.1f} MB in {self.seconds:.2f}s ({self.mb_per_s:,.1f} MB/s)"
+        if self.codec:
+            ratio = self.decompressed_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+            text += f" from {self.codec} source, ratio {ratio:.1f}x"
+        return text
+
+
+class _CountingReader(io.RawIOBase):
+    """Raw stream wrapper that counts the bytes passing through it."""
+
+    def __init__(self, stream, on_read):
+        self._stream = stream
+        self._on_read = on_read
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self._stream.readinto(buffer)
+        if count:
+            self._on_read(count)
+        return count
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+        super().close()
+
+
+def _zip_member(archive):
+    """Pick the CSV member of a zip archive."""
+    names = [name for name in archive.namelist() if not name.endswith('/')]
+    csv_names = [name for name in names if name.lower().endswith('.csv')]
+    candidates = csv_names or names
+    if len(candidates) != 1:
+        raise ValueError(f"Expected exactly one CSV file in the archive, found: {', '.join(candidates)}")
+    return candidates[0]
+
+
+def _open_decompressed(raw, codec):
+    """Wrap a compressed binary stream in a streaming decompressor."""
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if codec == 'bz2':
+        return bz2.BZ2File(raw, mode='rb')
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading .zst files requires the 'zstandard' package") from None
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+    raise ValueError(f"Unsupported compression: {codec}")
+
+
+class open_source:
+    """Open a plain or compressed CSV as a buffered, streaming binary reader.
+
+    Use as a context manager; byte counts and elapsed time are recorded on
+    ``stats`` when the block exits.
+    """
+
+    def __init__(self, path, compression='infer', stats=None):
+        self.path = path
+        self.codec = detect_compression(path) if compression == 'infer' else compression
+        self.stats = stats if stats is not None else ReadStats()
+        self._handles = []
+        self._start = None
+
+    def _count_compressed(self, count):
+        self.stats.compressed_bytes += count
+
+    def _count_decompressed(self, count):
+        self.stats.decompressed_bytes += count
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        self.stats.codec = self.codec
+        raw = open(self.path, 'rb')
+        self._handles.append(raw)
+        if self.codec is None:
+            stream = raw
+        elif self.codec == 'zip':
+            # The zip directory sits at the end of the file, so the archive
+            # needs the seekable file; the member itself is still streamed.
+            archive = zipfile.ZipFile(raw)
+            self._handles.append(archive)
+            member = archive.getinfo(_zip_member(archive))
+            self.stats.compressed_bytes += member.compress_size
+            stream = archive.open(member)
+            self._handles.append(stream)
+        else:
+            counted = io.BufferedReader(_CountingReader(raw, self._count_compressed))
+            self._handles.append(counted)
+            stream = _open_decompressed(counted, self.codec)
+            self._handles.append(stream)
+        reader = io.BufferedReader(_CountingReader(stream, self._count_decompressed), buffer_size=1 << 20)
+        self._handles.append(reader)
+        return reader
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats.seconds += time.perf_counter() - self._start
+        if self.codec is None:
+            self.stats.compressed_bytes = self.stats.decompressed_bytes
+        for handle in reversed(self._handles):
+            handle.close()
+        self._handles = []
+        return False
+
+
+def parse_saledate(values):
+    """Parse raw saledate strings into UTC timestamps (unparseable -> NaT)."""
+    values = values.astype('string').str.slice(0, SALEDATE_WIDTH)
+    return pd.to_datetime(values, format=SALEDATE_FORMAT, errors='coerce', utc=True)
+
+
+def _ordered_columns(columns):
+    """Validate a column projection and return it in file order."""
+    if columns is None:
+        return list(COLUMNS)
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns requested: {', '.join(unknown)}")
+    return [column for column in COLUMNS if column in columns]
+
+
+def read_options(columns=None, engine='auto'):
+    """Return the ``pd.read_csv`` keyword arguments for a typed read."""
+    columns = _ordered_columns(columns)
+    return {
+        'usecols': columns,
+        'dtype': dtype_map(columns),
+        'engine': resolve_engine(engine),
+    }
+
+
+def finalize(df):
+    """Apply the post-parse conversions (currently: saledate to datetime)."""
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = parse_saledate(df[column])
+    return df
+
+
+def _numeric_as_text(options):
+    """``read_options`` with the numeric columns read as text.
+
+    A handful of rows in the public export have shifted columns, which makes
+    the strict numeric dtypes fail. Reading those columns as text and
+    coercing them with ``coerce_numeric`` turns the bad values into nulls
+    that Task 1 cleaning then handles.
+    """
+    dtypes = {column: 'string' if column in NUMERIC_DTYPES else dtype
+              for column, dtype in options['dtype'].items()}
+    return {**options, 'dtype': dtypes}
+
+
+def coerce_numeric(df, int_as_float=False):
+    """Convert numeric columns read as text to their declared dtypes; bad values become null.
+
+    Integer columns holding nulls after the conversion become float32; with
+    ``int_as_float`` they always do, so batches of one read share a schema
+    whichever of them hold the nulls.
+    """
+    for column in df.columns:
+        if column not in NUMERIC_DTYPES:
+            continue
+        values = pd.to_numeric(df[column], errors='coerce')
+        target = NUMERIC_DTYPES[column]
+        if target.startswith('int') and (int_as_float or values.isnull().any()):
+            target = 'float32'
+        df[column] = values.astype(target)
+    return df
+
+
+def load_csv(path, columns=None, engine='auto', compression='infer', stats=None):
+    """Load the car_prices CSV with the declared schema.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Location of the CSV file, plain or ``.gz``/``.bz2``/``.zst``/``.zip``.
+    columns : list of str, optional
+        Columns to read. Defaults to all 16; see
+        ``carprices.schema.SECTION_COLUMNS`` for per-analysis projections.
+    engine : {'auto', 'pyarrow', 'c', 'python'}
+        CSV parser. ``'auto'`` uses pyarrow when it is installed.
+    compression : {'infer', None, 'gzip', 'bz2', 'zstd', 'zip'}
+        Source codec; ``'infer'`` goes by the file suffix.
+    stats : ReadStats, optional
+        Filled with byte counts and throughput for the read.
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    options = read_options(columns, engine)
+    try:
+        with open_source(path, compression, stats) as source:
+            df = pd.read_csv(source, **options)
+    except (ValueError, TypeError):
+        # Malformed numeric fields: read again with those columns as text.
+        # The stats describe this second, complete read.
+        if stats is not None:
+            stats.reset()
+        with open_source(path, compression, stats) as source:
+            df = coerce_numeric(pd.read_csv(source, **_numeric_as_text(options)))
+    return finalize(df)
+
+
+def chunksize_for_memory(bytes_per_row, max_memory_mb, overhead=3.0):
+    """Rows per batch that keep a parsed batch under ``max_memory_mb``.
+
+    ``overhead`` covers the parser's own buffers and the temporary copies an
+    aggregation makes while working on the batch.
+    """
+    budget = max_memory_mb * 1024 * 1024
+    return max(1_000, int(budget / (bytes_per_row * overhead)))
+
+
+def iter_chunks(path, columns=None, chunksize=DEFAULT_CHUNKSIZE, compression='infer',
+                stats=None, max_memory_mb=None):
+    """Yield typed DataFrame batches of at most ``chunksize`` rows.
+
+    The source is decompressed incrementally as batches are consumed, so
+    memory stays bounded by the batch size. Categorical columns carry only
+    the categories seen in their own batch.
+
+    With ``max_memory_mb`` the batch size is derived from the measured
+    in-memory width of the first batch instead of ``chunksize``.
+
+    If a batch has a malformed numeric field, the source is read again from
+    the start with the numeric columns as text, the rows already yielded are
+    skipped, and every later batch is coerced like ``load_csv``'s fallback.
+    In those batches the integer columns are always float32, null or not,
+    so their dtypes do not depend on where the bad rows fall; the batches
+    yielded before the switch keep the strict dtypes. The batches hold the
+    same values ``load_csv`` returns, and ``stats`` describe the second read.
+    """
+    options = read_options(columns, engine='c')
+    size = chunksize if max_memory_mb is None else min(chunksize, 10_000)
+
+    def batches(as_text, skip):
+        with open_source(path, compression, stats) as source:
+            with pd.read_csv(source, iterator=True, **(_numeric_as_text(options) if as_text else options)) as reader:
+                while skip > 0:
+                    skip -= len(reader.get_chunk(min(skip, size)))
+                while True:
+                    try:
+                        chunk = reader.get_chunk(size)
+                    except StopIteration:
+                        return
+                    yield coerce_numeric(chunk, int_as_float=True) if as_text else chunk
+
+    reader, as_text, yielded = batches(False, 0), False, 0
+    while True:
+        try:
+            chunk = next(reader)
+        except StopIteration:
+            return
+        except (ValueError, TypeError):
+            if as_text:
+                raise
+            as_text = True
+            if stats is not None:
+                stats.reset()
+            reader = batches(True, yielded)
+            continue
+        chunk = finalize(chunk)
+        if max_memory_mb is not None and len(chunk):
+            bytes_per_row = chunk.memory_usage(deep=True).sum() / len(chunk)
+            size = chunksize_for_memory(bytes_per_row, max_memory_mb)
+        yielded += len(chunk)
+        yield chunk
+
+
+def iter_frame_chunks(df, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield row slices of an in-memory frame, for feeding chunked consumers."""
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
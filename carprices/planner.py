@@ -0,0 +1,211 @@
+"""
+Fused execution of the report's grouped aggregations.
+
+The report groups the same frame by make, interior, year and state several
+times over, each time re-hashing the key column, and materializes filtered
+copies for the newer-car and excellent-condition subsets. ``QueryPlan``
+collects every requested aggregation first and then executes them together:
+
+* each key column is factorized once and its integer codes are shared by all
+  metrics grouped on it;
+* each filter is evaluated once into a boolean mask, never a copy;
+* count and sum for a (key, value, filter) triple are computed once with
+  ``np.bincount`` and shared by ``count``/``sum``/``mean`` queries.
+
+``compare`` runs the same queries the sequential pandas way and reports the
+per-query timings side by side.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+AGGREGATIONS = ('count', 'sum', 'mean', 'min', 'max', 'size')
+
+
+class Query:
+    """One grouped aggregation: ``agg`` of ``value`` per ``by``, optionally filtered."""
+
+    def __init__(self, name, by, agg, value=None, where=None):
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{agg}', expected one of: {', '.join(AGGREGATIONS)}")
+        if value is None and agg != 'size':
+            raise ValueError(f"Aggregation '{agg}' needs a value column")
+        self.name = name
+        self.by = by
+        self.agg = agg
+        self.value = value
+        self.where = where
+
+
+def factorize(values):
+    """Integer codes (-1 for null) and sorted labels for a key column."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+        if not labels.is_monotonic_increasing:
+            # Vocabulary-encoded columns keep categories in stable code order;
+            # relabel the codes by sorted position without touching strings
+            order = labels.argsort()
+            rank = np.empty(len(labels) + 1, dtype=np.int64)
+            rank[order] = np.arange(len(labels))
+            rank[-1] = -1
+            codes, labels = rank[codes], labels[order]
+        return codes, labels
+    codes, labels = pd.factorize(values, sort=True)
+    return codes, labels
+
+
+class QueryPlan:
+    """Collects grouped aggregations and executes them in a fused pass."""
+
+    def __init__(self):
+        self.queries = []
+        self.filters = {}
+        self.report = None
+
+    def add_filter(self, name, predicate):
+        """Register a row filter; ``predicate(df)`` returns a boolean mask."""
+        self.filters[name] = predicate
+        return self
+
+    def add(self, name, by, agg, value=None, where=None):
+        """Register a query; results are keyed by ``name``."""
+        if where is not None and where not in self.filters:
+            raise KeyError(f"Unknown filter '{where}'")
+        self.queries.append(Query(name, by, agg, value, where))
+        return self
+
+    # -- fused execution ----------------------------------------------------
+
+    def execute(self, df):
+        """Run all queries and return ``{name: Series}``.
+
+        Each Series is indexed by the observed group labels in sorted order,
+        like ``df.groupby(by, observed=True)[value].agg()``.
+        """
+        timings = {}
+        keys = {}
+        masks = {}
+        cells = {}
+        results = {}
+
+        for query in self.queries:
+            if query.by not in keys:
+                start = time.perf_counter()
+                keys[query.by] = factorize(df[query.by])
+                timings[f"factorize {query.by}"] = time.perf_counter() - start
+            if query.where is not None and query.where not in masks:
+                start = time.perf_counter()
+                masks[query.where] = np.asarray(self.filters[query.where](df), dtype=bool)
+                timings[f"filter {query.where}"] = time.perf_counter() - start
+
+        for query in self.queries:
+            start = time.perf_counter()
+            codes, labels = keys[query.by]
+            cell_key = (query.by, query.value, query.where)
+            cell = cells.get(cell_key)
+            if cell is None:
+                cell = _Cell(df, codes, len(labels), query.value, masks.get(query.where))
+                cells[cell_key] = cell
+            results[query.name] = cell.result(query, labels)
+            timings[query.name] = time.perf_counter() - start
+
+        self.report = pd.Series(timings, name='fused_s')
+        return results
+
+    # -- sequential reference -----------------------------------------------
+
+    def execute_sequential(self, df):
+        """Run each query independently with pandas, as the script used to."""
+        timings = {}
+        results = {}
+        for query in self.queries:
+            start = time.perf_counter()
+            frame = df[self.filters[query.where](df)] if query.where is not None else df
+            grouped = frame.groupby(query.by, observed=True)
+            if query.agg == 'size':
+                result = grouped.size()
+            else:
+                result = getattr(grouped[query.value], query.agg)()
+            results[query.name] = result[result.notna()]
+            timings[query.name] = time.perf_counter() - start
+        return results, pd.Series(timings, name='sequential_s')
+
+    def compare(self, df):
+        """Timing report (milliseconds) of sequential versus fused execution."""
+        _, sequential = self.execute_sequential(df)
+        self.execute(df)
+        report = pd.concat([sequential, self.report], axis=1) * 1000
+        report.columns = ['sequential_ms', 'fused_ms']
+        report.loc['TOTAL'] = report.sum()
+        report['speedup'] = report['sequential_ms'] / report['fused_ms']
+        return report
+
+
+class _Cell:
+    """Shared per-(key, value, filter) state: valid rows, counts and sums."""
+
+    def __init__(self, df, codes, n_groups, value, mask):
+        valid = codes >= 0
+        if mask is not None:
+            valid &= mask
+        self.dtype = None
+        if value is not None:
+            column = df[value]
+            self.dtype = column.dtype
+            values = column.to_numpy(dtype='float64', na_value=np.nan)
+            valid &= ~np.isnan(values)
+            self.values = values[valid]
+        self.codes = codes[valid]
+        self.n_groups = n_groups
+        self._count = None
+        self._sum = None
+
+    @property
+    def count(self):
+        if self._count is None:
+            self._count = np.bincount(self.codes, minlength=self.n_groups)
+        return self._count
+
+    @property
+    def sum(self):
+        if self._sum is None:
+            self._sum = np.bincount(self.codes, weights=self.values, minlength=self.n_groups)
+        return self._sum
+
+    def _extreme(self, ufunc, initial):
+        out = np.full(self.n_groups, initial)
+        ufunc.at(out, self.codes, self.values)
+        return out
+
+    def result(self, query, labels):
+        observed = self.count > 0
+        if query.agg in ('size', 'count'):
+            data = self.count
+        elif query.agg == 'sum':
+            data = self.sum
+        elif query.agg == 'mean':
+            data = self.sum[observed] / self.count[observed]
+        elif query.agg == 'min':
+            data = self._extreme(np.minimum, np.inf)
+        else:
+            data = self._extreme(np.maximum, -np.inf)
+        if len(data) == self.n_groups:
+            data = data[observed]
+        index = pd.Index(np.asarray(labels)[observed], name=query.by)
+        series = pd.Series(data, index=index, name='count' if query.agg == 'size' else query.value)
+        return series.astype(self._output_dtype(query.agg))
+
+    def _output_dtype(self, agg):
+        # Match pandas: extremes keep the column dtype, float32 means stay
+        # float32, counts are int64. Means are accumulated in float64 first,
+        # so they are correctly rounded (pandas sums float32 groups in
+        # float32 and can be off by an ulp).
+        if agg in ('size', 'count'):
+            return 'int64'
+        if agg in ('min', 'max'):
+            return self.dtype
+        if agg == 'mean' and self.dtype == np.float32:
+            return 'float32'
+        return 'float64'
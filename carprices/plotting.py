@@ -0,0 +1,62 @@
+"""
+Lazy access to the plotting stack.
+
+matplotlib and seaborn together take over a second to import, which query
+and Task 2 runs never need. Nothing in ``carprices`` imports them at module
+level: chart code calls ``pyplot()``, which imports matplotlib (and seaborn,
+for the report style) on first use and applies the chart style once per
+process.
+
+Report runs only save figures, so the command line and the rendering
+worker processes select the non-interactive Agg backend via
+``use_headless_backend`` unless ``MPLBACKEND`` says otherwise. A notebook
+calling ``run_report`` keeps whatever backend it configured.
+"""
+
+import os
+import sys
+
+HEADLESS_BACKEND = 'Agg'
+
+_STYLE_APPLIED = False
+
+
+def use_headless_backend(backend=HEADLESS_BACKEND):
+    """Render with ``backend`` (default Agg) without importing matplotlib.
+
+    Sets ``MPLBACKEND`` for this process and the ones it starts, so call it
+    only from entry points and worker initializers. An explicit
+    ``MPLBACKEND`` wins, and if matplotlib is already imported its backend
+    is left alone: charts are saved to files and closed, which works with
+    any backend, including a notebook's inline one.
+    """
+    if 'MPLBACKEND' not in os.environ and 'matplotlib' not in sys.modules:
+        os.environ['MPLBACKEND'] = backend
+
+
+def apply_plot_style():
+    """Chart style shared by the script and worker processes."""
+    global _STYLE_APPLIED
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+    _STYLE_APPLIED = True
+
+
+def pyplot():
+    """``matplotlib.pyplot``, imported and styled on first call."""
+    if not _STYLE_APPLIED:
+        apply_plot_style()
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def seaborn():
+    """The ``seaborn`` module, imported on first call."""
+    pyplot()
+    import seaborn as sns
+
+    return sns
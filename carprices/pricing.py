@@ -0,0 +1,303 @@
+"""
+Segment pricing models: selling price from MMR, condition, odometer and age.
+
+The pricing rule in ``docs/COMPREHENSIVE_ANALYSIS_REPORT.md`` starts from
+the MMR and adds hand-picked condition, mileage and age adjustments.
+``fit_price_model`` fits those adjustments from the cleaned data instead,
+as one linear model per (make, body, year) segment:
+
+    price = b0 + b1 * mmr + b2 * condition + b3 * odometer + b4 * age
+
+Most segments hold only a handful of sales, so each level of the hierarchy
+is a ridge regression shrunk toward the level above it: (make, body, year)
+toward (make, body), that toward make, and make toward one global model. A
+segment with ``prior_rows`` sales sits about halfway between its own least
+squares fit and its parent's; a segment never seen is priced by its parent.
+Fitting only needs the per-segment sums X'X and X'y. They are computed with
+``np.bincount`` at the finest level and summed up the hierarchy, and every
+level is then solved in one batched ``np.linalg.solve``.
+
+A ``PriceModel`` is a coefficient table plus the sorted segment keys, a few
+hundred KB as ``.npz``. Scoring maps make and body to model codes once per
+distinct label, finds each row's finest known segment with
+``np.searchsorted`` and takes a row-wise dot product, with no Python loop
+over rows. ``benchmarks/bench_pricing.py`` measures accuracy and throughput.
+
+Age is the years between the model year and the sale (``saledate``). For
+frames without a sale date it is counted to ``sale_year``, by default the
+``CURRENT_YEAR`` that section 2.9 uses.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from carprices.schema import CURRENT_YEAR
+from carprices.vocab import normalize_key
+
+MODEL_VERSION = 1
+PRIOR_ROWS = 25.0
+
+# Inputs are divided by these so all coefficients are of similar size and
+# one ridge penalty fits them all
+FEATURES = {'mmr': 10_000.0, 'condition': 10.0, 'odometer': 100_000.0, 'age': 10.0}
+LEVELS = ('global', 'make', 'make_body', 'make_body_year')
+PRICE_COLUMN = 'sellingprice'
+
+
+def _label_codes(values, index=None):
+    """Codes of ``values`` by normalized label, plus ``{key: code}`` and display labels.
+
+    Without ``index`` every distinct label gets a code in order of first
+    appearance; with one, unknown labels and nulls get -1.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        raw, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        raw, uniques = pd.factorize(values)
+    keys = [normalize_key(label) for label in uniques]
+    labels = []
+    if index is None:
+        index = {}
+        for key, label in zip(keys, uniques):
+            if key not in index:
+                index[key] = len(index)
+                labels.append(' '.join(str(label).split()))
+    # The trailing -1 is what raw code -1 (null) picks
+    mapping = np.array([index.get(key, -1) for key in keys] + [-1], dtype=np.int64)
+    return mapping[raw], index, labels
+
+
+def design_matrix(df, sale_year=CURRENT_YEAR):
+    """Scaled model inputs: a column of ones, then mmr, condition, odometer and age.
+
+    Returns a float64 array of shape ``(len(df), 5)``; nulls stay NaN.
+    """
+    X = np.empty((len(df), len(FEATURES) + 1))
+    X[:, 0] = 1.0
+    year = df['year'].to_numpy(dtype='float64', na_value=np.nan)
+    if 'saledate' in df.columns:
+        sold = df['saledate'].dt.year.to_numpy(dtype='float64', na_value=np.nan)
+        sold[np.isnan(sold)] = sale_year
+    else:
+        sold = sale_year
+    for i, (name, scale) in enumerate(FEATURES.items(), 1):
+        values = sold - year if name == 'age' else df[name].to_numpy(dtype='float64', na_value=np.nan)
+        np.divide(values, scale, out=X[:, i])
+    return X
+
+
+def _lookup(keys, query):
+    """Position of each ``query`` value in the sorted ``keys`` and whether it is there."""
+    if len(keys) == 0:
+        return np.zeros(len(query), dtype=np.int64), np.zeros(len(query), dtype=bool)
+    pos = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+    return pos, keys[pos] == query
+
+
+def _gram(groups, count, X, y):
+    """Per-group X'X, shape ``(count, p, p)``, and X'y, shape ``(count, p)``."""
+    p = X.shape[1]
+    xtx = np.empty((count, p, p))
+    for i in range(p):
+        for j in range(i, p):
+            xtx[:, i, j] = xtx[:, j, i] = np.bincount(groups, weights=X[:, i] * X[:, j], minlength=count)
+    xty = np.stack([np.bincount(groups, weights=X[:, i] * y, minlength=count) for i in range(p)], axis=1)
+    return xtx, xty
+
+
+def _sum_groups(groups, count, values):
+    """Sum ``values`` (one entry or array per row of ``groups``) per group."""
+    flat = values.reshape(len(values), -1).astype('float64')
+    sums = np.stack([np.bincount(groups, weights=flat[:, i], minlength=count) for i in range(flat.shape[1])],
+                    axis=1)
+    return sums.reshape((count,) + values.shape[1:])
+
+
+class PriceModel:
+    """Per-segment linear price models with fallback to coarser segments.
+
+    Built by ``fit_price_model`` or ``PriceModel.load``. ``table`` holds one
+    row of scaled coefficients per segment: the global model first, then
+    every make, (make, body) and (make, body, year) segment. ``keys[l]`` are
+    the sorted segment keys of level ``l`` and ``offsets[l]`` the table row
+    of its first segment.
+    """
+
+    def __init__(self, makes, bodies, year_min, year_span, keys, table, rows, prior_rows, sale_year):
+        self.makes = list(makes)
+        self.bodies = list(bodies)
+        self.make_index = {normalize_key(label): code for code, label in enumerate(self.makes)}
+        self.body_index = {normalize_key(label): code for code, label in enumerate(self.bodies)}
+        self.year_min = int(year_min)
+        self.year_span = int(year_span)
+        self.keys = [np.asarray(level_keys, dtype=np.int64) for level_keys in keys]
+        self.offsets = np.cumsum([1] + [len(level_keys) for level_keys in self.keys])[:-1]
+        self.table = np.asarray(table, dtype='float64')
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.prior_rows = float(prior_rows)
+        self.sale_year = int(sale_year)
+
+    def __repr__(self):
+        sizes = ', '.join(f"{len(level_keys):,} {level}" for level, level_keys in zip(LEVELS[1:], self.keys))
+        return f"PriceModel({sizes} segments; {self.rows[0]:,} rows)"
+
+    # -- scoring ------------------------------------------------------------
+
+    def encode(self, df):
+        """``(make codes, body codes, years, design matrix)`` of ``df`` for ``score``."""
+        make, _, _ = _label_codes(df['make'], self.make_index)
+        body, _, _ = _label_codes(df['body'], self.body_index)
+        year = df['year'].to_numpy(dtype='float64', na_value=np.nan)
+        year = np.where(np.isnan(year), -1, year).astype(np.int64)
+        return make, body, year, design_matrix(df, self.sale_year)
+
+    def segment_rows(self, make, body, year, level=3):
+        """Table row of each listing's finest known segment, up to ``level``."""
+        year = year - self.year_min
+        n_bodies = len(self.bodies)
+        queries = [
+            make,
+            np.where(body >= 0, make * n_bodies + body, -1),
+            np.where((body >= 0) & (year >= 0) & (year < self.year_span),
+                     (make * n_bodies + body) * self.year_span + year, -1),
+        ]
+        rows = np.zeros(len(make), dtype=np.int64)
+        for query, level_keys, offset in list(zip(queries, self.keys, self.offsets))[:level]:
+            query = np.where(make >= 0, query, -1)
+            pos, found = _lookup(level_keys, query)
+            rows[found] = offset + pos[found]
+        return rows
+
+    def score(self, make, body, year, X, level=3):
+        """Predicted prices from encoded listings (see ``encode``); NaN where an input is null."""
+        coefficients = self.table[self.segment_rows(make, body, year, level)]
+        return np.einsum('ij,ij->i', coefficients, X)
+
+    def predict(self, df, level=3):
+        """Predicted selling price of each row of ``df``.
+
+        ``df`` needs make, body, year, mmr, condition and odometer, and uses
+        saledate if present. Unknown makes, bodies and years fall back to
+        the coarser segment; ``level`` caps the segment level used (0 is
+        the global model only, 3 is (make, body, year)).
+        """
+        return self.score(*self.encode(df), level=level)
+
+    # -- inspection ---------------------------------------------------------
+
+    def coefficients(self, level='make'):
+        """Coefficients of one level in natural units (per dollar of MMR, per mile, ...)."""
+        depth = LEVELS.index(level)
+        start = 0 if depth == 0 else self.offsets[depth - 1]
+        stop = 1 if depth == 0 else start + len(self.keys[depth - 1])
+        scales = np.array([1.0] + list(FEATURES.values()))
+        frame = pd.DataFrame(self.table[start:stop] / scales, columns=['intercept'] + list(FEATURES))
+        frame.insert(0, 'rows', self.rows[start:stop])
+        if depth == 0:
+            frame.index = pd.Index(['all'], name='segment')
+            return frame
+        keys = self.keys[depth - 1]
+        if depth == 1:
+            make = keys
+        elif depth == 2:
+            make, body = np.divmod(keys, len(self.bodies))
+        else:
+            pair, year = np.divmod(keys, self.year_span)
+            make, body = np.divmod(pair, len(self.bodies))
+        names = {'make': [self.makes[code] for code in make]}
+        if depth >= 2:
+            names['body'] = [self.bodies[code] for code in body]
+        if depth == 3:
+            names['year'] = year + self.year_min
+        frame.index = pd.MultiIndex.from_arrays(list(names.values()), names=list(names))
+        return frame
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path):
+        """Write the model as a compressed ``.npz`` file."""
+        meta = {'version': MODEL_VERSION, 'makes': self.makes, 'bodies': self.bodies,
+                'year_min': self.year_min, 'year_span': self.year_span, 'prior_rows': self.prior_rows,
+                'sale_year': self.sale_year, 'features': list(FEATURES)}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as handle:
+            np.savez_compressed(handle, meta=np.array(json.dumps(meta)), table=self.table, rows=self.rows,
+                                **{f"keys_{level}": keys for level, keys in zip(LEVELS[1:], self.keys)})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as stored:
+            meta = json.loads(str(stored['meta']))
+            if meta.get('version') != MODEL_VERSION:
+                raise ValueError(f"Price model {path} has version {meta.get('version')}, expected {MODEL_VERSION}")
+            if meta['features'] != list(FEATURES):
+                raise ValueError(f"Price model {path} uses features {meta['features']}, expected {list(FEATURES)}")
+            keys = [stored[f"keys_{level}"] for level in LEVELS[1:]]
+            return cls(meta['makes'], meta['bodies'], meta['year_min'], meta['year_span'], keys,
+                       stored['table'], stored['rows'], meta['prior_rows'], meta['sale_year'])
+
+
+def fit_price_model(df, prior_rows=PRIOR_ROWS, sale_year=CURRENT_YEAR):
+    """Fit per-segment price models on a cleaned frame.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Needs make, body, year, mmr, condition, odometer and sellingprice;
+        rows with a null in any of them are left out.
+    prior_rows : float
+        Ridge strength: how many sales of its own a segment needs to move
+        halfway from its parent's model to its own fit.
+    sale_year : int
+        Year that age is counted to when ``df`` has no saledate.
+
+    Returns
+    -------
+    PriceModel
+    """
+    if prior_rows <= 0:
+        raise ValueError("prior_rows must be positive")
+    make, _, makes = _label_codes(df['make'])
+    body, _, bodies = _label_codes(df['body'])
+    year = df['year'].to_numpy(dtype='float64', na_value=np.nan)
+    X = design_matrix(df, sale_year)
+    y = df[PRICE_COLUMN].to_numpy(dtype='float64', na_value=np.nan)
+    valid = (make >= 0) & (body >= 0) & ~np.isnan(year) & ~np.isnan(X).any(axis=1) & ~np.isnan(y)
+    if not valid.any():
+        raise ValueError("No complete rows to fit a price model on")
+    make, body, X, y = make[valid], body[valid], X[valid], y[valid]
+    year = year[valid].astype(np.int64)
+    year_min = int(year.min())
+    year_span = int(year.max()) - year_min + 1
+    n_bodies = len(bodies)
+
+    # Sufficient statistics per (make, body, year), summed up the hierarchy
+    keys3, groups = np.unique((make * n_bodies + body) * year_span + (year - year_min), return_inverse=True)
+    keys2, parents3 = np.unique(keys3 // year_span, return_inverse=True)
+    keys1, parents2 = np.unique(keys2 // n_bodies, return_inverse=True)
+    xtx, xty = _gram(groups, len(keys3), X, y)
+    levels = [(keys3, parents3, xtx, xty, np.bincount(groups, minlength=len(keys3)))]
+    for keys, parents in ((keys2, parents2), (keys1, np.zeros(len(keys1), dtype=np.int64))):
+        _, child_parents, xtx, xty, rows = levels[0]
+        levels.insert(0, (keys, parents, _sum_groups(child_parents, len(keys), xtx),
+                          _sum_groups(child_parents, len(keys), xty), _sum_groups(child_parents, len(keys), rows)))
+    _, _, xtx, xty, rows = levels[0]
+    total = (None, None, xtx.sum(axis=0, keepdims=True), xty.sum(axis=0, keepdims=True), rows.sum(keepdims=True))
+
+    # Global least squares (a negligible ridge keeps it solvable), then each
+    # level shrunk toward its parent
+    identity = np.eye(X.shape[1])
+    coefficients = [np.linalg.solve(total[2] + 1e-9 * identity, total[3][..., None])[..., 0]]
+    for _, parents, xtx, xty, _ in levels:
+        prior = coefficients[-1][parents]
+        coefficients.append(np.linalg.solve(xtx + prior_rows * identity,
+                                            (xty + prior_rows * prior)[..., None])[..., 0])
+
+    return PriceModel(makes, bodies, year_min, year_span, [level[0] for level in levels],
+                      np.concatenate(coefficients),
+                      np.concatenate([total[4]] + [level[4] for level in levels]).astype(np.int64),
+                      prior_rows, sale_year)
@@ -0,0 +1,392 @@
+"""
+Per-column dataset profile in one streaming pass, as JSON.
+
+Sections 1.1 and 1.2 describe the raw file with ``df.head()``, ``df.info()``
+and a dtype/null table, all computed on the whole frame. ``DatasetProfiler``
+records the same facts as a structured profile that monitoring can store and
+compare between deliveries. For every column it keeps:
+
+* the dtype, null count and in-memory footprint;
+* the distinct count (``HyperLogLog``);
+* min, max and quantiles of numeric and date columns (``QuantileSketch``);
+* the most frequent values of the other columns (``SpaceSaving``).
+
+Batches are folded in one at a time with vectorized per-column updates. A
+file is therefore profiled while it streams from disk, in bounded memory,
+and profilers built on different chunks can be merged.
+
+With ``sample=N`` only the row count, nulls, memory and min/max are taken
+over every row. The distinct count, quantiles and top values are computed
+exactly on a uniform reservoir sample of ``N`` rows instead. Each row draws
+a random priority and the ``N`` lowest priorities are kept, which is
+vectorized per batch and mergeable. Top-value counts are scaled up to the
+full row count. The distinct count is the number seen in the sample, so it
+is a lower bound.
+
+``schema_drift`` compares two profiles. It lists added and removed columns,
+dtype changes and null-rate shifts.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from carprices.heavyhitters import DEFAULT_CAPACITY, DEFAULT_PRECISION, HyperLogLog, SpaceSaving, _batch_counts
+from carprices.io import DEFAULT_CHUNKSIZE, iter_chunks, iter_frame_chunks
+from carprices.schema import NUMERIC_DTYPES
+from carprices.sketches import DEFAULT_K, QuantileSketch
+
+PROFILE_VERSION = 1
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+TOP_VALUES = 10
+# Percentage points a column's null rate may move before it counts as drift
+NULL_TOLERANCE = 5.0
+
+
+def column_kind(dtype):
+    """'numeric', 'datetime', 'categorical' or 'string'."""
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+        return 'categorical'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'numeric'
+    return 'string'
+
+
+def _numbers(series, kind):
+    """float64 values of a numeric or datetime column (epoch ticks for dates), NaN for nulls."""
+    if kind == 'datetime':
+        values = series.array.asi8.astype('float64')
+        values[series.isna().to_numpy()] = np.nan
+        return values
+    return series.to_numpy(dtype='float64', na_value=np.nan)
+
+
+class ColumnProfile:
+    """Running profile of one column.
+
+    Parameters
+    ----------
+    name : str
+    dtype : dtype
+        Column dtype; decides which summaries are kept.
+    summaries : bool
+        Keep the distinct, quantile and top-value sketches. The sampling
+        profiler turns them off and computes those from its sample.
+    declared : dtype, optional
+        The column's dtype in the file schema. Integer columns coerced to
+        float32 in some batches are still profiled as integers.
+    """
+
+    def __init__(self, name, dtype, summaries=True, k=DEFAULT_K, capacity=DEFAULT_CAPACITY,
+                 precision=DEFAULT_PRECISION, seed=0, declared=None):
+        self.name = name
+        self.dtype = str(dtype)
+        self.kind = column_kind(dtype)
+        self.unit = getattr(dtype, 'unit', None)
+        self.tz = getattr(dtype, 'tz', None)
+        self.integer = pd.api.types.is_integer_dtype(dtype if declared is None else declared)
+        self.rows = 0
+        self.nulls = 0
+        self.memory = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.distinct = self.sketch = self.hitters = None
+        if summaries:
+            self.distinct = HyperLogLog(precision)
+            if self.ordered:
+                self.sketch = QuantileSketch(k, seed=seed)
+            if self.counted:
+                self.hitters = SpaceSaving(capacity)
+
+    @property
+    def ordered(self):
+        """Whether min, max and quantiles apply."""
+        return self.kind in ('numeric', 'datetime')
+
+    @property
+    def counted(self):
+        """Whether top values apply (not to continuous floats or timestamps)."""
+        return self.kind in ('categorical', 'string') or self.integer
+
+    def _widen(self, dtype):
+        """Record the common dtype when batches differ (int16 batches and float32 ones after
+        ``iter_chunks`` coerced malformed rows), so the profile does not depend on batch order."""
+        if self.kind == 'numeric' and str(dtype) != self.dtype:
+            try:
+                self.dtype = str(np.result_type(self.dtype, dtype))
+            except TypeError:
+                pass
+
+    def update(self, series):
+        """Fold in a batch of the column. Returns the profile."""
+        self._widen(series.dtype)
+        self.rows += len(series)
+        self.nulls += int(series.isna().sum())
+        self.memory += int(series.memory_usage(deep=True, index=False))
+        if self.ordered:
+            values = _numbers(series, self.kind)
+            if not np.isnan(values).all():
+                self.min = min(self.min, np.nanmin(values))
+                self.max = max(self.max, np.nanmax(values))
+            if self.sketch is not None:
+                self.sketch.update(values)
+        if self.kind == 'numeric':
+            # Hash and count values as float64, whichever dtype the batch has
+            series = series.astype('float64')
+        if self.distinct is not None:
+            self.distinct.update(series)
+        if self.hitters is not None:
+            self.hitters.update(series)
+        return self
+
+    def merge(self, other):
+        """Fold in the profile of the same column built on other rows. Returns the profile."""
+        self._widen(other.dtype)
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.memory += other.memory
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for name in ('distinct', 'sketch', 'hitters'):
+            if getattr(self, name) is not None:
+                getattr(self, name).merge(getattr(other, name))
+        return self
+
+    def _value(self, value):
+        """JSON-ready form of a column value or summary statistic."""
+        if value is None or (isinstance(value, float) and not np.isfinite(value)):
+            return None
+        if self.kind == 'datetime':
+            stamp = pd.Timestamp(int(value), unit=self.unit, tz='UTC')
+            return (stamp.tz_convert(self.tz) if self.tz is not None else stamp.tz_localize(None)).isoformat()
+        if self.integer:
+            return int(value)
+        if isinstance(value, (np.integer, np.floating, np.bool_)):
+            return value.item()
+        return value if isinstance(value, (int, float, bool)) else str(value)
+
+    def summary(self, sample=None, scale=1.0, quantiles=QUANTILES, top=TOP_VALUES):
+        """The column's profile as a dict.
+
+        ``sample`` is this column of the reservoir sample, in sampling mode;
+        top-value counts from it are multiplied by ``scale``.
+        """
+        non_null = self.rows - self.nulls
+        result = {
+            'dtype': self.dtype,
+            'kind': self.kind,
+            'nulls': self.nulls,
+            'null_pct': round(self.nulls / self.rows * 100, 4) if self.rows else 0.0,
+            'memory_bytes': self.memory,
+        }
+        if sample is None:
+            result['distinct'] = self.distinct.count()
+        else:
+            result['distinct'] = int(sample.nunique(dropna=True))
+        if self.ordered:
+            result['min'] = self._value(self.min)
+            result['max'] = self._value(self.max)
+            if sample is None:
+                values = self.sketch.quantile(list(quantiles))
+            else:
+                numbers = _numbers(sample, self.kind)
+                numbers = numbers[~np.isnan(numbers)]
+                values = np.quantile(numbers, quantiles, method='inverted_cdf') if len(numbers) \
+                    else np.full(len(quantiles), np.nan)
+            result['quantiles'] = {f"{q:g}": self._value(value) for q, value in zip(quantiles, values)}
+        if self.counted:
+            if sample is None:
+                counts = self.hitters.top(top)
+            else:
+                counts = _batch_counts(sample).sort_values(ascending=False, kind='stable').head(top)
+                counts = (counts * scale).round().astype('int64')
+            result['top'] = [{'value': self._value(value), 'count': int(count),
+                              'share': round(count / non_null, 6) if non_null else 0.0}
+                             for value, count in counts.items()]
+        return result
+
+
+class DatasetProfiler:
+    """Streaming per-column profile of a dataset.
+
+    Parameters
+    ----------
+    sample : int, optional
+        Reservoir sample size. None keeps sketches over every row.
+    seed : int
+        Seed for the sample priorities and the quantile sketches.
+    k, capacity, precision :
+        Accuracy of the quantile, top-value and distinct-count sketches.
+    schema : dict, optional
+        Declared dtype per column (such as ``NUMERIC_DTYPES``), for batches
+        whose dtypes vary.
+    """
+
+    def __init__(self, sample=None, seed=0, k=DEFAULT_K, capacity=DEFAULT_CAPACITY,
+                 precision=DEFAULT_PRECISION, schema=None):
+        if sample is not None and sample < 1:
+            raise ValueError(f"sample must be a positive row count, got {sample}")
+        self.sample_size = sample
+        self.seed = seed
+        self.k = k
+        self.capacity = capacity
+        self.precision = precision
+        self.schema = schema or {}
+        self.columns = {}
+        self.rows = 0
+        self.sample = None
+        self.priorities = None
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def sampling(self):
+        return self.sample_size is not None
+
+    def update(self, chunk):
+        """Fold in a batch of rows. Returns the profiler."""
+        for column in chunk.columns:
+            profile = self.columns.get(column)
+            if profile is None:
+                profile = ColumnProfile(column, chunk[column].dtype, summaries=not self.sampling,
+                                        k=self.k, capacity=self.capacity, precision=self.precision,
+                                        seed=self.seed, declared=self.schema.get(column))
+                self.columns[column] = profile
+            profile.update(chunk[column])
+        self.rows += len(chunk)
+        if self.sampling:
+            self._reservoir(chunk, self._rng.random(len(chunk)))
+        return self
+
+    def merge(self, other):
+        """Fold in a profiler with the same settings built on other rows. Returns the profiler."""
+        if self.sample_size != other.sample_size:
+            raise ValueError("Can only merge profilers with the same sample size")
+        for column, profile in other.columns.items():
+            if column in self.columns:
+                self.columns[column].merge(profile)
+            else:
+                self.columns[column] = profile
+        self.rows += other.rows
+        if self.sampling and other.sample is not None:
+            self._reservoir(other.sample, other.priorities)
+        return self
+
+    def _reservoir(self, rows, priorities):
+        """Keep the ``sample_size`` rows with the lowest priorities, in arrival order."""
+        if self.sample is not None:
+            if len(self.sample) >= self.sample_size:
+                # Only rows that beat the current cut-off can enter the sample
+                keep = priorities < self.priorities.max()
+                rows, priorities = rows[keep], priorities[keep]
+            if not len(rows):
+                return
+            rows = pd.concat([self.sample, rows], ignore_index=True)
+            priorities = np.concatenate([self.priorities, priorities])
+        if len(rows) > self.sample_size:
+            keep = np.sort(np.argpartition(priorities, self.sample_size - 1)[:self.sample_size])
+            rows, priorities = rows.iloc[keep], priorities[keep]
+        self.sample = rows.reset_index(drop=True)
+        self.priorities = priorities
+
+    def profile(self, quantiles=QUANTILES, top=TOP_VALUES):
+        """The dataset profile as a JSON-serializable dict."""
+        sample = self.sample if self.sampling else None
+        scale = self.rows / len(sample) if sample is not None and len(sample) else 1.0
+        return {
+            'version': PROFILE_VERSION,
+            'rows': self.rows,
+            'memory_bytes': sum(profile.memory for profile in self.columns.values()),
+            'sample': None if sample is None else {'rows': len(sample), 'seed': self.seed},
+            'columns': {
+                str(column): profile.summary(None if sample is None else sample[column], scale,
+                                             quantiles, top)
+                for column, profile in self.columns.items()
+            },
+        }
+
+
+def profile_frame(df, sample=None, seed=0, chunksize=DEFAULT_CHUNKSIZE):
+    """Profile an in-memory frame, fed ``chunksize`` rows at a time."""
+    profiler = DatasetProfiler(sample, seed)
+    for chunk in iter_frame_chunks(df, chunksize) if len(df) else [df]:
+        profiler.update(chunk)
+    return profiler.profile()
+
+
+def profile_file(path, sample=None, seed=0, chunksize=DEFAULT_CHUNKSIZE, max_memory_mb=None, stats=None):
+    """Profile a car_prices CSV while streaming it, without loading it whole.
+
+    Dtypes are those of the typed schema, as ``load_csv`` would produce. If
+    the file has malformed numeric fields, integer columns are reported as
+    float32 wherever the first of them falls.
+    """
+    profiler = DatasetProfiler(sample, seed, schema=NUMERIC_DTYPES)
+    for chunk in iter_chunks(path, chunksize=chunksize, stats=stats, max_memory_mb=max_memory_mb):
+        profiler.update(chunk)
+    return profiler.profile()
+
+
+def write_profile(profile, path):
+    """Write a profile as JSON (atomically). Returns ``path``."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as handle:
+        json.dump(profile, handle, indent=1)
+    os.replace(tmp, path)
+    return path
+
+
+def load_profile(path):
+    with open(path) as handle:
+        profile = json.load(handle)
+    if profile.get('version') != PROFILE_VERSION:
+        raise ValueError(f"Profile {path} has version {profile.get('version')}, expected {PROFILE_VERSION}")
+    return profile
+
+
+def schema_drift(baseline, current, null_tolerance=NULL_TOLERANCE):
+    """Differences between two profiles that point at a changed feed.
+
+    Returns a list of messages (empty when nothing drifted): columns added or
+    removed, dtype changes and null rates that moved by more than
+    ``null_tolerance`` percentage points.
+    """
+    old, new = baseline['columns'], current['columns']
+    changes = [f"column '{column}' removed" for column in old if column not in new]
+    changes += [f"column '{column}' added ({new[column]['dtype']})" for column in new if column not in old]
+    for column in old.keys() & new.keys():
+        before, after = old[column], new[column]
+        if before['dtype'] != after['dtype']:
+            changes.append(f"column '{column}' changed dtype: {before['dtype']} -> {after['dtype']}")
+        if abs(after['null_pct'] - before['null_pct']) > null_tolerance:
+            changes.append(f"column '{column}' null rate moved: "
+                           f"{before['null_pct']:.2f}% -> {after['null_pct']:.2f}%")
+    return changes
+
+
+def _blank(value):
+    return '' if value is None else value
+
+
+def profile_table(profile):
+    """One row per column, for printing; blank where a statistic does not apply."""
+    rows = []
+    for column, summary in profile['columns'].items():
+        quantiles = summary.get('quantiles', {})
+        top = summary.get('top') or [{}]
+        rows.append({
+            'Column': column,
+            'Data Type': summary['dtype'],
+            'Null Count': summary['nulls'],
+            'Null %': summary['null_pct'],
+            'Distinct': summary['distinct'],
+            'Min': _blank(summary.get('min')),
+            'Median': _blank(quantiles.get('0.5')),
+            'Max': _blank(summary.get('max')),
+            'Top Value': _blank(top[0].get('value')),
+            'Memory (KB)': round(summary['memory_bytes'] / 1024, 1),
+        })
+    return pd.DataFrame(rows)
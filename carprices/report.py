@@ -0,0 +1,298 @@
+"""
+The printed car price report: Task 1 (ingestion and quality profiling), the
+Task 2/3 sections and the closing summary.
+
+``run_report`` drives a ``CarPriceDataset``; which parts run is chosen by
+section or task number, so the report can be cut down to the queries that
+are actually needed.
+"""
+
+import os
+
+import pandas as pd
+
+from carprices.charts import DEFAULT_TARGETS, ChartSpec, render_charts
+from carprices.missingness import missing_fractions
+from carprices.sections import detect_columns, run_sections, select_sections
+
+# Written by Task 1 when the cleaned dataset is not cached as a snapshot
+CLEANED_CSV = 'car_prices_cleaned.csv'
+
+TASK1_SECTIONS = ('1', '1.1', '1.2', '1.3')
+
+
+def print_banner(title, leading="\n"):
+    print(leading + "="*80)
+    print(title)
+    print("="*80)
+
+
+def run_task1(dataset, output_dir, charts=None, chart_format='png'):
+    """Print sections 1.1-1.3 and return the cleaned frame.
+
+    The two missing-value charts are appended to ``charts`` as ``ChartSpec``
+    objects for the batch renderer.
+    """
+    charts = [] if charts is None else charts
+    print_banner("TASK 1: DATA INGESTION & QUALITY PROFILING")
+
+    # Warm runs load the cleaned, typed frame straight from the columnar cache,
+    # skipping both the CSV parse and the cleaning below
+    if dataset.cached_frame is not None:
+        df = dataset.df
+        print(f"\n✓ Loaded cleaned dataset from cache ({dataset.cache.path_for(dataset.cache_key)})")
+        print("  Sections 1.1-1.3 were computed on a previous run; delete the cache to rerun them")
+        print(f"  Shape: {df.shape}")
+        return df
+
+    # 1.1 Load & Inspect
+    print("\n1.1 LOAD & INSPECT")
+    print("-"*80)
+
+    # Read the CSV file with the typed schema: categoricals for repeated strings,
+    # narrow numerics and a parsed saledate
+    df = dataset.raw
+    print(dataset.read_stats.summary())
+
+    print("\nFirst 5 rows of the dataset:")
+    print(df.head())
+
+    print("\n\nData Types and Record Count:")
+    print(df.info())
+
+    print(f"\n\nTotal Records: {len(df)}")
+
+    # 1.2 Understanding the Data Structure
+    print("\n\n1.2 UNDERSTANDING THE DATA STRUCTURE")
+    print("-"*80)
+
+    print(f"\nDataset Shape: {df.shape}")
+    print(f"Number of Rows: {df.shape[0]}")
+    print(f"Number of Columns: {df.shape[1]}")
+
+    # Null profile computed once and reused by 1.2, 1.3 and the cleaning step
+    profile = dataset.profile
+
+    print("\n\nColumn Names and Data Types:")
+    print(pd.DataFrame({
+        'Column Name': df.columns,
+        'Data Type': df.dtypes.values,
+        'Non-Null Count': len(df) - profile['Null Count'].values,
+        'Null Count': profile['Null Count'].values
+    }))
+
+    # 1.3 Missing & Anomaly Detection
+    print("\n\n1.3 MISSING & ANOMALY DETECTION")
+    print("-"*80)
+
+    # Quantify nulls per column
+    print("\nNull Values Per Column:")
+    null_df = profile[profile['Null Count'] > 0].sort_values('Null Count', ascending=False)
+    print(null_df)
+
+    # Visualize missing values
+    null_counts_sorted = null_df.set_index('Column')['Null Count']
+    charts.append(ChartSpec(
+        '1_missing_values_bar', 'bar',
+        {'labels': [str(column) for column in null_counts_sorted.index], 'values': null_counts_sorted.to_numpy()},
+        xlabel='Columns', ylabel='Number of Missing Values', title='Missing Values by Column',
+        bold=False, grid=False))
+    print(f"\n✓ Missing values bar chart saved as '1_missing_values_bar.{chart_format}'")
+
+    # Create heatmap for missing values (null fraction per block of rows)
+    fractions = missing_fractions(df)
+    charts.append(ChartSpec(
+        '2_missing_values_heatmap', 'missing_heatmap',
+        {'fractions': fractions.to_numpy(), 'columns': [str(column) for column in fractions.columns],
+         'first_row': fractions.index.to_numpy()},
+        figsize=(12, 8)))
+    print(f"✓ Missing values heatmap saved as '2_missing_values_heatmap.{chart_format}'")
+
+    # Resolve null values with appropriate strategies
+    print("\n\nResolving Null Values...")
+
+    # Strategy (see the dataset's CleaningPolicy):
+    # - For columns with >30% nulls: drop the column
+    # - For numerical columns: fill with median
+    # - For categorical columns: fill with mode
+    # All fills and drops are applied in one vectorized step.
+    cleaned, cleaning_actions = dataset.cleaning
+    for action in cleaning_actions:
+        print(action.describe())
+
+    print(f"\nShape after handling nulls: {cleaned.shape}")
+
+    # Repeated string columns carry stable vocabulary codes; spelling variants
+    # such as 'ford' / 'Ford' are one group from here on
+    vocabulary_report = dataset.vocabulary.report
+    print(f"✓ Encoded {len(vocabulary_report)} string columns with stable codes: "
+          f"{vocabulary_report['merged'].sum()} case/whitespace variants merged, "
+          f"{vocabulary_report['new'].sum()} new vocabulary entries")
+
+    # Count and delete duplicate records (compared via one 64-bit hash per row)
+    print("\n\nDuplicate Records:")
+    _, duplicate_report = dataset.duplicates
+    duplicate_count = duplicate_report.duplicates
+    print(f"Number of duplicate records: {duplicate_count}")
+
+    # Same car sold on the same date for the same price, even if other fields differ
+    sale_key_report = dataset.repeated_sales
+    if sale_key_report is not None:
+        print(f"Repeated sales ({' + '.join(sale_key_report.subset)}): {sale_key_report.duplicates}")
+
+    df = dataset.df
+    if duplicate_count > 0:
+        print("\nExample duplicate records:")
+        print(duplicate_report.examples)
+        print(f"✓ Deleted {duplicate_count} duplicate records")
+        print(f"New shape: {df.shape}")
+    else:
+        print("✓ No duplicate records found")
+
+    # The cleaned dataset is cached as a typed columnar snapshot (read back by
+    # the notebook and by later runs) instead of re-serializing to CSV
+    if dataset.snapshot_path is not None:
+        print(f"\n✓ Cleaned dataset cached as '{os.path.basename(dataset.snapshot_path)}'")
+    else:
+        df.to_csv(cleaned_path(dataset, output_dir), index=False)
+        print(f"\n✓ Cleaned dataset saved as '{CLEANED_CSV}'")
+    return df
+
+
+def cleaned_path(dataset, output_dir):
+    """Where Task 1 leaves the cleaned dataset: the new snapshot, else a CSV in ``output_dir``."""
+    return dataset.snapshot_path or os.path.join(output_dir, CLEANED_CSV)
+
+
+def print_summary(df, output_dir, cleaned, chart_count, chart_targets):
+    """The closing summary of a full report run."""
+    columns = detect_columns(df)
+    year_column = columns.year
+    price_column = columns.price
+
+    print_banner("ANALYSIS SUMMARY REPORT", leading="\n\n")
+
+    print(f"""
+Dataset Overview:
+- Total Records: {len(df):,}
+- Total Features: {len(df.columns)}
+- Date Range: {df[year_column].min()} - {df[year_column].max() if year_column else 'N/A'}
+
+Key Findings:
+1. Price Analysis: Average price is ${df[price_column].mean():,.2f} with significant variation
+2. Condition Impact: Strong positive correlation between condition and price
+3. Mileage Effect: Clear negative correlation between odometer reading and price
+4. Market Distribution: Concentrated in top 3 states
+5. Popular Models: Top models show clear market preferences
+6. Color Preferences: Some colors command premium prices
+
+Data Quality:
+- Missing values handled appropriately based on percentage and data type
+- Duplicate records removed
+- Outliers identified and handled for visualization clarity
+
+All visualizations have been saved to the outputs folder.
+""")
+
+    print_banner("ANALYSIS COMPLETE!")
+    print(f"\nAll outputs saved to: {output_dir}/")
+    print(f"- Cleaned dataset: {cleaned}")
+    formats = ', '.join(f"{target.format.upper()} at {target.dpi} dpi" for target in chart_targets)
+    print(f"- {chart_count * len(chart_targets)} visualization files ({formats})")
+    print("\nThank you for using this analysis tool!")
+    print("="*80)
+
+
+def print_chart_timings(results, targets):
+    """One line per chart: render time, or that its data was unchanged."""
+    rendered = [result for result in results if not result.skipped]
+    formats = ', '.join(f"{target.format}@{target.dpi}dpi" for target in targets)
+    print(f"\n✓ Rendered {len(rendered)} of {len(results)} charts ({formats}) "
+          f"in {sum(result.seconds for result in rendered):.2f}s")
+    for result in results:
+        if result.cached:
+            status = 'copied from the result cache'
+        else:
+            status = 'unchanged, not redrawn' if result.skipped else f"{result.seconds:6.2f}s"
+        print(f"  {result.name:<40} {status}")
+
+
+def run_report(dataset, output_dir, sections=None, workers=None, chart_targets=None, result_cache=None):
+    """Print the report for ``dataset`` and save its charts to ``output_dir``.
+
+    Parameters
+    ----------
+    dataset : CarPriceDataset
+    output_dir : str or path-like
+        Created if missing.
+    sections : list of str, optional
+        Section or task numbers to run (e.g. ``['1', '2.5', '3']``); the
+        sections they depend on are added. None runs the full report,
+        including the closing summary.
+    workers : int, optional
+        Processes for the Task 2/3 sections and for chart rendering
+        (None = all cores, 1 = serial).
+    chart_targets : list of RenderTarget, optional
+        Formats and resolutions of every chart (default: 300 dpi PNG). Charts
+        whose data is unchanged since the last run are not redrawn.
+    result_cache : ResultCache, optional
+        Reuse the results and figures of sections whose data, parameters and
+        code are unchanged; only the others run.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', None)
+    pd.set_option('display.max_colwidth', None)
+
+    selected = None if sections is None else [name for name in sections if name not in TASK1_SECTIONS]
+    run_task1_sections = sections is None or len(selected) < len(sections)
+
+    print("="*80)
+    print("CAR PRICE DATA ANALYSIS - HERO VIRED ASSIGNMENT")
+    print("="*80)
+    print()
+
+    chart_targets = list(chart_targets or DEFAULT_TARGETS)
+    chart_format = chart_targets[0].format
+    charts = []
+
+    df = run_task1(dataset, output_dir, charts, chart_format) if run_task1_sections else dataset.df
+
+    if selected is None or selected:
+        nodes = select_sections(selected)
+        if any(node.task == 2 for node in nodes):
+            print_banner("TASK 2: DATA FRAMES QUERIES", leading="\n\n")
+
+        # Sections 2.1-3.7 form a dependency graph; independent sections run
+        # in parallel on a process pool whose workers memory-map the cached
+        # Arrow snapshot of the cleaned frame. Output is printed in report
+        # order.
+        section_results = run_sections(df, output_dir, workers=workers, sections=nodes,
+                                       chart_format=chart_format, shared_path=dataset.shared_path,
+                                       cache=result_cache,
+                                       fingerprint=None if result_cache is None else dataset.fingerprint)
+
+        task3_started = False
+        for result in section_results:
+            if result.name.startswith('3.') and not task3_started:
+                print_banner("TASK 3: DATA VISUALIZATION AND INSIGHTS", leading="\n\n")
+                task3_started = True
+            print(result.output, end='')
+            charts.extend(result.charts)
+            if result.name == '2.9' and result.value is not None:
+                df = df.assign(car_age=result.value)
+
+        cached = sum(result.cached for result in section_results)
+        reused = f" ({cached} read from the result cache)" if result_cache is not None else ''
+        print(f"\n✓ Ran {len(section_results)} sections on {workers or os.cpu_count()} worker(s){reused}; "
+              f"total section time {sum(r.seconds for r in section_results):.2f}s")
+
+    # Every chart is drawn here, in one batch, from the plot data the sections
+    # queued; figures whose data is unchanged since the last run are skipped
+    if charts:
+        print_chart_timings(render_charts(charts, output_dir, chart_targets, workers=workers, cache=result_cache),
+                            chart_targets)
+
+    if sections is None:
+        print_summary(df, output_dir, cleaned_path(dataset, output_dir), len(charts), chart_targets)
+    return df
@@ -0,0 +1,261 @@
+"""
+Content-addressed, size-bounded cache of section results and chart files.
+
+Rerunning the report after editing one section, say a chart title, used to
+recompute every section: each groupby, quantile and the 3.1 correlation
+matrix. ``ResultCache`` stores each section's ``NodeResult`` (printed
+output, return value and queued charts) under a key built from
+
+* the dataset fingerprint: the cleaned-snapshot key (source digest plus
+  cleaning-policy and vocabulary versions) or a content hash of the frame;
+* the section name and its parameters (detected columns, chart format);
+* the code version: the section function's source; the source of the
+  ``carprices`` modules it uses (its own module without the other
+  sections, plus every package module that one imports, directly or not);
+  ``RESULT_VERSION`` and the pandas version;
+* the keys of the sections it depends on, so a changed input invalidates
+  everything downstream of it.
+
+Unchanged sections are read back from disk, and only the edited ones and
+their dependents run. Rendered chart files are stored the same way under
+their ``ChartSpec`` digest, so a figure drawn once is copied, not redrawn,
+into any output folder and for any target it was drawn for before.
+
+Entries are plain files named by their key. A hit refreshes the file's
+mtime, and every write evicts the least recently used files once the folder
+holds more than ``max_bytes``. Writes are atomic, so two reports sharing a
+cache at worst compute an entry twice.
+"""
+
+import hashlib
+import inspect
+import marshal
+import os
+import pickle
+import shutil
+import sys
+
+import pandas as pd
+
+from carprices.charts import _feed
+from carprices.dedup import row_hashes
+
+# Bump to discard every cached result, e.g. when a section's output depends
+# on something other than the package source (data files, environment)
+RESULT_VERSION = 1
+PACKAGE = __name__.split('.')[0]
+RESULT_SUFFIX = '.pkl'
+DEFAULT_MAX_MB = 256
+
+
+def frame_fingerprint(df):
+    """Content hash of a frame: column names, dtypes and one hash per row."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(column), str(dtype)) for column, dtype in df.dtypes.items()]).encode())
+    digest.update(row_hashes(df).tobytes())
+    return digest.hexdigest()
+
+
+def code_version(func):
+    """Digest of ``func``'s source code (of its bytecode if the source is unavailable)."""
+    try:
+        code = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        code = marshal.dumps(func.__code__)
+    return hashlib.blake2b(code, digest_size=16).hexdigest()
+
+
+def _source(module):
+    try:
+        return inspect.getsource(module)
+    except (OSError, TypeError):
+        return ''
+
+
+def package_modules(names):
+    """The ``carprices`` modules that the modules ``names`` import, directly or not.
+
+    A module counts as imported when one of its globals is that module or
+    a function or class defined in it.
+    """
+    found = set()
+    pending = [name for name in names if name in sys.modules]
+    while pending:
+        for value in vars(sys.modules[pending.pop()]).values():
+            used = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+            if (isinstance(used, str) and used.split('.')[0] == PACKAGE and used not in found
+                    and used in sys.modules):
+                found.add(used)
+                pending.append(used)
+    return found - set(names)
+
+
+def shared_code_version(funcs):
+    """Digest of the code ``funcs`` share besides their own source.
+
+    That is the source of their modules with every one of ``funcs`` cut
+    out, and of all the package modules those import. Editing one function
+    changes only its own ``code_version``; editing a helper it may call
+    changes this digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    modules = sorted({func.__module__ for func in funcs})
+    for name in modules:
+        source = _source(sys.modules.get(name))
+        for func in funcs:
+            if func.__module__ == name:
+                try:
+                    source = source.replace(inspect.getsource(func), '')
+                except (OSError, TypeError):
+                    pass
+        _feed(digest, [name, source])
+    for name in sorted(package_modules(modules)):
+        _feed(digest, [name, _source(sys.modules[name])])
+    return digest.hexdigest()
+
+
+def node_keys(nodes, fingerprint, params=None):
+    """Cache key of each node, as ``{name: key}``.
+
+    ``nodes`` are objects with ``name``, ``func`` and ``deps`` (such as
+    ``Section``); a node's key covers the keys of its dependencies.
+    """
+    by_name = {node.name: node for node in nodes}
+    shared = shared_code_version([node.func for node in nodes])
+    keys = {}
+
+    def key(node):
+        if node.name not in keys:
+            digest = hashlib.blake2b(digest_size=16)
+            _feed(digest, [RESULT_VERSION, pd.__version__, shared, fingerprint, node.name, params or {},
+                           code_version(node.func), [key(by_name[dep]) for dep in node.deps]])
+            keys[node.name] = digest.hexdigest()
+        return keys[node.name]
+
+    for node in nodes:
+        key(node)
+    return keys
+
+
+class ResultCache:
+    """Folder of pickled results and chart files, evicted least recently used first.
+
+    Parameters
+    ----------
+    cache_dir : str or path-like
+        Created on first write.
+    max_bytes : int
+        Size limit of the folder (default ``DEFAULT_MAX_MB`` MiB).
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_MB * 1024**2):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+
+    def path_for(self, key, suffix=RESULT_SUFFIX):
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    # -- results ------------------------------------------------------------
+
+    def get(self, key):
+        """The object stored under ``key``, or None on a miss."""
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as handle:
+                value = pickle.load(handle)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Missing, or written by code that no longer unpickles it
+            return None
+        self._touch(path)
+        return value
+
+    def put(self, key, value):
+        """Store ``value`` under ``key`` and return the entry's path."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as handle:
+            pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict()
+        return path
+
+    # -- files --------------------------------------------------------------
+
+    def fetch_file(self, key, suffix, dest):
+        """Copy the file stored under ``key`` to ``dest``; False on a miss."""
+        path = self.path_for(key, suffix)
+        if not os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        try:
+            shutil.copyfile(path, tmp)
+        except FileNotFoundError:
+            # Evicted by another process in between
+            return False
+        os.replace(tmp, dest)
+        self._touch(path)
+        return True
+
+    def store_file(self, key, source):
+        """Store a copy of the file ``source`` under ``key`` (keeping its extension)."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key, os.path.splitext(source)[1])
+        tmp = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, path)
+        self.evict()
+        return path
+
+    # -- size ---------------------------------------------------------------
+
+    def entries(self):
+        """``(path, bytes, mtime)`` of every entry, least recently used first."""
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if not name.endswith('.tmp')]
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime_ns))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self):
+        """Total bytes held."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until at most ``max_bytes`` remain.
+
+        Returns the number of entries removed.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Delete every entry."""
+        return self.evict(0)
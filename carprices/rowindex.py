@@ -0,0 +1,335 @@
+"""
+Secondary indexes for range and equality filters on the cleaned frame.
+
+Queries 2.4 (``sellingprice > 165000``), 2.10 (``condition >= 48`` and
+``odometer > 90000``) and 2.11 (``year > 2013``) each compare every row
+to build a boolean mask. ``RowIndex`` answers such filters from indexes
+built once per dataset:
+
+* ``SortedIndex`` over a numeric column: the row positions in value order
+  (nulls last) and the sorted values. A range is two ``np.searchsorted``
+  calls, and its rows are one slice of that permutation.
+* ``BitmapIndex`` over a categorical column: one packed bitmap of rows per
+  label. Equality is a lookup, and equalities on several columns are a
+  bitwise AND.
+
+The size of every predicate is known from the index before any row is
+read, so a conjunction starts from its most selective one. The others are
+checked on those candidate rows only: a range through each row's rank in
+the sorted order, an equality through one bit per row. A selective filter
+touches only the rows it returns.
+
+Results are row positions in ascending order, the rows the equivalent
+boolean mask selects, for ``df.iloc``. Nulls match no predicate, as with
+comparison operators. ``RowIndex.load_or_build`` keeps the index in one
+uncompressed ``.npz`` file beside the cleaned snapshot, under the same key.
+"""
+
+import functools
+import json
+import operator
+import os
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from carprices.vocab import normalize_key
+
+# Bump when the file layout or the build changes
+INDEX_VERSION = 1
+INDEX_PREFIX = 'index-'
+INDEX_SUFFIX = '.npz'
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+}
+
+
+def index_path(cache_dir, key):
+    """Index file for the snapshot stored under ``key`` in ``cache_dir``."""
+    return os.path.join(str(cache_dir), f"{INDEX_PREFIX}{key}{INDEX_SUFFIX}")
+
+
+def _position_dtype(rows):
+    return np.int32 if rows < 2**31 else np.int64
+
+
+def _numbers(values):
+    """A column as a float array: float32 and float64 as they are, others as float64 with NaN.
+
+    Integers are exact in float64 and compare with any threshold as they would as integers.
+    """
+    values = pd.Series(values)
+    if values.dtype in (np.float32, np.float64):
+        return values.to_numpy()
+    return values.to_numpy(dtype='float64', na_value=np.nan)
+
+
+def mask_where(df, *predicates):
+    """Boolean Series of the rows matching every ``(column, op, value)`` predicate (full scan)."""
+    return functools.reduce(operator.and_, [OPERATORS[op](df[column], value)
+                                            for column, op, value in predicates])
+
+
+class SortedIndex:
+    """Row positions of one numeric column in value order.
+
+    Parameters
+    ----------
+    order : numpy.ndarray
+        Row positions sorted by value, nulls last.
+    values : numpy.ndarray
+        The column's values in that order.
+    """
+
+    def __init__(self, order, values):
+        self.order = order
+        self.values = values
+        # NaNs sort last; everything before the first one can match
+        self.valid = int(np.searchsorted(values, np.nan))
+
+    @classmethod
+    def build(cls, values):
+        values = _numbers(values)
+        order = np.argsort(values, kind='stable').astype(_position_dtype(len(values)))
+        return cls(order, values[order])
+
+    @cached_property
+    def ranks(self):
+        """Position of each row in the sorted order (the inverse permutation)."""
+        ranks = np.empty(len(self.order), dtype=self.order.dtype)
+        ranks[self.order] = np.arange(len(self.order), dtype=self.order.dtype)
+        return ranks
+
+    def _key(self, op, value):
+        """``(op, key)`` with a key of the values' dtype that selects the rows ``<op> value`` does.
+
+        ``np.searchsorted`` with a key of another type converts the whole
+        array first. Python numbers are cast to float32 when compared with a
+        float32 column, so the cast key is exact. Others (a NumPy float64)
+        compare in float64; the nearest float32 is then a strict or
+        inclusive bound, as no float32 lies between it and ``value``.
+        """
+        dtype = self.values.dtype
+        key = dtype.type(value)
+        if np.result_type(dtype, value) == dtype or float(key) == float(value):
+            return op, key
+        if float(key) > float(value):
+            return {'>': '>=', '>=': '>=', '<': '<', '<=': '<'}.get(op), key
+        return {'>': '>', '>=': '>', '<': '<=', '<=': '<='}.get(op), key
+
+    def span(self, op, value):
+        """``(start, stop)`` of the sorted positions whose value satisfies ``<op> value``."""
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator '{op}', expected one of: {', '.join(OPERATORS)}")
+        op, value = self._key(op, value)
+        if op is None or np.isnan(value):
+            return 0, 0
+        values = self.values[:self.valid]
+        if op == '>':
+            return int(np.searchsorted(values, value, side='right')), self.valid
+        if op == '>=':
+            return int(np.searchsorted(values, value, side='left')), self.valid
+        if op == '<':
+            return 0, int(np.searchsorted(values, value, side='left'))
+        if op == '<=':
+            return 0, int(np.searchsorted(values, value, side='right'))
+        return int(np.searchsorted(values, value, side='left')), int(np.searchsorted(values, value, side='right'))
+
+
+class BitmapIndex:
+    """One packed bitmap of rows per label of a categorical column.
+
+    Parameters
+    ----------
+    labels : list of str
+    bitmaps : numpy.ndarray
+        uint8 array of shape ``(len(labels), ceil(rows / 8))``, as
+        ``np.packbits`` packs a boolean mask (first row in the high bit).
+    counts : numpy.ndarray
+        Rows per label.
+    rows : int
+    """
+
+    def __init__(self, labels, bitmaps, counts, rows):
+        self.labels = [str(label) for label in labels]
+        self.bitmaps = bitmaps
+        self.counts = counts
+        self.rows = rows
+        self.codes = {normalize_key(label): code for code, label in enumerate(self.labels)}
+
+    @classmethod
+    def build(cls, values):
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, labels = pd.factorize(values)
+        bitmaps = np.zeros((len(labels), (len(codes) + 7) // 8), dtype=np.uint8)
+        for code in range(len(labels)):
+            bitmaps[code] = np.packbits(codes == code)
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        return cls(labels, bitmaps, counts, len(codes))
+
+    def lookup(self, label):
+        """``(bitmap, rows)`` of ``label`` (matched like the vocabulary); empty if unknown."""
+        code = self.codes.get(normalize_key(label))
+        if code is None:
+            return np.zeros(self.bitmaps.shape[1], dtype=np.uint8), 0
+        return self.bitmaps[code], int(self.counts[code])
+
+
+def _bitmap_rows(bitmap, rows):
+    """Ascending positions of the set bits, unpacking only the non-zero bytes."""
+    nonzero = np.flatnonzero(bitmap)
+    bits = np.unpackbits(bitmap[nonzero]).reshape(-1, 8).astype(bool)
+    positions = (nonzero.astype(_position_dtype(rows))[:, None] << 3) + np.arange(8, dtype=_position_dtype(rows))
+    return positions[bits]
+
+
+def _test_bits(bitmap, rows):
+    """True for the ``rows`` whose bit is set in ``bitmap``."""
+    return ((bitmap[rows >> 3] >> (7 - (rows & 7))) & 1).astype(bool)
+
+
+class RowIndex:
+    """Sorted indexes over numeric columns and bitmap indexes over categorical ones.
+
+    Parameters
+    ----------
+    rows : int
+        Length of the indexed frame.
+    sorted : dict
+        ``{column: SortedIndex}``.
+    bitmaps : dict
+        ``{column: BitmapIndex}``.
+    """
+
+    def __init__(self, rows, sorted=None, bitmaps=None):
+        self.rows = rows
+        self.sorted = sorted or {}
+        self.bitmaps = bitmaps or {}
+
+    def __repr__(self):
+        return (f"RowIndex({self.rows:,} rows; sorted: {', '.join(self.sorted) or '-'}; "
+                f"bitmaps: {', '.join(self.bitmaps) or '-'})")
+
+    @property
+    def columns(self):
+        return list(self.sorted) + list(self.bitmaps)
+
+    @classmethod
+    def build(cls, df, numeric=(), categorical=()):
+        """Index the ``numeric`` columns of ``df`` by value and the ``categorical`` ones by label."""
+        return cls(len(df), {column: SortedIndex.build(df[column]) for column in numeric},
+                   {column: BitmapIndex.build(df[column]) for column in categorical})
+
+    # -- lookups ------------------------------------------------------------
+
+    def where(self, *predicates):
+        """Ascending row positions matching every ``(column, op, value)`` predicate.
+
+        Numeric columns take any of ``OPERATORS``; categorical ones take
+        ``'=='`` with a label.
+        """
+        spans, bitmaps = {}, []
+        for column, op, value in predicates:
+            if column in self.sorted:
+                start, stop = self.sorted[column].span(op, value)
+                if column in spans:
+                    start, stop = max(start, spans[column][0]), min(stop, spans[column][1])
+                spans[column] = (start, max(start, stop))
+            elif column in self.bitmaps and op == '==':
+                bitmaps.append(self.bitmaps[column].lookup(value))
+            elif column in self.bitmaps:
+                raise ValueError(f"Column '{column}' has a bitmap index and only supports '=='")
+            else:
+                raise KeyError(f"Column '{column}' is not indexed; indexed: {', '.join(self.columns)}")
+        if not spans and not bitmaps:
+            return np.arange(self.rows, dtype=_position_dtype(self.rows))
+
+        bitmap = None
+        if bitmaps:
+            bitmap = functools.reduce(np.bitwise_and, [bits for bits, _ in bitmaps])
+        # Start from the predicate matching the fewest rows (for ANDed
+        # bitmaps, the smallest label bounds the result)
+        driver = min(spans, key=lambda column: spans[column][1] - spans[column][0], default=None)
+        if bitmap is not None and (driver is None or min(count for _, count in bitmaps)
+                                   < spans[driver][1] - spans[driver][0]):
+            rows = _bitmap_rows(bitmap, self.rows)
+            bitmap = driver = None
+        else:
+            start, stop = spans[driver]
+            rows = self.sorted[driver].order[start:stop]
+
+        for column, (start, stop) in spans.items():
+            if column != driver and len(rows):
+                ranks = self.sorted[column].ranks[rows]
+                rows = rows[(ranks >= start) & (ranks < stop)]
+        if bitmap is not None and len(rows):
+            rows = rows[_test_bits(bitmap, rows)]
+        return np.sort(rows)
+
+    def count(self, *predicates):
+        """Number of rows matching every predicate."""
+        if len(predicates) == 1 and predicates[0][0] in self.sorted:
+            start, stop = self.sorted[predicates[0][0]].span(*predicates[0][1:])
+            return max(stop - start, 0)
+        return len(self.where(*predicates))
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path):
+        """Write the index as an uncompressed ``.npz`` file (permutations do not compress)."""
+        meta = {'version': INDEX_VERSION, 'rows': self.rows,
+                'sorted': list(self.sorted), 'bitmaps': list(self.bitmaps)}
+        arrays = {'meta': np.array(json.dumps(meta))}
+        for number, index in enumerate(self.sorted.values()):
+            arrays[f"order_{number}"] = index.order
+            arrays[f"values_{number}"] = index.values
+        for number, index in enumerate(self.bitmaps.values()):
+            arrays[f"labels_{number}"] = np.array(index.labels, dtype=str)
+            arrays[f"bitmaps_{number}"] = index.bitmaps
+            arrays[f"counts_{number}"] = index.counts
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as handle:
+            np.savez(handle, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as stored:
+            meta = json.loads(str(stored['meta']))
+            if meta.get('version') != INDEX_VERSION:
+                raise ValueError(f"Row index {path} has version {meta.get('version')}, expected {INDEX_VERSION}")
+            rows = meta['rows']
+            sorted_indexes = {column: SortedIndex(stored[f"order_{number}"], stored[f"values_{number}"])
+                              for number, column in enumerate(meta['sorted'])}
+            bitmaps = {column: BitmapIndex(stored[f"labels_{number}"].tolist(), stored[f"bitmaps_{number}"],
+                                           stored[f"counts_{number}"], rows)
+                       for number, column in enumerate(meta['bitmaps'])}
+        return cls(rows, sorted_indexes, bitmaps)
+
+    @classmethod
+    def load_or_build(cls, df, numeric=(), categorical=(), path=None):
+        """Return ``(index, hit)``: the index saved at ``path`` if it covers ``df``, else a new one.
+
+        A new index is saved at ``path`` when one is given.
+        """
+        if path is not None and os.path.exists(path):
+            try:
+                index = cls.load(path)
+            except (OSError, ValueError, KeyError):
+                index = None
+            if index is not None and index.rows == len(df) and index.columns == [*numeric, *categorical]:
+                return index, True
+        index = cls.build(df, numeric, categorical)
+        if path is not None:
+            index.save(path)
+        return index, False
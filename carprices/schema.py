@@ -0,0 +1,75 @@
+"""
+Column schema for the car_prices auction export.
+
+The file has 16 columns. Declaring their dtypes up front lets the CSV parser
+build compact columns directly instead of inferring ``object`` for every
+string field and ``int64``/``float64`` for every number.
+"""
+
+# All columns, in file order
+COLUMNS = [
+    'year', 'make', 'model', 'trim', 'body', 'transmission', 'vin', 'state',
+    'condition', 'odometer', 'color', 'interior', 'seller', 'mmr',
+    'sellingprice', 'saledate',
+]
+
+# Low-cardinality strings stored as pandas categoricals
+CATEGORICAL_COLUMNS = [
+    'make', 'model', 'trim', 'body', 'color', 'interior', 'state', 'transmission',
+]
+
+# High-cardinality strings kept as plain strings (one value per car / seller)
+STRING_COLUMNS = ['vin', 'seller']
+
+# Numeric columns. condition, odometer, mmr and sellingprice contain nulls in
+# the raw file, so they are float32 (every integer below 2**24 is exact).
+NUMERIC_DTYPES = {
+    'year': 'int16',
+    'condition': 'float32',
+    'odometer': 'float32',
+    'mmr': 'float32',
+    'sellingprice': 'float32',
+}
+
+DATE_COLUMNS = ['saledate']
+
+# Reference year for car age (2.9, CarPriceDataset.car_age), also the sale
+# year the price model assumes for rows without a sale date
+CURRENT_YEAR = 2025
+
+# Columns each analysis actually reads, for column projection
+SECTION_COLUMNS = {
+    'price_stats': ['sellingprice'],
+    'unique_colors': ['color'],
+    'brands_models': ['make', 'model'],
+    'high_price_cars': COLUMNS,
+    'top_models': ['model'],
+    'price_by_make': ['make', 'sellingprice'],
+    'min_price_by_interior': ['interior', 'sellingprice'],
+    'odometer_by_year': ['year', 'odometer'],
+    'car_age': ['year'],
+    'condition_odometer_filter': COLUMNS,
+    'state_prices_newer': ['state', 'year', 'sellingprice'],
+    'value_for_money': ['make', 'condition', 'sellingprice'],
+    'correlation': ['year', 'condition', 'odometer', 'mmr', 'sellingprice'],
+    'price_by_year': ['year', 'sellingprice'],
+    'price_by_odometer': ['odometer', 'sellingprice'],
+    'cars_by_state': ['state'],
+    'price_by_condition': ['condition', 'sellingprice'],
+    'cars_by_condition': ['condition'],
+    'price_by_color': ['color', 'sellingprice'],
+}
+
+
+def dtype_map(columns=None):
+    """Return the ``read_csv`` dtype mapping for the requested columns."""
+    columns = COLUMNS if columns is None else columns
+    dtypes = {}
+    for column in columns:
+        if column in CATEGORICAL_COLUMNS:
+            dtypes[column] = 'category'
+        elif column in STRING_COLUMNS or column in DATE_COLUMNS:
+            dtypes[column] = 'string'
+        elif column in NUMERIC_DTYPES:
+            dtypes[column] = NUMERIC_DTYPES[column]
+    return dtypes
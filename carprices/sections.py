@@ -0,0 +1,731 @@
+"""
+Numbered analysis sections of the car price report (Tasks 2 and 3).
+
+Each section is a function of a ``SectionContext``: the cleaned frame, the
+detected column names, the output directory and the results of the sections
+it depends on. Sections print their part of the report and queue their
+charts as plot data for ``carprices.charts``; a return value, if any, is
+handed to dependent sections. ``SECTIONS`` declares the dependency graph
+that ``carprices.taskgraph`` executes. With a ``ResultCache``, sections
+whose data, parameters, code and inputs are unchanged are read back
+instead of run.
+"""
+
+import functools
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from carprices.boxstats import GroupedBoxStats
+from carprices.charts import ChartSpec
+from carprices.histogram import Bins, HistogramPlan
+from carprices.planner import QueryPlan
+from carprices.resultcache import frame_fingerprint, node_keys
+from carprices.schema import CURRENT_YEAR
+from carprices.taskgraph import TaskGraph
+
+
+def detect_columns(df):
+    """Locate the columns used by the queries by name."""
+    columns = SimpleNamespace(price=None, color=None, brand=None, model=None, interior=None,
+                              odometer=None, year=None, condition=None, state=None)
+    for col in df.columns:
+        if columns.price is None and ('price' in col.lower() or 'selling' in col.lower()):
+            columns.price = col
+        if columns.color is None and 'color' in col.lower():
+            columns.color = col
+        if 'make' in col.lower() or 'brand' in col.lower():
+            columns.brand = col
+        if 'model' in col.lower() and 'year' not in col.lower():
+            columns.model = col
+        if columns.interior is None and 'interior' in col.lower():
+            columns.interior = col
+        if 'odometer' in col.lower() or 'mileage' in col.lower():
+            columns.odometer = col
+        if 'year' in col.lower():
+            columns.year = col
+        if columns.condition is None and 'condition' in col.lower():
+            columns.condition = col
+        if columns.state is None and 'state' in col.lower():
+            columns.state = col
+    return columns
+
+
+class SectionContext:
+    """What a section sees: data, column names, output folder and inputs.
+
+    Sections do not draw: ``add_chart`` queues a ``ChartSpec`` that the report
+    renders in one batch after all sections have run.
+    """
+
+    def __init__(self, df, columns, output_dir, inputs=None, chart_format='png'):
+        self.df = df
+        self.columns = columns
+        self.output_dir = output_dir
+        self.inputs = inputs or {}
+        self.chart_format = chart_format
+        self.charts = []
+
+    def output_path(self, filename):
+        return os.path.join(self.output_dir, filename)
+
+    def add_chart(self, spec):
+        """Queue ``spec`` for rendering; returns the report's file name for it."""
+        self.charts.append(spec)
+        return f"{spec.name}.{self.chart_format}"
+
+
+def fused_aggregates(ctx):
+    """Plan every grouped aggregation of Tasks 2 and 3 and run them in one pass."""
+    df = ctx.df
+    c = ctx.columns
+
+    # One factorization per key column, filters as masks
+    plan = QueryPlan()
+    if c.year:
+        plan.add_filter('newer', lambda frame: frame[c.year] > 2013)
+    if c.condition:
+        plan.add_filter('excellent', lambda frame: frame[c.condition] >= frame[c.condition].quantile(0.80))
+    if c.model:
+        plan.add('model_counts', by=c.model, agg='size')
+    if c.state:
+        plan.add('state_counts', by=c.state, agg='size')
+    if c.price and c.brand:
+        plan.add('avg_price_by_brand', by=c.brand, value=c.price, agg='mean')
+    if c.price and c.interior:
+        plan.add('min_price_by_interior', by=c.interior, value=c.price, agg='min')
+    if c.odometer and c.year:
+        plan.add('max_odometer_by_year', by=c.year, value=c.odometer, agg='max')
+    if c.price and c.year:
+        plan.add('avg_price_by_year', by=c.year, value=c.price, agg='mean')
+    if c.price and c.year and c.state:
+        plan.add('avg_price_by_state_newer', by=c.state, value=c.price, agg='mean', where='newer')
+    if c.condition and c.price and c.brand:
+        plan.add('value_for_money', by=c.brand, value=c.price, agg='mean', where='excellent')
+
+    aggregates = plan.execute(df)
+    print(f"\n✓ Computed {len(plan.queries)} grouped aggregations in one fused pass "
+          f"({plan.report.sum() * 1000:.1f} ms)")
+    return aggregates
+
+
+def binned_aggregates(ctx):
+    """Bin odometer and condition for sections 3.3, 3.5 and 3.6 in one pass."""
+    df = ctx.df
+    c = ctx.columns
+
+    # Edges as pd.cut would choose them; every row is binned once per edge set
+    start = time.perf_counter()
+    plan = HistogramPlan()
+    if c.odometer:
+        odometer = df[c.odometer]
+        plan.add('price_by_odometer', c.odometer, Bins.equal_width(odometer.min(), odometer.max(), 20),
+                 value=c.price)
+    if c.condition:
+        low, high = df[c.condition].min(), df[c.condition].max()
+        plan.add('price_by_condition_5', c.condition, Bins.fixed_width(low, high, 5), value=c.price)
+        plan.add('cars_by_condition_10', c.condition, Bins.fixed_width(low, high, 10))
+
+    histograms = plan.execute(df)
+    print(f"✓ Computed {len(histograms)} binned aggregations in one pass "
+          f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+    return histograms
+
+
+# ============================================================================
+# TASK 2: DATA FRAMES QUERIES
+# ============================================================================
+
+def section_2_1(ctx):
+    """2.1 Calculate average, minimum, and maximum car price"""
+    df = ctx.df
+    price_column = ctx.columns.price
+
+    print("\n2.1 CAR PRICE STATISTICS")
+    print("-"*80)
+
+    if price_column:
+        avg_price = df[price_column].mean()
+        min_price = df[price_column].min()
+        max_price = df[price_column].max()
+
+        print(f"Average Car Price: ${avg_price:,.2f}")
+        print(f"Minimum Car Price: ${min_price:,.2f}")
+        print(f"Maximum Car Price: ${max_price:,.2f}")
+    else:
+        print("Price column not found in dataset")
+
+
+def section_2_2(ctx):
+    """2.2 List all unique colors"""
+    df = ctx.df
+    color_column = ctx.columns.color
+
+    print("\n\n2.2 UNIQUE CAR COLORS")
+    print("-"*80)
+
+    if color_column:
+        unique_colors = df[color_column].unique()
+        print(f"Number of unique colors: {len(unique_colors)}")
+        print(f"Unique colors: {', '.join(map(str, unique_colors))}")
+    else:
+        print("Color column not found in dataset")
+
+
+def section_2_3(ctx):
+    """2.3 Find number of unique car brands and models"""
+    df = ctx.df
+    brand_column = ctx.columns.brand
+    model_column = ctx.columns.model
+
+    print("\n\n2.3 UNIQUE BRANDS AND MODELS")
+    print("-"*80)
+
+    if brand_column:
+        unique_brands = df[brand_column].nunique()
+        print(f"Number of unique car brands: {unique_brands}")
+        print(f"Brands: {', '.join(map(str, df[brand_column].unique()[:10]))}...")
+    else:
+        print("Brand column not found")
+
+    if model_column:
+        unique_models = df[model_column].nunique()
+        print(f"\nNumber of unique car models: {unique_models}")
+        print(f"Sample models: {', '.join(map(str, df[model_column].unique()[:10]))}...")
+    else:
+        print("Model column not found")
+
+
+def section_2_4(ctx):
+    """2.4 Find cars with selling price > $165,000"""
+    df = ctx.df
+    price_column = ctx.columns.price
+
+    print("\n\n2.4 CARS WITH PRICE > $165,000")
+    print("-"*80)
+
+    if price_column:
+        high_price_cars = df[df[price_column] > 165000]
+        print(f"Number of cars with price > $165,000: {len(high_price_cars)}")
+        if len(high_price_cars) > 0:
+            print(f"\nSample records (first 5):")
+            print(high_price_cars.head())
+    else:
+        print("Price column not found")
+
+
+def section_2_5(ctx):
+    """2.5 Top 5 most frequently sold car models"""
+    model_column = ctx.columns.model
+    aggregates = ctx.inputs['aggregates']
+
+    print("\n\n2.5 TOP 5 MOST FREQUENTLY SOLD CAR MODELS")
+    print("-"*80)
+
+    if model_column:
+        top_models = aggregates['model_counts'].sort_values(ascending=False).head(5)
+        print(top_models)
+        print(f"\nMost popular model: {top_models.index[0]} ({top_models.values[0]} listings)")
+    else:
+        print("Model column not found")
+
+
+def section_2_6(ctx):
+    """2.6 Average selling price by brand"""
+    price_column = ctx.columns.price
+    brand_column = ctx.columns.brand
+    aggregates = ctx.inputs['aggregates']
+
+    print("\n\n2.6 AVERAGE SELLING PRICE BY BRAND (MAKE)")
+    print("-"*80)
+
+    if price_column and brand_column:
+        avg_price_by_brand = aggregates['avg_price_by_brand'].sort_values(ascending=False)
+        print(avg_price_by_brand.head(10))
+    else:
+        print("Required columns not found")
+
+
+def section_2_7(ctx):
+    """2.7 Minimum selling price by interior"""
+    price_column = ctx.columns.price
+    interior_column = ctx.columns.interior
+    aggregates = ctx.inputs['aggregates']
+
+    print("\n\n2.7 MINIMUM SELLING PRICE BY INTERIOR")
+    print("-"*80)
+
+    if price_column and interior_column:
+        min_price_by_interior = aggregates['min_price_by_interior'].sort_values()
+        print(min_price_by_interior)
+    else:
+        print("Interior or price column not found")
+
+
+def section_2_8(ctx):
+    """2.8 Highest odometer reading per year (highest to lowest)"""
+    odometer_column = ctx.columns.odometer
+    year_column = ctx.columns.year
+    aggregates = ctx.inputs['aggregates']
+
+    print("\n\n2.8 HIGHEST ODOMETER READING PER YEAR")
+    print("-"*80)
+
+    if odometer_column and year_column:
+        max_odometer_by_year = aggregates['max_odometer_by_year'].sort_values(ascending=False)
+        print(max_odometer_by_year.head(15))
+    else:
+        print("Odometer or year column not found")
+
+
+def section_2_9(ctx):
+    """2.9 Create new column for car age"""
+    df = ctx.df
+    year_column = ctx.columns.year
+
+    print("\n\n2.9 CREATE CAR AGE COLUMN")
+    print("-"*80)
+
+    if year_column:
+        # Returned rather than added to the shared frame; 3.1 picks it up
+        car_age = (CURRENT_YEAR - df[year_column]).rename('car_age')
+        print(f"✓ Created 'car_age' column")
+        print(f"\nCar age statistics:")
+        print(car_age.describe())
+        print(f"\nSample data with car age:")
+        print(pd.concat([df[year_column], car_age], axis=1).head(10))
+        return car_age
+    else:
+        print("Year column not found")
+
+
+def section_2_10(ctx):
+    """2.10 Cars with condition >= 48 and odometer > 90000"""
+    df = ctx.df
+    odometer_column = ctx.columns.odometer
+    condition_column = ctx.columns.condition
+
+    print("\n\n2.10 CARS WITH CONDITION >= 48 AND ODOMETER > 90000")
+    print("-"*80)
+
+    if condition_column and odometer_column:
+        filtered_cars = df[(df[condition_column] >= 48) & (df[odometer_column] > 90000)]
+        print(f"Number of cars matching criteria: {len(filtered_cars)}")
+        if len(filtered_cars) > 0:
+            sample = filtered_cars.head()
+            car_age = ctx.inputs.get('2.9')
+            if car_age is not None:
+                sample = sample.assign(car_age=car_age.loc[sample.index])
+            print(f"\nSample records:")
+            print(sample)
+    else:
+        print("Condition or odometer column not found")
+
+
+def section_2_11(ctx):
+    """2.11 State with higher car prices for newer cars (year > 2013)"""
+    price_column = ctx.columns.price
+    year_column = ctx.columns.year
+    state_column = ctx.columns.state
+    aggregates = ctx.inputs['aggregates']
+
+    print("\n\n2.11 STATE WITH HIGHER PRICES FOR NEWER CARS (YEAR > 2013)")
+    print("-"*80)
+
+    if price_column and year_column and state_column:
+        avg_price_by_state = aggregates['avg_price_by_state_newer'].sort_values(ascending=False)
+        print(f"Top 10 states with highest average prices for newer cars:")
+        print(avg_price_by_state.head(10))
+        print(f"\nState with consistently higher prices: {avg_price_by_state.index[0]} (${avg_price_by_state.values[0]:,.2f})")
+    else:
+        print("Required columns not found")
+
+
+def section_2_12(ctx):
+    """2.12 Value for money - excellent condition cars with lowest average price"""
+    df = ctx.df
+    price_column = ctx.columns.price
+    brand_column = ctx.columns.brand
+    condition_column = ctx.columns.condition
+    aggregates = ctx.inputs['aggregates']
+
+    print("\n\n2.12 VALUE FOR MONEY - TOP 20% CONDITION, LOWEST AVERAGE PRICE BY MAKE")
+    print("-"*80)
+
+    if condition_column and price_column and brand_column:
+        # Calculate 80th percentile for excellent condition
+        excellent_threshold = df[condition_column].quantile(0.80)
+        excellent_count = int((df[condition_column] >= excellent_threshold).sum())
+
+        print(f"Excellent condition threshold (top 20%): {excellent_threshold}")
+        print(f"Number of cars with excellent condition: {excellent_count}")
+
+        # Average price by make for excellent condition cars (from the fused pass)
+        value_for_money = aggregates['value_for_money'].sort_values()
+
+        print(f"\nTop 10 makes with lowest average price (best value for money):")
+        print(value_for_money.head(10))
+    else:
+        print("Required columns not found")
+
+
+# ============================================================================
+# TASK 3: DATA VISUALIZATION AND INSIGHTS
+# ============================================================================
+
+def section_3_1(ctx):
+    """3.1 Correlation matrix for numerical features"""
+    df = ctx.df
+    price_column = ctx.columns.price
+
+    print("\n3.1 CORRELATION OF NUMERICAL FEATURES")
+    print("-"*80)
+
+    numerical_data = df.select_dtypes(include=[np.number])
+    car_age = ctx.inputs.get('2.9')
+    if car_age is not None:
+        numerical_data = numerical_data.assign(car_age=car_age)
+    numerical_cols = numerical_data.columns.tolist()
+    print(f"Numerical columns: {', '.join(numerical_cols)}")
+
+    if len(numerical_cols) > 1:
+        correlation_matrix = numerical_data.corr()
+
+        filename = ctx.add_chart(ChartSpec(
+            '3_correlation_matrix', 'correlation',
+            {'matrix': correlation_matrix.to_numpy(), 'labels': numerical_cols},
+            title='Correlation Matrix of Numerical Features', title_size=16, figsize=(12, 10)))
+        print(f"\n✓ Correlation matrix saved as '{filename}'")
+
+        print("\nKey correlations with selling price:")
+        if price_column in numerical_cols:
+            price_corr = correlation_matrix[price_column].sort_values(ascending=False)
+            print(price_corr)
+    else:
+        print("Not enough numerical columns for correlation analysis")
+
+
+def section_3_2(ctx):
+    """3.2 Average selling price by year"""
+    price_column = ctx.columns.price
+    year_column = ctx.columns.year
+    aggregates = ctx.inputs['aggregates']
+
+    print("\n\n3.2 AVERAGE SELLING PRICE BY YEAR")
+    print("-"*80)
+
+    if price_column and year_column:
+        avg_price_by_year = aggregates['avg_price_by_year'].sort_index()
+
+        # Line plot with a linear trend line
+        filename = ctx.add_chart(ChartSpec(
+            '4_price_by_year', 'trend',
+            {'x': avg_price_by_year.index.to_numpy(), 'y': avg_price_by_year.to_numpy()},
+            xlabel='Year', ylabel='Average Selling Price ($)', title='Average Selling Price by Year',
+            color='#2E86AB', figsize=(14, 6)))
+        print(f"✓ Graph saved as '{filename}'")
+
+        print("\nINSIGHTS:")
+        print("- Line plot is chosen because it effectively shows trends over continuous time periods")
+        print("- The graph shows how average car prices change across different model years")
+        print(f"- Price range: ${avg_price_by_year.min():,.2f} to ${avg_price_by_year.max():,.2f}")
+
+        # Calculate year-over-year change
+        pct_change = ((avg_price_by_year.iloc[-1] - avg_price_by_year.iloc[0]) / avg_price_by_year.iloc[0]) * 100
+        print(f"- Overall price change from {avg_price_by_year.index[0]} to {avg_price_by_year.index[-1]}: {pct_change:.2f}%")
+    else:
+        print("Required columns not found")
+
+
+def section_3_3(ctx):
+    """3.3 Average selling price by odometer"""
+    price_column = ctx.columns.price
+    odometer_column = ctx.columns.odometer
+
+    print("\n\n3.3 AVERAGE SELLING PRICE BY ODOMETER")
+    print("-"*80)
+
+    if price_column and odometer_column:
+        # Mean price over 20 equal-width odometer bins, plotted at the bin centers
+        histogram = ctx.inputs['histograms']['price_by_odometer']
+        avg_price_by_odometer = histogram.mean()
+        bin_centers = histogram.bins.mids
+
+        # Scatter plus line, x-axis labels in thousands of miles
+        filename = ctx.add_chart(ChartSpec(
+            '5_price_by_odometer', 'scatter_line',
+            {'x': bin_centers, 'y': avg_price_by_odometer.to_numpy()},
+            xlabel='Odometer Reading', ylabel='Average Selling Price ($)',
+            title='Average Selling Price by Odometer Reading', color='#A23B72', thousands=True,
+            figsize=(14, 6)))
+        print(f"✓ Graph saved as '{filename}'")
+
+        print("\nINSIGHTS:")
+        print("- Clear negative correlation between odometer reading and selling price")
+        print("- As mileage increases, the average selling price decreases")
+        print("- This is expected as higher mileage indicates more wear and tear")
+        print("- The steepest decline typically occurs in the lower mileage ranges")
+    else:
+        print("Required columns not found")
+
+
+def section_3_4(ctx):
+    """3.4 Number of cars sold by state"""
+    df = ctx.df
+    state_column = ctx.columns.state
+    aggregates = ctx.inputs['aggregates']
+
+    print("\n\n3.4 NUMBER OF CARS SOLD BY STATE")
+    print("-"*80)
+
+    if state_column:
+        cars_by_state = aggregates['state_counts'].sort_values(ascending=False)
+
+        filename = ctx.add_chart(ChartSpec(
+            '6_cars_by_state', 'bar',
+            {'labels': [str(state) for state in cars_by_state.index], 'values': cars_by_state.to_numpy()},
+            xlabel='State', ylabel='Number of Cars', title='Number of Cars Sold by State',
+            color='#F18F01', figsize=(16, 8)))
+        print(f"✓ Graph saved as '{filename}'")
+
+        print(f"\nTop 3 states with highest car sales:")
+        for i, (state, count) in enumerate(cars_by_state.head(3).items(), 1):
+            print(f"{i}. {state}: {count} cars ({count/len(df)*100:.2f}%)")
+    else:
+        print("State column not found")
+
+
+def section_3_5(ctx):
+    """3.5 Average selling price by condition score ranges (size 5)"""
+    price_column = ctx.columns.price
+    condition_column = ctx.columns.condition
+
+    print("\n\n3.5 AVERAGE SELLING PRICE BY CONDITION SCORE RANGES (SIZE 5)")
+    print("-"*80)
+
+    if price_column and condition_column:
+        # Mean price per condition range of size 5
+        avg_price_by_condition = ctx.inputs['histograms']['price_by_condition_5'].mean()
+
+        # Bars with value labels
+        filename = ctx.add_chart(ChartSpec(
+            '7_price_by_condition_ranges', 'bar',
+            {'labels': [str(x) for x in avg_price_by_condition.index],
+             'values': avg_price_by_condition.to_numpy()},
+            xlabel='Condition Score Range', ylabel='Average Selling Price ($)',
+            title='Average Selling Price by Condition Score Ranges',
+            color='#06A77D', alpha=0.8, edgecolor='black', value_format='${:,.0f}'))
+        print(f"✓ Graph saved as '{filename}'")
+
+        print("\nINSIGHTS:")
+        print("- Strong positive correlation between condition score and selling price")
+        print("- Cars in better condition (higher scores) command significantly higher prices")
+        print("- Price increases progressively as condition improves")
+        print(f"- Price difference between lowest and highest condition: ${avg_price_by_condition.max() - avg_price_by_condition.min():,.2f}")
+        print("- Buyers are willing to pay premium for well-maintained vehicles")
+    else:
+        print("Required columns not found")
+
+
+def section_3_6(ctx):
+    """3.6 Number of cars sold by condition ranges (size 10)"""
+    condition_column = ctx.columns.condition
+
+    print("\n\n3.6 NUMBER OF CARS SOLD BY CONDITION RANGES (SIZE 10)")
+    print("-"*80)
+
+    if condition_column:
+        # Cars per condition range of size 10
+        cars_by_condition = ctx.inputs['histograms']['cars_by_condition_10'].size()
+
+        # Bars with value labels
+        filename = ctx.add_chart(ChartSpec(
+            '8_cars_by_condition_ranges', 'bar',
+            {'labels': [str(x) for x in cars_by_condition.index], 'values': cars_by_condition.to_numpy()},
+            xlabel='Condition Score Range', ylabel='Number of Cars',
+            title='Number of Cars Sold by Condition Ranges (Size 10)',
+            color='#C73E1D', alpha=0.8, edgecolor='black', value_format='{:.0f}'))
+        print(f"✓ Graph saved as '{filename}'")
+
+        print("\nINSIGHTS:")
+        print("- Distribution shows the concentration of cars across condition ranges")
+        print(f"- Most cars fall in the condition range: {cars_by_condition.idxmax()}")
+        print(f"- Peak volume: {cars_by_condition.max()} cars")
+        print("- This indicates the typical condition of cars in the used car market")
+        print("- Lower condition ranges may indicate older vehicles or those needing repairs")
+        print("- Higher condition ranges represent well-maintained or newer vehicles")
+    else:
+        print("Condition column not found")
+
+
+def section_3_7(ctx):
+    """3.7 Box plot for price distribution by color"""
+    df = ctx.df
+    price_column = ctx.columns.price
+    color_column = ctx.columns.color
+
+    print("\n\n3.7 PRICE DISTRIBUTION BY COLOR (BOX PLOT)")
+    print("-"*80)
+
+    if price_column and color_column:
+        # Quartiles, whiskers and outliers per color from one sorted pass;
+        # rows with a missing color are ignored
+        box_stats = GroupedBoxStats(df[color_column], df[price_column])
+
+        # Get unique colors and sort by median price
+        color_order = box_stats.order_by_median()
+
+        # Create initial box plot
+        filename = ctx.add_chart(ChartSpec(
+            '9_price_by_color_with_outliers', 'box', {'stats': box_stats.stats(order=color_order)},
+            xlabel='Color', ylabel='Selling Price ($)',
+            title='Distribution of Car Prices by Color (With Outliers)', palette='Set2', figsize=(14, 6)))
+        print(f"✓ Graph with outliers saved as '{filename}'")
+
+        print("\nINSIGHTS (With Outliers):")
+        print("- Significant outliers present across most colors")
+        print("- Outliers represent luxury or rare vehicles with exceptionally high prices")
+        print("- Wide price ranges indicate diverse vehicle types within each color")
+
+        # Calculate IQR and remove outliers
+        Q1, Q3 = box_stats.quantile([0.25, 0.75])
+        IQR = Q3 - Q1
+        lower_bound = Q1 - 1.5 * IQR
+        upper_bound = Q3 + 1.5 * IQR
+
+        outliers_removed = box_stats.rows - box_stats.count(lower_bound, upper_bound)
+        print(f"\n✓ Removed {outliers_removed} outliers ({outliers_removed/box_stats.rows*100:.2f}% of data)")
+
+        # Create box plot without outliers
+        filename = ctx.add_chart(ChartSpec(
+            '10_price_by_color_without_outliers', 'box',
+            {'stats': box_stats.stats(order=color_order, lower=lower_bound, upper=upper_bound)},
+            xlabel='Color', ylabel='Selling Price ($)',
+            title='Distribution of Car Prices by Color (Without Outliers)', palette='Set2', figsize=(14, 6)))
+        print(f"✓ Graph without outliers saved as '{filename}'")
+
+        print("\nINSIGHTS (Without Outliers):")
+        print("- Clearer view of typical price distributions after removing extreme values")
+
+        # Calculate statistics by color
+        color_stats = box_stats.summary(lower_bound, upper_bound).rename_axis(color_column)
+        color_stats = color_stats.sort_values('median', ascending=False)
+        print("\nPrice statistics by color (without outliers):")
+        print(color_stats)
+
+        print(f"\n- Highest median price color: {color_stats.index[0]} (${color_stats['median'].iloc[0]:,.2f})")
+        print(f"- Lowest median price color: {color_stats.index[-1]} (${color_stats['median'].iloc[-1]:,.2f})")
+        print("- Color preferences may reflect market demand and perceived value")
+        print("- Certain colors (e.g., white, black) often command higher resale values")
+    else:
+        print("Required columns not found")
+
+
+# ============================================================================
+# DEPENDENCY GRAPH
+# ============================================================================
+
+class Section:
+    """A node of the report: name, function, task number and dependencies."""
+
+    def __init__(self, name, func, task, deps=()):
+        self.name = name
+        self.func = func
+        self.task = task
+        self.deps = tuple(deps)
+
+
+SECTIONS = [
+    Section('aggregates', fused_aggregates, 2),
+    Section('histograms', binned_aggregates, 3),
+    Section('2.1', section_2_1, 2),
+    Section('2.2', section_2_2, 2),
+    Section('2.3', section_2_3, 2),
+    Section('2.4', section_2_4, 2),
+    Section('2.5', section_2_5, 2, deps=['aggregates']),
+    Section('2.6', section_2_6, 2, deps=['aggregates']),
+    Section('2.7', section_2_7, 2, deps=['aggregates']),
+    Section('2.8', section_2_8, 2, deps=['aggregates']),
+    Section('2.9', section_2_9, 2),
+    Section('2.10', section_2_10, 2, deps=['2.9']),
+    Section('2.11', section_2_11, 2, deps=['aggregates']),
+    Section('2.12', section_2_12, 2, deps=['aggregates']),
+    Section('3.1', section_3_1, 3, deps=['2.9']),
+    Section('3.2', section_3_2, 3, deps=['aggregates']),
+    Section('3.3', section_3_3, 3, deps=['histograms']),
+    Section('3.4', section_3_4, 3, deps=['aggregates']),
+    Section('3.5', section_3_5, 3, deps=['histograms']),
+    Section('3.6', section_3_6, 3, deps=['histograms']),
+    Section('3.7', section_3_7, 3),
+]
+
+
+def select_sections(names=None):
+    """Sections to run for ``names`` plus everything they depend on.
+
+    ``names`` holds section numbers (``'2.5'``) or task numbers (``'3'``);
+    None selects every section. The result keeps report order.
+    """
+    if names is None:
+        return list(SECTIONS)
+    by_name = {section.name: section for section in SECTIONS}
+    wanted = set()
+    for name in names:
+        matches = [section.name for section in SECTIONS if name in (section.name, str(section.task))]
+        if not matches:
+            raise KeyError(f"Unknown section '{name}', expected one of: {', '.join(by_name)}")
+        wanted.update(matches)
+    pending = list(wanted)
+    while pending:
+        for dep in by_name[pending.pop()].deps:
+            if dep not in wanted:
+                wanted.add(dep)
+                pending.append(dep)
+    return [section for section in SECTIONS if section.name in wanted]
+
+
+def _make_context(df, inputs, columns, output_dir, chart_format='png'):
+    return SectionContext(df, columns, output_dir, inputs, chart_format)
+
+
+def run_sections(df, output_dir, workers=None, sections=None, chart_format='png', shared_path=None,
+                 cache=None, fingerprint=None):
+    """Run the report sections and return their results in report order.
+
+    Independent sections run in parallel on ``workers`` processes (default:
+    all cores); ``workers=1`` runs them serially in this process. Each
+    result's ``charts`` holds the ``ChartSpec`` objects the section queued;
+    ``chart_format`` is the extension the sections print for them.
+    ``shared_path`` is an Arrow IPC file already holding ``df`` for the
+    workers to memory-map.
+
+    With a ``ResultCache`` as ``cache``, stored results are reused (marked
+    ``cached``) and the computed ones are stored. ``fingerprint`` identifies
+    the data, e.g. ``CarPriceDataset.fingerprint``; by default the frame is
+    hashed.
+    """
+    graph = TaskGraph(SECTIONS if sections is None else sections)
+    columns = detect_columns(df)
+    make_context = functools.partial(_make_context, columns=columns, output_dir=output_dir,
+                                     chart_format=chart_format)
+    if cache is None:
+        return graph.run(df, make_context, workers=workers, shared_path=shared_path)
+
+    keys = node_keys(graph.nodes, fingerprint or frame_fingerprint(df),
+                     {'columns': vars(columns), 'chart_format': chart_format})
+    done = {}
+    for section in graph.nodes:
+        start = time.perf_counter()
+        result = cache.get(keys[section.name])
+        if result is not None:
+            result.seconds = time.perf_counter() - start
+            result.cached = True
+            done[section.name] = result
+    results = graph.run(df, make_context, workers=workers, shared_path=shared_path, done=done)
+    for result in results:
+        if not result.cached:
+            cache.put(keys[result.name], result)
+    return results
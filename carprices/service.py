@@ -0,0 +1,382 @@
+"""
+Local HTTP/JSON query service over a warm, in-memory dataset.
+
+Running the script for every question pays for the CSV parse, cleaning and
+chart rendering each time. ``serve`` loads the cleaned frame once (from the
+Arrow snapshot when the cache has one) and answers the ``CarPriceDataset``
+queries over HTTP:
+
+    GET /queries                                       names, parameters, defaults
+    GET /query/high_price_cars?threshold=100000&limit=20
+    GET /query/avg_price_by_make?label=ford            one entry of a per-group result
+    GET /query/avg_price_by_state?newer_than=2010
+    GET /query/well_kept_high_mileage?min_condition=45&min_odometer=120000
+    GET /stats                                         requests, cache hits, batches
+
+Query parameters are the method's keyword arguments, converted to the type
+of their defaults; non-finite numbers (nan, inf) are rejected with a 400,
+and NaN results are sent as null, so every body is strict JSON. Results
+with one entry per row or group are paged with ``offset`` and ``limit``
+(default ``DEFAULT_LIMIT``). ``label`` picks one group by name, matched
+like the vocabulary (case and whitespace ignored).
+
+Answers are cached at two levels: query results per argument set, and encoded
+response bodies per request, both least recently used first out. Misses are
+micro-batched. The first one opens a ``batch_ms`` window, and every miss that
+arrives in it joins the batch. Identical requests are computed once, and the
+batch runs in one call on a worker thread, so the event loop keeps accepting
+connections meanwhile.
+
+The dataset's ``row_index`` is loaded at startup, so the range filters
+(``high_price_cars``, ``well_kept_high_mileage``, ``avg_price_by_state``)
+read only matching rows.
+
+Only the standard library's asyncio is used. The server speaks just enough
+HTTP/1.1 (GET, keep-alive) for local tools, dashboards and the load test in
+``benchmarks/bench_service.py``. It is not meant to face the internet.
+"""
+
+import asyncio
+import collections
+import inspect
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from carprices.dataset import CarPriceDataset
+from carprices.vocab import normalize_key
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10_000
+BATCH_MS = 2.0
+MAX_BATCH = 64
+CACHE_MB = 64
+RESULT_ENTRIES = 256
+PAGING = ('offset', 'limit', 'label')
+# Returns a model object rather than a table
+EXCLUDED_QUERIES = ('price_model',)
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class ServiceError(Exception):
+    """A request that cannot be answered, with its HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """Mapping that drops least recently used entries beyond ``capacity``.
+
+    ``cost(value)`` is each entry's share of the capacity (1 by default, so
+    ``capacity`` counts entries; ``len`` makes it count bytes).
+    """
+
+    def __init__(self, capacity, cost=None):
+        self.capacity = capacity
+        self.cost = cost or (lambda value: 1)
+        self.entries = collections.OrderedDict()
+        self.used = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.used -= self.cost(self.entries.pop(key))
+        self.entries[key] = value
+        self.used += self.cost(value)
+        while self.used > self.capacity and self.entries:
+            _, dropped = self.entries.popitem(last=False)
+            self.used -= self.cost(dropped)
+
+
+def query_parameters():
+    """``{query: {parameter: default}}`` of the queries the service exposes."""
+    queries = {}
+    for name in CarPriceDataset.queries():
+        if name in EXCLUDED_QUERIES:
+            continue
+        signature = inspect.signature(getattr(CarPriceDataset, name))
+        queries[name] = {parameter.name: parameter.default for parameter in signature.parameters.values()
+                         if parameter.name != 'self'}
+    return queries
+
+
+def _convert(name, text, default):
+    """``text`` as the type of ``default``; numbers may be given as int or float, but must be finite."""
+    try:
+        if isinstance(default, (int, float)) and not isinstance(default, bool):
+            number = float(text)
+            if not math.isfinite(number):
+                raise ValueError(text)
+            return int(number) if isinstance(default, int) and number.is_integer() else number
+        return type(default)(text)
+    except ValueError:
+        raise ServiceError(400, f"Invalid value '{text}' for parameter '{name}' ({type(default).__name__})")
+
+
+def _content_length(headers):
+    """The request body's length from ``headers`` (0 without one)."""
+    text = headers.get('content-length', '')
+    if not text:
+        return 0
+    if not text.isdigit():
+        raise ServiceError(400, f"Invalid Content-Length '{text}'")
+    return int(text)
+
+
+def _page(items, offset, limit):
+    return {'rows': len(items), 'offset': offset, 'limit': limit}
+
+
+def _values(items):
+    """JSON values of an array or index, with NaN as null and dates in ISO format."""
+    return json.loads(pd.Series(items).to_json(orient='values', date_format='iso'))
+
+
+def to_payload(value, offset=0, limit=DEFAULT_LIMIT, label=None):
+    """JSON-ready form of a query result, paged or narrowed to one ``label``."""
+    if isinstance(value, pd.DataFrame):
+        page = value.iloc[offset:offset + limit]
+        return {**_page(value, offset, limit), 'index': value.index.name, 'labels': _values(page.index),
+                'columns': [str(column) for column in value.columns],
+                'data': json.loads(page.to_json(orient='records', date_format='iso'))}
+    if isinstance(value, pd.Series):
+        if label is not None:
+            wanted = normalize_key(label)
+            matches = [i for i, key in enumerate(value.index) if normalize_key(key) == wanted]
+            if not matches:
+                raise ServiceError(404, f"No entry '{label}' in this result")
+            value = value.iloc[matches[:1]]
+            return {'label': _values(value.index)[0], 'value': _values(value)[0]}
+        page = value.iloc[offset:offset + limit]
+        return {**_page(value, offset, limit), 'index': value.index.name, 'name': value.name,
+                'data': [{'label': key, 'value': item} for key, item in zip(_values(page.index), _values(page))]}
+    if isinstance(value, (np.ndarray, pd.api.extensions.ExtensionArray)):
+        return {**_page(value, offset, limit), 'data': _values(value[offset:offset + limit])}
+    value = value.item() if isinstance(value, np.generic) else value
+    # Strict JSON has no NaN or infinity; like the arrays, send null
+    return {'value': None if isinstance(value, float) and not math.isfinite(value) else value}
+
+
+class QueryService:
+    """Cached, micro-batched answers to the dataset queries, served over HTTP.
+
+    Parameters
+    ----------
+    dataset : CarPriceDataset
+    batch_ms : float
+        How long the first cache miss waits for others to batch with.
+    cache_mb : float
+        Size of the response cache (encoded JSON bodies).
+    result_entries : int
+        Number of query results (per argument set) kept.
+    """
+
+    def __init__(self, dataset, batch_ms=BATCH_MS, cache_mb=CACHE_MB, result_entries=RESULT_ENTRIES):
+        self.dataset = dataset
+        self.batch_window = batch_ms / 1000
+        self.queries = query_parameters()
+        self.responses = LRUCache(int(cache_mb * 1024**2), cost=len)
+        self.results = LRUCache(result_entries)
+        self.stats = collections.Counter()
+        # One thread: pandas work is serialized and the dataset is not shared
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='carprices-query')
+        self._batch = None
+
+    # -- requests -----------------------------------------------------------
+
+    def parse(self, name, pairs):
+        """Typed ``(query arguments, paging)`` for ``/query/<name>`` and its query string."""
+        if name not in self.queries:
+            raise ServiceError(404, f"Unknown query '{name}', expected one of: {', '.join(self.queries)}")
+        defaults = self.queries[name]
+        arguments, paging = {}, {'offset': 0, 'limit': DEFAULT_LIMIT, 'label': None}
+        for key, text in pairs:
+            if key in defaults:
+                arguments[key] = _convert(key, text, defaults[key])
+            elif key in PAGING:
+                paging[key] = text if key == 'label' else _convert(key, text, 0)
+            else:
+                raise ServiceError(400, f"Unknown parameter '{key}' for {name}; "
+                                        f"expected: {', '.join(list(defaults) + list(PAGING))}")
+        offset, limit = paging['offset'], paging['limit']
+        if not (isinstance(offset, int) and isinstance(limit, int) and offset >= 0 and 0 < limit <= MAX_LIMIT):
+            raise ServiceError(400, f"offset must be >= 0 and limit between 1 and {MAX_LIMIT}")
+        return arguments, paging
+
+    async def answer(self, name, arguments, paging):
+        """Encoded JSON body for one query request."""
+        self.stats['queries'] += 1
+        key = (name, tuple(sorted(arguments.items())), tuple(sorted(paging.items(), key=str)))
+        body = self.responses.get(key)
+        if body is not None:
+            self.stats['cache_hits'] += 1
+            return body
+        loop = asyncio.get_running_loop()
+        if self._batch is None:
+            self._batch = {}
+            loop.call_later(self.batch_window, self._flush)
+        if key in self._batch:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(self._batch[key][3])
+        future = loop.create_future()
+        self._batch[key] = (name, arguments, paging, future)
+        if len(self._batch) >= MAX_BATCH:
+            self._flush()
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        batch, self._batch = self._batch, None
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        self.stats['batches'] += 1
+        self.stats['computed'] += len(batch)
+        outcomes = await asyncio.get_running_loop().run_in_executor(self.executor, self._compute, batch)
+        for key, (_, _, _, future) in batch.items():
+            outcome = outcomes[key]
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                self.responses.put(key, outcome)
+                future.set_result(outcome)
+
+    def _compute(self, batch):
+        """Run a batch on the worker thread; returns ``{key: body or exception}``."""
+        outcomes = {}
+        for key, (name, arguments, paging, _) in batch.items():
+            try:
+                result_key = key[:2]
+                value = self.results.get(result_key)
+                if value is None:
+                    # The undecorated query: results are kept in this bounded
+                    # cache, not in the dataset's unbounded memo
+                    value = getattr(CarPriceDataset, name).__wrapped__(self.dataset, **arguments)
+                    self.results.put(result_key, value)
+                payload = {'query': name, 'arguments': {**self.queries[name], **arguments},
+                           'result': to_payload(value, **paging)}
+                outcomes[key] = json.dumps(payload, separators=(',', ':'), allow_nan=False).encode()
+            except Exception as error:
+                outcomes[key] = error
+        return outcomes
+
+    async def route(self, method, target):
+        """``(status, payload or encoded body)`` for one request."""
+        if method != 'GET':
+            raise ServiceError(405, f"Only GET is supported, got {method}")
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        if path in ('/', '/queries'):
+            return 200, {name: {'description': getattr(CarPriceDataset, name).__doc__.splitlines()[0],
+                                'parameters': defaults, 'paging': list(PAGING)}
+                         for name, defaults in self.queries.items()}
+        if path == '/health':
+            return 200, {'status': 'ok', 'rows': len(self.dataset.df)}
+        if path == '/stats':
+            return 200, {**self.stats, 'cached_responses': len(self.responses),
+                         'cached_bytes': self.responses.used, 'cached_results': len(self.results)}
+        if path.startswith('/query/'):
+            arguments, paging = self.parse(path[len('/query/'):], parse_qsl(url.query))
+            return 200, await self.answer(path[len('/query/'):], arguments, paging)
+        raise ServiceError(404, f"No such endpoint: {path}")
+
+    # -- HTTP ---------------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        """Serve one connection (several requests with keep-alive)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    header, _, value = line.decode('latin-1').partition(':')
+                    headers[header.strip().lower()] = value.strip()
+
+                self.stats['requests'] += 1
+                parts = request_line.decode('latin-1').split()
+                # None when the body cannot be skipped, so the connection is closed
+                length = None
+                try:
+                    length = _content_length(headers)
+                    if len(parts) != 3:
+                        raise ServiceError(400, 'Malformed request line')
+                    status, body = await self.route(parts[0], parts[1])
+                except ServiceError as error:
+                    status, body = error.status, {'error': str(error)}
+                except Exception as error:
+                    status, body = 500, {'error': f"{type(error).__name__}: {error}"}
+                if length:
+                    await reader.readexactly(length)
+                if status != 200:
+                    self.stats[f"status_{status}"] += 1
+                if not isinstance(body, bytes):
+                    body = json.dumps(body, separators=(',', ':'), allow_nan=False).encode()
+
+                keep_alive = (length is not None and len(parts) == 3 and parts[2] == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                        f"Content-Type: application/json\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening and return the ``asyncio.Server``."""
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def serve(dataset, host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """Load ``dataset`` and answer queries on ``host:port`` until interrupted.
+
+    ``options`` are passed to ``QueryService``.
+    """
+    start = time.perf_counter()
+    rows = len(dataset.df)
+    # Range filters (2.4, 2.10) are index lookups from the first request on
+    dataset.row_index
+    service = QueryService(dataset, **options)
+
+    async def run():
+        server = await service.start(host, port)
+        print(f"✓ Loaded {rows:,} rows and their index in {time.perf_counter() - start:.2f}s; "
+              f"serving {len(service.queries)} queries on http://{host}:{port}/queries", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown(wait=False)
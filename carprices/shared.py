@@ -0,0 +1,65 @@
+"""
+Memory-mapped Arrow IPC dataset files shared between processes.
+
+The cleaned dataset is written once as an uncompressed Arrow IPC file with a
+single record batch. Every reader (the report, a notebook kernel, each pool
+worker) memory-maps that file. The columns of the resulting DataFrame point
+straight into the mapping:
+
+- numeric columns and categorical codes become read-only NumPy views;
+- string columns become Arrow-backed arrays over the same buffers.
+
+The operating system keeps one physical copy in the page cache, however many
+processes have the file open. A process only pays private memory for what it
+computes.
+
+The single record batch matters. pandas has to concatenate columns that are
+split across batches, and that copies them, so ``write_shared`` combines
+the chunks before writing.
+"""
+
+import os
+
+SHARED_SUFFIX = '.arrow'
+
+
+def write_shared(df, path):
+    """Write ``df`` (without its index) as a one-batch, uncompressed Arrow IPC file.
+
+    The file is written to a temporary name and renamed, so readers never see
+    a partial file. Returns ``path``.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    os.replace(tmp, path)
+    return path
+
+
+def open_shared(path):
+    """Memory-map an Arrow IPC file and return it as a DataFrame.
+
+    The mapping stays alive as long as any column references it; closing the
+    file handle does not invalidate the frame.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def private_memory_mb():
+    """Resident anonymous (unshared) and file-backed memory of this process, in MB.
+
+    Linux only (reads ``/proc/self/status``); returns ``(nan, nan)`` elsewhere.
+    """
+    try:
+        with open('/proc/self/status') as handle:
+            fields = dict(line.split(':', 1) for line in handle if line.startswith(('RssAnon', 'RssFile')))
+    except OSError:
+        return float('nan'), float('nan')
+    return int(fields['RssAnon'].split()[0]) / 1024, int(fields['RssFile'].split()[0]) / 1024
@@ -0,0 +1,259 @@
+"""
+Synthetic car_prices exports of any size.
+
+The real auction export has roughly 560K rows. To see how each stage scales
+beyond that, ``generate`` produces frames with the same 16 columns and the
+same shape of data:
+
+* makes follow a skewed (Zipf-like) share, led by Ford, Chevrolet and Nissan.
+  Each make has its own skewed model list, and a long tail of rare trims and
+  sellers gives model, trim and seller their high cardinality;
+* a small share of labels is spelled in lower case ('ford', 'sedan'), as in
+  the real file;
+* ages are skewed towards recent model years. Odometer grows with age and
+  condition runs from 1 to 49;
+* mmr depreciates from a per-make base price with age, mileage and
+  condition, and sellingprice follows mmr closely (correlation about 0.97);
+* the state mix is led by Florida, California and Pennsylvania;
+* nulls appear at roughly the real rates per column, and a small fraction of
+  rows are exact duplicates.
+
+Values are written in the export's text format, saledate included, so files
+from ``write_csv`` go through the same loader as the real data. Output is
+deterministic for a given seed and chunk size. Files are written in chunks,
+so 50M-row files never need the whole frame in memory.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from carprices.io import pyarrow_available
+from carprices.schema import COLUMNS
+
+DEFAULT_SEED = 0
+WRITE_CHUNKSIZE = 1_000_000
+DUPLICATE_RATE = 0.001
+LOWERCASE_RATE = 0.01
+# Float columns (nulls included) whose values are all whole numbers
+INTEGRAL_COLUMNS = ['condition', 'odometer', 'mmr', 'sellingprice']
+
+# make: (share, base price in USD, most common models)
+MAKES = {
+    'Ford': (0.170, 24000, ['F-150', 'Fusion', 'Escape', 'Focus', 'Explorer', 'Edge', 'Taurus', 'Mustang']),
+    'Chevrolet': (0.109, 23000, ['Impala', 'Malibu', 'Silverado 1500', 'Cruze', 'Equinox', 'Tahoe']),
+    'Nissan': (0.097, 21000, ['Altima', 'Sentra', 'Maxima', 'Rogue', 'Versa', 'Pathfinder']),
+    'Toyota': (0.072, 23000, ['Camry', 'Corolla', 'Prius', 'RAV4', 'Tacoma', 'Highlander']),
+    'Dodge': (0.055, 22000, ['Grand Caravan', 'Charger', 'Avenger', 'Journey', 'Durango']),
+    'Honda': (0.049, 22000, ['Accord', 'Civic', 'CR-V', 'Odyssey', 'Pilot']),
+    'Hyundai': (0.039, 19000, ['Sonata', 'Elantra', 'Santa Fe', 'Genesis', 'Accent']),
+    'BMW': (0.037, 38000, ['3 Series', '5 Series', 'X5', 'X3', '7 Series']),
+    'Kia': (0.033, 18000, ['Optima', 'Sorento', 'Soul', 'Forte', 'Sportage']),
+    'Chrysler': (0.031, 24000, ['200', 'Town and Country', '300', 'Sebring']),
+    'Mercedes-Benz': (0.028, 42000, ['E-Class', 'C-Class', 'M-Class', 'S-Class', 'GL-Class']),
+    'Jeep': (0.027, 26000, ['Grand Cherokee', 'Wrangler', 'Liberty', 'Compass', 'Patriot']),
+    'Infiniti': (0.027, 33000, ['G Sedan', 'QX56', 'M37', 'FX35', 'JX35']),
+    'Volkswagen': (0.023, 22000, ['Jetta', 'Passat', 'Beetle', 'Tiguan', 'CC']),
+    'Lexus': (0.021, 38000, ['RX 350', 'ES 350', 'IS 250', 'GX 460']),
+    'GMC': (0.019, 30000, ['Sierra 1500', 'Acadia', 'Yukon', 'Terrain']),
+    'Mazda': (0.015, 20000, ['Mazda3', 'Mazda6', 'CX-7', 'CX-9']),
+    'Cadillac': (0.014, 38000, ['CTS', 'SRX', 'Escalade', 'DTS']),
+    'Acura': (0.010, 32000, ['TL', 'MDX', 'TSX', 'RDX']),
+    'Audi': (0.010, 38000, ['A4', 'A6', 'Q5', 'Q7']),
+    'Lincoln': (0.010, 34000, ['MKZ', 'MKX', 'Navigator', 'Town Car']),
+    'Subaru': (0.009, 24000, ['Outback', 'Forester', 'Legacy', 'Impreza']),
+    'Buick': (0.009, 26000, ['LaCrosse', 'Enclave', 'Lucerne', 'Regal']),
+    'Mitsubishi': (0.007, 18000, ['Galant', 'Lancer', 'Outlander', 'Eclipse']),
+    'Ram': (0.007, 30000, ['1500', '2500', 'ProMaster Cargo Van']),
+    'Volvo': (0.006, 33000, ['XC90', 'S60', 'XC60', 'S80']),
+    'MINI': (0.006, 24000, ['Cooper', 'Cooper Countryman', 'Cooper Clubman']),
+    'Land Rover': (0.003, 55000, ['Range Rover Sport', 'LR4', 'Range Rover']),
+    'Porsche': (0.002, 65000, ['Cayenne', '911', 'Panamera', 'Boxster']),
+    'Jaguar': (0.002, 45000, ['XF', 'XJ', 'XK']),
+    'Maserati': (0.0003, 80000, ['Quattroporte', 'GranTurismo']),
+    'Bentley': (0.0002, 150000, ['Continental GT', 'Flying Spur']),
+    'Ferrari': (0.00005, 200000, ['California', '458 Italia']),
+}
+
+BODIES = {
+    'Sedan': 0.44, 'SUV': 0.26, 'Hatchback': 0.05, 'Minivan': 0.05, 'Coupe': 0.03, 'Crew Cab': 0.03,
+    'Wagon': 0.03, 'Convertible': 0.02, 'SuperCrew': 0.02, 'G Sedan': 0.015, 'Extended Cab': 0.015,
+    'Regular Cab': 0.01, 'Quad Cab': 0.01, 'Double Cab': 0.01, 'Van': 0.01,
+}
+TRIMS = ['Base', 'SE', 'LX', 'Limited', 'LT', 'XLT', 'S', 'SXT', 'SEL', '2.5 S', 'Sport', 'EX', 'Touring',
+         'LS', 'SV', 'XLE', 'GLS', 'i', 'Premium', 'Laredo', 'SLT', '1LT', 'EX-L', 'Titanium', 'Sahara']
+STATES = {
+    'fl': 0.15, 'ca': 0.13, 'pa': 0.10, 'tx': 0.08, 'ga': 0.06, 'nj': 0.05, 'il': 0.04, 'nc': 0.04,
+    'oh': 0.04, 'tn': 0.04, 'mo': 0.03, 'mi': 0.03, 'nv': 0.02, 'va': 0.02, 'md': 0.02, 'wi': 0.02,
+    'mn': 0.02, 'az': 0.02, 'co': 0.01, 'wa': 0.01, 'ma': 0.01, 'ny': 0.01, 'in': 0.01, 'sc': 0.01,
+    'ne': 0.005, 'or': 0.005, 'la': 0.005, 'hi': 0.003, 'ut': 0.002, 'ms': 0.001, 'al': 0.001,
+}
+COLORS = {
+    'black': 0.20, 'white': 0.19, 'silver': 0.15, 'gray': 0.15, 'blue': 0.09, 'red': 0.08, '—': 0.05,
+    'gold': 0.02, 'green': 0.02, 'burgundy': 0.02, 'beige': 0.015, 'brown': 0.01, 'orange': 0.004,
+    'purple': 0.003, 'off-white': 0.003, 'yellow': 0.002, 'charcoal': 0.001, 'turquoise': 0.0004,
+}
+INTERIORS = {
+    'black': 0.44, 'gray': 0.32, 'beige': 0.11, 'tan': 0.08, '—': 0.03, 'brown': 0.015, 'red': 0.003,
+    'silver': 0.002, 'blue': 0.002, 'off-white': 0.001, 'purple': 0.0005,
+}
+SELLERS = ['nissan-infiniti lt', 'ford motor credit company llc', 'the hertz corporation',
+           'santander consumer', 'avis corporation', 'nissan infiniti lt', 'wells fargo dealer services',
+           'enterprise vehicle exchange / tra / rental / tulsa', 'tdaf remarketing', 'ge fleet services']
+
+# Share of nulls per column, close to the real export
+NULL_RATES = {
+    'make': 0.018, 'model': 0.019, 'trim': 0.019, 'body': 0.024, 'transmission': 0.117,
+    'condition': 0.021, 'odometer': 0.0002, 'color': 0.0013, 'interior': 0.0013, 'mmr': 0.0001,
+    'sellingprice': 0.00002, 'saledate': 0.00002,
+}
+
+VIN_ALPHABET = np.frombuffer(b'ABCDEFGHJKLMNPRSTUVWXYZ0123456789', dtype=np.uint8)
+FIRST_SALE = pd.Timestamp('2014-01-01')
+SALE_DAYS = 540
+
+
+def _zipf(count, exponent=1.1):
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _choose(rng, labels, weights, n):
+    weights = np.asarray(weights, dtype='float64')
+    return np.asarray(labels, dtype=object)[rng.choice(len(labels), n, p=weights / weights.sum())]
+
+
+def _with_nulls(rng, values, column):
+    """``values`` with the column's share of nulls (NaN for floats, None otherwise)."""
+    nulls = rng.random(len(values)) < NULL_RATES.get(column, 0.0)
+    if not nulls.any():
+        return values
+    values = values.copy() if values.dtype == object else values.astype('float64')
+    values[nulls] = None if values.dtype == object else np.nan
+    return values
+
+
+def _lowercase(rng, values):
+    lower = rng.random(len(values)) < LOWERCASE_RATE
+    values[lower] = [value.lower() for value in values[lower]]
+    return values
+
+
+class _Catalog:
+    """Label pools shared by every chunk of one seed."""
+
+    def __init__(self, seed):
+        rng = np.random.default_rng([seed, 0])
+        self.makes = list(MAKES)
+        self.make_share = np.array([share for share, _, _ in MAKES.values()])
+        self.base_price = np.array([price for _, price, _ in MAKES.values()], dtype='float64')
+        # Each make: its common models plus a tail of rare ones, Zipf-weighted
+        self.models = []
+        for make, (share, _, models) in MAKES.items():
+            tail = int(np.sqrt(share) * 60)
+            self.models.append(np.array(models + [f"{models[0]} {make[:2].upper()}{i}" for i in range(tail)],
+                                        dtype=object))
+        self.trims = np.array(TRIMS + [f"{rng.choice(TRIMS)} {i}" for i in range(1500)], dtype=object)
+        self.sellers = np.array(SELLERS + [f"dealer {i:05d}" for i in range(14000)], dtype=object)
+        # Sale slots: weekdays, every half hour from 9:00 to 15:30, in the
+        # export's date format with its Pacific time zone suffix
+        days = FIRST_SALE + pd.to_timedelta(np.arange(SALE_DAYS), unit='D')
+        days = days[days.dayofweek < 5]
+        slots = (days.values[:, None] + (np.arange(9 * 60, 16 * 60, 30) * 60_000_000_000)
+                 .astype('timedelta64[ns]')).ravel()
+        stamps = pd.DatetimeIndex(slots).tz_localize('America/Los_Angeles')
+        suffix = np.where(stamps.strftime('%Z') == 'PDT', 'GMT-0700 (PDT)', 'GMT-0800 (PST)')
+        self.saledates = np.array([f"{text} {zone}" for text, zone in
+                                   zip(stamps.strftime('%a %b %d %Y %H:%M:%S'), suffix)], dtype=object)
+
+
+def generate(rows, seed=DEFAULT_SEED, start=0, catalog=None):
+    """A raw car_prices frame of ``rows`` synthetic sales.
+
+    ``start`` is the index of the first row within a larger file; it selects
+    the random stream, so chunks of one file differ from each other.
+    """
+    catalog = catalog or _Catalog(seed)
+    rng = np.random.default_rng([seed, 1, start])
+    n = rows
+
+    make_code = rng.choice(len(catalog.makes), n, p=catalog.make_share / catalog.make_share.sum())
+    model = np.empty(n, dtype=object)
+    for code in np.unique(make_code):
+        rows_of_make = make_code == code
+        models = catalog.models[code]
+        model[rows_of_make] = models[rng.choice(len(models), rows_of_make.sum(), p=_zipf(len(models)))]
+    make = np.asarray(catalog.makes, dtype=object)[make_code]
+
+    age = np.minimum(np.round(rng.gamma(2.0, 2.0, n)), 30).astype(np.int64)
+    year = 2015 - age
+    condition = np.round(1 + 48 * rng.beta(3.0, 1.6, n))
+    odometer = np.round(np.clip((age + rng.random(n)) * 12500 * rng.lognormal(0, 0.35, n), 1, 999_999))
+
+    # Market value: depreciation with age and mileage, adjusted for condition
+    value = (catalog.base_price[make_code] * 0.86 ** age * np.exp(-odometer / 400_000)
+             * (0.75 + condition / 100) * rng.lognormal(0, 0.2, n))
+    mmr = np.maximum(np.round(value / 25) * 25, 25)
+    sellingprice = np.maximum(np.round(mmr * rng.normal(1.0, 0.12, n) / 100) * 100, 1)
+
+    vin = VIN_ALPHABET[rng.integers(0, len(VIN_ALPHABET), (n, 17))]
+    vin = vin.view('S17').ravel().astype(str).astype(object)
+
+    df = pd.DataFrame({
+        'year': year,
+        'make': _with_nulls(rng, _lowercase(rng, make), 'make'),
+        'model': _with_nulls(rng, model, 'model'),
+        'trim': _with_nulls(rng, catalog.trims[rng.choice(len(catalog.trims), n, p=_zipf(len(catalog.trims)))],
+                            'trim'),
+        'body': _with_nulls(rng, _lowercase(rng, _choose(rng, list(BODIES), list(BODIES.values()), n)), 'body'),
+        'transmission': _with_nulls(rng, np.where(rng.random(n) < 0.965, 'automatic', 'manual').astype(object),
+                                    'transmission'),
+        'vin': vin,
+        'state': _choose(rng, list(STATES), list(STATES.values()), n),
+        'condition': _with_nulls(rng, condition, 'condition'),
+        'odometer': _with_nulls(rng, odometer, 'odometer'),
+        'color': _with_nulls(rng, _choose(rng, list(COLORS), list(COLORS.values()), n), 'color'),
+        'interior': _with_nulls(rng, _choose(rng, list(INTERIORS), list(INTERIORS.values()), n), 'interior'),
+        'seller': catalog.sellers[rng.choice(len(catalog.sellers), n, p=_zipf(len(catalog.sellers), 0.9))],
+        'mmr': _with_nulls(rng, mmr, 'mmr'),
+        'sellingprice': _with_nulls(rng, sellingprice, 'sellingprice'),
+        'saledate': _with_nulls(rng, catalog.saledates[rng.integers(0, len(catalog.saledates), n)], 'saledate'),
+    }, columns=COLUMNS)
+
+    # Exact duplicates: some rows repeat an earlier row of the same chunk
+    order = np.arange(n)
+    repeated = np.flatnonzero(rng.random(n) < DUPLICATE_RATE)
+    order[repeated] = (rng.random(len(repeated)) * repeated).astype(np.int64)
+    return df.take(order).reset_index(drop=True)
+
+
+def _write_chunk(chunk, handle, header):
+    """Append ``chunk`` as CSV text to a binary file handle."""
+    if pyarrow_available():
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        # Whole-number floats as nullable ints, so they print without '.0'
+        chunk = chunk.astype({column: 'Int64' for column in INTEGRAL_COLUMNS})
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        pa_csv.write_csv(table, handle, pa_csv.WriteOptions(include_header=header))
+    else:
+        handle.write(chunk.to_csv(index=False, header=header, float_format='%.10g').encode())
+
+
+def write_csv(path, rows, seed=DEFAULT_SEED, chunksize=WRITE_CHUNKSIZE):
+    """Write ``rows`` synthetic sales to ``path`` as a car_prices CSV.
+
+    The file is plain CSV, generated ``chunksize`` rows at a time and
+    renamed into place when complete. pyarrow's CSV writer is used when it
+    is installed. Returns ``path``.
+    """
+    catalog = _Catalog(seed)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as handle:
+        for start in range(0, max(rows, 1), chunksize):
+            chunk = generate(min(chunksize, rows - start), seed, start, catalog)
+            _write_chunk(chunk, handle, header=start == 0)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,171 @@
+"""
+Parallel execution of the report's section graph.
+
+The numbered sections of Tasks 2 and 3 are mostly independent, so they run
+as nodes of a dependency graph on a process pool. Every worker memory-maps
+the cleaned frame from one Arrow IPC file (the cached snapshot when there
+is one, otherwise a temporary export) in its initializer, instead of each
+task pickling the frame. Each node's printed output is captured, and
+``run`` returns the results in declaration order, so the report reads the
+same regardless of which worker finished first. Results that are already
+known, such as sections read back from the result cache, are passed in as
+``done`` and their nodes are not run.
+"""
+
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from carprices.io import pyarrow_available
+from carprices.plotting import use_headless_backend
+from carprices.shared import open_shared, write_shared
+
+# Per-worker state set by the pool initializer
+_WORKER = {}
+
+
+class NodeResult:
+    """Captured output, return value, wall time and queued charts of one node.
+
+    ``cached`` is True when the result was read back from a ``ResultCache``
+    rather than computed; ``seconds`` is then the time spent reading it.
+    """
+
+    def __init__(self, name, output, value, seconds, charts=(), cached=False):
+        self.name = name
+        self.output = output
+        self.value = value
+        self.seconds = seconds
+        self.charts = list(charts)
+        self.cached = cached
+
+
+def _init_worker(ipc_path, make_context, setup):
+    use_headless_backend()
+    if setup is not None:
+        setup()
+    _WORKER['make_context'] = make_context
+    _WORKER['df'] = open_shared(ipc_path)
+
+
+def _run_node(name, func, inputs, df=None, make_context=None):
+    """Run one node with stdout captured; used both in workers and in-process."""
+    if df is None:
+        df = _WORKER['df']
+        make_context = _WORKER['make_context']
+    ctx = make_context(df, inputs)
+    buffer = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(buffer):
+        value = func(ctx)
+    return NodeResult(name, buffer.getvalue(), value, time.perf_counter() - start,
+                      charts=getattr(ctx, 'charts', ()))
+
+
+def _mp_context():
+    # Fork avoids re-importing the calling script in each worker; spawn
+    # requires the caller to be import-safe.
+    methods = mp.get_all_start_methods()
+    return mp.get_context('fork' if 'fork' in methods else 'spawn')
+
+
+class TaskGraph:
+    """Nodes with declared dependencies, executed serially or on a process pool.
+
+    Parameters
+    ----------
+    nodes : list
+        Objects with ``name``, ``func`` and ``deps`` attributes, in report
+        order. ``func(ctx)`` receives the context built by ``make_context``.
+    """
+
+    def __init__(self, nodes):
+        self.nodes = list(nodes)
+        names = {node.name for node in self.nodes}
+        for node in self.nodes:
+            missing = [dep for dep in node.deps if dep not in names]
+            if missing:
+                raise ValueError(f"Node '{node.name}' depends on unknown node(s): {', '.join(missing)}")
+
+    def _inputs(self, node, results):
+        return {dep: results[dep].value for dep in node.deps}
+
+    def _pending(self, results):
+        return [node for node in self.nodes if node.name not in results]
+
+    def run_serial(self, df, make_context, done=None):
+        """Run every node not in ``done`` in-process, in declaration order."""
+        results = dict(done or {})
+        pending = self._pending(results)
+        while pending:
+            ready = [node for node in pending if all(dep in results for dep in node.deps)]
+            if not ready:
+                raise ValueError("Dependency cycle between: " + ', '.join(node.name for node in pending))
+            for node in ready:
+                results[node.name] = _run_node(node.name, node.func, self._inputs(node, results),
+                                               df=df, make_context=make_context)
+                pending.remove(node)
+        return [results[node.name] for node in self.nodes]
+
+    def run(self, df, make_context, workers=None, setup=None, shared_path=None, done=None):
+        """Execute the graph and return ``NodeResult`` objects in declaration order.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            Shared input frame, exported once to Arrow IPC for the workers.
+        make_context : callable
+            ``make_context(df, inputs)`` builds the object passed to each node.
+            Must be picklable (a module-level function or ``functools.partial``).
+        workers : int, optional
+            Pool size; defaults to the CPU count. ``1`` (or no pyarrow) runs
+            serially in this process.
+        setup : callable, optional
+            Run once in each worker, e.g. to apply the chart style.
+        shared_path : str, optional
+            An Arrow IPC file (see ``carprices.shared``) that already holds
+            ``df``, such as the cleaned-dataset snapshot. Workers map it
+            directly instead of a temporary export.
+        done : dict, optional
+            ``{name: NodeResult}`` of nodes that are not run; their values
+            are passed to dependent nodes as if computed.
+        """
+        results = dict(done or {})
+        pending = self._pending(results)
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(pending) <= 1 or not pyarrow_available():
+            return self.run_serial(df, make_context, results)
+
+        tmp_dir = tempfile.mkdtemp(prefix='carprices-')
+        ipc_path = shared_path or os.path.join(tmp_dir, 'frame.arrow')
+        try:
+            if shared_path is None:
+                write_shared(df, ipc_path)
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=_mp_context(),
+                                     initializer=_init_worker,
+                                     initargs=(ipc_path, make_context, setup)) as pool:
+                self._schedule(pool, results)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return [results[node.name] for node in self.nodes]
+
+    def _schedule(self, pool, results):
+        pending = self._pending(results)
+        running = {}
+        while pending or running:
+            for node in [node for node in pending if all(dep in results for dep in node.deps)]:
+                future = pool.submit(_run_node, node.name, node.func, self._inputs(node, results))
+                running[future] = node
+                pending.remove(node)
+            if not running:
+                raise ValueError("Dependency cycle between: " + ', '.join(node.name for node in pending))
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                results[node.name] = future.result()
+        return results
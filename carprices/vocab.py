@@ -0,0 +1,169 @@
+"""
+Persistent vocabulary of the repeated string columns.
+
+Make, model, trim, body, color, interior, state and seller repeat a few
+thousand distinct strings across hundreds of thousands of rows. Per file,
+pandas categoricals already store them as small integer codes. Those codes
+are not stable, though. They are positions in that file's sorted categories,
+so a new make in tomorrow's batch shifts every code after it, and 'Ford',
+'ford' and 'Ford ' end up as three different groups.
+
+``VocabularyStore`` assigns every column value a code once and keeps it.
+Values are matched on a normalized key: surrounding whitespace is stripped,
+inner runs of whitespace are collapsed to one space, and the text is
+case-folded. The display label is the most frequent spelling seen in the
+batch that introduced the key. Codes are appended in key order and never
+reused or renumbered, so snapshots and aggregate stores written earlier
+stay valid as the vocabulary grows.
+
+``encode_frame`` returns the frame with those columns as categoricals whose
+categories are the vocabulary in code order, so ``cat.codes`` are the
+stable codes. The query planner and the box-plot statistics group on these
+codes directly and only turn codes back into labels for output.
+
+The store is a single JSON file. It assumes one writer at a time.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+VOCAB_VERSION = 1
+VOCAB_FILE = 'vocabulary.json'
+
+VOCAB_COLUMNS = ['make', 'model', 'trim', 'body', 'color', 'interior', 'state', 'seller']
+
+
+def normalize_key(value):
+    """Matching key of a label: whitespace collapsed and case-folded."""
+    return ' '.join(str(value).split()).casefold()
+
+
+class Vocabulary:
+    """Code <-> label mapping of one column; codes are list positions."""
+
+    def __init__(self, labels=()):
+        self.labels = list(labels)
+        self.index = {normalize_key(label): code for code, label in enumerate(self.labels)}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def encode(self, values):
+        """Stable codes (int32, -1 for null) of ``values``; unseen keys get new codes.
+
+        Returns
+        -------
+        codes : numpy.ndarray
+        stats : dict
+            ``distinct`` raw spellings, ``new`` keys added and ``merged``
+            spellings folded into a differently spelled label.
+        """
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            raw_codes = values.cat.codes.to_numpy()
+            uniques = values.cat.categories
+        else:
+            raw_codes, uniques = pd.factorize(values)
+        counts = np.bincount(raw_codes[raw_codes >= 0], minlength=len(uniques))
+
+        # Only the distinct spellings are normalized, never the rows
+        mapping = np.full(len(uniques), -1, dtype=np.int32)
+        candidates = {}
+        keys = [normalize_key(label) for label in uniques]
+        for i, (key, label) in enumerate(zip(keys, uniques)):
+            code = self.index.get(key)
+            if code is not None:
+                mapping[i] = code
+            elif counts[i] > candidates.get(key, (-1, None))[0]:
+                candidates[key] = (counts[i], ' '.join(str(label).split()))
+        for key in sorted(candidates):
+            self.index[key] = len(self.labels)
+            self.labels.append(candidates[key][1])
+        for i, key in enumerate(keys):
+            if mapping[i] < 0:
+                mapping[i] = self.index[key]
+
+        codes = np.where(raw_codes >= 0, mapping[np.maximum(raw_codes, 0)], -1).astype(np.int32)
+        merged = sum(' '.join(str(label).split()) != self.labels[code] for label, code in zip(uniques, mapping))
+        stats = {'distinct': len(uniques), 'new': len(candidates), 'merged': merged}
+        return codes, stats
+
+    def categorical(self, codes):
+        """``pandas.Categorical`` over the whole vocabulary, in code order."""
+        return pd.Categorical.from_codes(codes, categories=pd.Index(self.labels, dtype='str'))
+
+    def decode(self, codes):
+        """Labels for ``codes`` (None for -1)."""
+        labels = np.asarray(self.labels + [None], dtype=object)
+        return labels[np.asarray(codes)]
+
+
+class VocabularyStore:
+    """Vocabularies of the repeated string columns, persisted as one JSON file.
+
+    Parameters
+    ----------
+    path : str or path-like, optional
+        JSON file; None keeps the vocabulary in memory only.
+    columns : list of str, optional
+        Columns to encode (default ``VOCAB_COLUMNS``).
+    """
+
+    def __init__(self, path=None, columns=None):
+        self.path = None if path is None else str(path)
+        self.columns = list(VOCAB_COLUMNS if columns is None else columns)
+        self.vocabularies = {column: Vocabulary() for column in self.columns}
+        self.report = None
+        self._dirty = False
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path) as handle:
+                stored = json.load(handle)
+            if stored.get('version') != VOCAB_VERSION:
+                raise ValueError(f"Vocabulary {self.path} has version {stored.get('version')}, "
+                                 f"expected {VOCAB_VERSION}")
+            for column, labels in stored['columns'].items():
+                self.vocabularies[column] = Vocabulary(labels)
+                if column not in self.columns:
+                    self.columns.append(column)
+
+    def __getitem__(self, column):
+        return self.vocabularies[column]
+
+    def encode_frame(self, df):
+        """Copy of ``df`` with each vocabulary column re-coded as a stable categorical.
+
+        Per-column counts (distinct spellings, new codes, merged variants)
+        are left in ``self.report``. Call ``save`` to persist new codes.
+        """
+        encoded = {}
+        rows = {}
+        for column in self.columns:
+            if column not in df.columns:
+                continue
+            vocabulary = self.vocabularies.setdefault(column, Vocabulary())
+            codes, stats = vocabulary.encode(df[column])
+            encoded[column] = pd.Series(vocabulary.categorical(codes), index=df.index, name=column)
+            rows[column] = {**stats, 'vocabulary': len(vocabulary)}
+            self._dirty |= stats['new'] > 0
+        self.report = pd.DataFrame.from_dict(rows, orient='index',
+                                             columns=['distinct', 'merged', 'new', 'vocabulary'])
+        return df.assign(**encoded)
+
+    def decode(self, column, codes):
+        return self.vocabularies[column].decode(codes)
+
+    def save(self):
+        """Write the vocabulary if codes were added since it was loaded."""
+        if self.path is None or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as handle:
+            json.dump({'version': VOCAB_VERSION,
+                       'columns': {column: vocabulary.labels
+                                   for column, vocabulary in self.vocabularies.items()}},
+                      handle, indent=1)
+        os.replace(tmp, self.path)
+        self._dirty = False
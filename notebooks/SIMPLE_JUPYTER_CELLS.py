@@ -14,7 +14,6 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy import stats
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -33,8 +32,20 @@ print("✅ Setup complete!")
 # ============================================================
 # CELL 2: LOAD DATA
 # ============================================================
-# Update this path to where your CSV file is located
-df = pd.read_csv('car_prices_cleaned.csv')
+# Loads the cleaned, typed snapshot written by car_price_analysis.py.
+# Update CACHE_DIR if the script was run with another --output or --cache-dir.
+# The snapshot is an Arrow file memory-mapped zero-copy: every kernel that
+# opens it shares one copy of the data in the OS page cache.
+from carprices.cache import CleanedCache
+from carprices.dataset import CarPriceDataset
+
+CACHE_DIR = 'outputs/cache'
+df = CleanedCache(CACHE_DIR).latest()
+
+# Fallback if the script has not been run yet: load and clean the raw export
+# (this also writes the snapshot to CACHE_DIR for the next kernel)
+if df is None:
+    df = CarPriceDataset('car_prices.csv', cache_dir=CACHE_DIR).df
 
 print("First 5 rows:")
 df.head()
@@ -79,9 +90,11 @@ plt.show()  # 👈 THIS SHOWS THE GRAPH!
 # ============================================================
 # CELL 6: VISUALIZATION 2 - Missing Values Heatmap
 # ============================================================
+from carprices.missingness import missing_fractions, plot_missing_heatmap
+
 plt.figure(figsize=(12, 8))
-sns.heatmap(df.isnull(), cbar=True, yticklabels=False, cmap='viridis')
-plt.title('Missing Values Heatmap', fontsize=14, fontweight='bold')
+ax = plot_missing_heatmap(missing_fractions(df))
+ax.set_title('Missing Values Heatmap', fontsize=14, fontweight='bold')
 plt.tight_layout()
 plt.show()  # 👈 THIS SHOWS THE GRAPH!
 